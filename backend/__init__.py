@@ -3,23 +3,196 @@ Backend package for Welvision Roller Inspection System
 """
 
 from .plc_communication import plc_communication, trigger_plc_action
-from .frame_capture import capture_frames_bigface, capture_frames_od
+from .frame_capture import (
+    capture_frames,
+    get_camera_frame_shape,
+    get_camera_raw_shape,
+    transform_frame,
+    FrameTransformer,
+    FrameLatcher
+)
+from .capture_health import (
+    CAPTURE_METRICS,
+    CAPTURE_STATES,
+    CaptureHealth,
+    CaptureWatchdog,
+    new_capture_metrics,
+    capture_health_summary
+)
+from .metrics import SharedMetrics
+from .memory_policy import MEMORY_METRICS, MemoryPolicy, new_memory_metrics, read_rss_mb
+from .sensor_edges import SensorEdgeBoard, SensorEdge
+from .preprocessing import LetterboxTransform, compute_letterbox, new_model_input, letterbox_into, boxes_to_frame
+from .annotation import draw_detections, render_detections
+from .image_writer import (
+    DROP_POLICIES,
+    IMAGE_WRITER_METRICS,
+    new_image_writer_metrics,
+    ImageWriterPool,
+    create_image_writer
+)
+from .detection_ring import (
+    SOURCE_FRAME_RING,
+    SOURCE_LATCH_RING,
+    class_names_key,
+    DetectionPacket,
+    DetectionRing
+)
+from .detection_postprocess import (
+    ROLLER_CONFIDENCE,
+    DefectAssignment,
+    find_class_index,
+    sort_detections,
+    corner_containment,
+    assign_defects
+)
+from .roller_tracker import RollerTrack, RollerTracker, create_roller_tracker
+from .frame_buffer import SharedFrameRing, FramePacket
+from .frame_cursor import INFERENCE_METRICS, FrameCursor, new_inference_metrics
+from .frame_sources import (
+    FrameSource,
+    CameraFrameSource,
+    VideoFileFrameSource,
+    ImageFolderFrameSource,
+    create_frame_source
+)
+from .predictors import LocalPredictor
+from .model_registry import ModelRegistry, model_load_key, model_load_reports
+from .startup import (
+    StartupGraph,
+    record_phase,
+    startup_phase,
+    reset_startup_timeline,
+    collect_startup_timeline,
+    export_chrome_trace
+)
+from .warmup import load_warmup_frames, warmup_model, warmup_configured_model
+from .inference_backends import INFERENCE_BACKENDS, resolve_device, select_backend, export_model, load_model
+from .inference_server import InferenceClient, create_inference_clients, create_predictors, run_inference_server
 from .yolo_processing import process_rollers_bigface, process_frames_od
 from .slot_control import handle_slot_control_bigface, handle_slot_control_od
-from .camera_detector import get_camera_index_by_name, list_available_cameras, get_camera_indices_from_config
+from .camera_detector import (
+    get_camera_index_by_name,
+    list_available_cameras,
+    get_camera_indices_from_config,
+    enumerate_cameras,
+    refresh_camera_devices,
+    list_camera_devices,
+    resolve_camera_sources,
+    start_camera_monitor,
+    stop_camera_monitor
+)
 from .image_manager import (
     save_defect_image,
     save_all_frames_image,
+    get_all_frames_directory,
+    get_frame_archive,
+    archive_all_frames_image,
+    close_frame_archives,
     initialize_storage_directories,
     ensure_directory_exists,
     cleanup_old_images
 )
+from .frame_archive import SEGMENT_EXTENSION, ArchiveRecord, FrameArchiveWriter, FrameArchiveReader, list_segments
+from .retention_index import RetentionIndex, get_retention_index, build_retention_indexes
+from .video_recorder import (
+    VIDEO_RECORDER_METRICS,
+    new_video_recorder_metrics,
+    sidecar_path,
+    SegmentRetention,
+    CameraRecorder,
+    run_video_recorder
+)
+from .storage_governor import (
+    STORAGE_TIERS,
+    RECORDINGS_TIER,
+    STORAGE_METRICS,
+    new_storage_metrics,
+    governed_directories,
+    StorageGovernor,
+    create_storage_governor
+)
 
 __all__ = [
     'plc_communication',
     'trigger_plc_action',
-    'capture_frames_bigface',
-    'capture_frames_od',
+    'capture_frames',
+    'get_camera_frame_shape',
+    'get_camera_raw_shape',
+    'transform_frame',
+    'FrameTransformer',
+    'FrameLatcher',
+    'CAPTURE_METRICS',
+    'CAPTURE_STATES',
+    'CaptureHealth',
+    'CaptureWatchdog',
+    'new_capture_metrics',
+    'capture_health_summary',
+    'SharedMetrics',
+    'MEMORY_METRICS',
+    'MemoryPolicy',
+    'new_memory_metrics',
+    'read_rss_mb',
+    'SensorEdgeBoard',
+    'SensorEdge',
+    'LetterboxTransform',
+    'compute_letterbox',
+    'new_model_input',
+    'letterbox_into',
+    'boxes_to_frame',
+    'draw_detections',
+    'render_detections',
+    'DROP_POLICIES',
+    'IMAGE_WRITER_METRICS',
+    'new_image_writer_metrics',
+    'ImageWriterPool',
+    'create_image_writer',
+    'SOURCE_FRAME_RING',
+    'SOURCE_LATCH_RING',
+    'class_names_key',
+    'DetectionPacket',
+    'DetectionRing',
+    'ROLLER_CONFIDENCE',
+    'DefectAssignment',
+    'find_class_index',
+    'sort_detections',
+    'corner_containment',
+    'assign_defects',
+    'RollerTrack',
+    'RollerTracker',
+    'create_roller_tracker',
+    'SharedFrameRing',
+    'FramePacket',
+    'INFERENCE_METRICS',
+    'FrameCursor',
+    'new_inference_metrics',
+    'FrameSource',
+    'CameraFrameSource',
+    'VideoFileFrameSource',
+    'ImageFolderFrameSource',
+    'create_frame_source',
+    'LocalPredictor',
+    'ModelRegistry',
+    'model_load_key',
+    'model_load_reports',
+    'StartupGraph',
+    'record_phase',
+    'startup_phase',
+    'reset_startup_timeline',
+    'collect_startup_timeline',
+    'export_chrome_trace',
+    'load_warmup_frames',
+    'warmup_model',
+    'warmup_configured_model',
+    'INFERENCE_BACKENDS',
+    'resolve_device',
+    'select_backend',
+    'export_model',
+    'load_model',
+    'InferenceClient',
+    'create_inference_clients',
+    'create_predictors',
+    'run_inference_server',
     'process_rollers_bigface',
     'process_frames_od',
     'handle_slot_control_bigface',
@@ -27,9 +200,40 @@ __all__ = [
     'get_camera_index_by_name',
     'list_available_cameras',
     'get_camera_indices_from_config',
+    'enumerate_cameras',
+    'refresh_camera_devices',
+    'list_camera_devices',
+    'resolve_camera_sources',
+    'start_camera_monitor',
+    'stop_camera_monitor',
     'save_defect_image',
     'save_all_frames_image',
+    'get_all_frames_directory',
+    'get_frame_archive',
+    'archive_all_frames_image',
+    'close_frame_archives',
     'initialize_storage_directories',
     'ensure_directory_exists',
-    'cleanup_old_images'
+    'cleanup_old_images',
+    'SEGMENT_EXTENSION',
+    'ArchiveRecord',
+    'FrameArchiveWriter',
+    'FrameArchiveReader',
+    'list_segments',
+    'RetentionIndex',
+    'get_retention_index',
+    'build_retention_indexes',
+    'STORAGE_TIERS',
+    'RECORDINGS_TIER',
+    'STORAGE_METRICS',
+    'new_storage_metrics',
+    'governed_directories',
+    'StorageGovernor',
+    'create_storage_governor',
+    'VIDEO_RECORDER_METRICS',
+    'new_video_recorder_metrics',
+    'sidecar_path',
+    'SegmentRetention',
+    'CameraRecorder',
+    'run_video_recorder'
 ]
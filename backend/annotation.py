@@ -0,0 +1,87 @@
+"""
+Detection annotation drawing
+
+Draws detection arrays (x1, y1, x2, y2, conf, cls) onto frames in the same
+style as Ultralytics' Results.plot(), without needing the Results object.
+
+Drawing is kept off the inference path: the GUI renders at display
+resolution from the raw frame and the detection ring, and images that are
+saved are rendered by the image writer threads.
+"""
+import cv2
+import numpy as np
+
+# Ultralytics default palette (BGR)
+_PALETTE = [
+    (56, 56, 255), (151, 157, 255), (31, 112, 255), (29, 178, 255), (49, 210, 207),
+    (10, 249, 72), (23, 204, 146), (134, 219, 61), (52, 147, 26), (187, 212, 0),
+    (168, 153, 44), (255, 194, 0), (147, 69, 52), (255, 115, 100), (236, 24, 0),
+    (255, 56, 132), (133, 0, 82), (255, 56, 203), (200, 149, 255), (199, 55, 255)
+]
+
+
+def class_color(cls: int) -> tuple:
+    """Return the BGR color used for a class ID."""
+    return _PALETTE[int(cls) % len(_PALETTE)]
+
+
+def draw_detections(image, detections, names: dict, copy: bool = True) -> np.ndarray:
+    """
+    Draw labelled boxes onto an image.
+
+    Args:
+        image: BGR image to draw on
+        detections: Array of shape (N, 6) with x1, y1, x2, y2, conf, cls in image pixels
+        names: Mapping of class ID to class name
+        copy: Draw on a copy instead of the image itself
+
+    Returns:
+        Annotated image
+    """
+    annotated = image.copy() if copy else image
+    line_width = max(round(sum(annotated.shape[:2]) / 2 * 0.003), 2)
+    font_scale = line_width / 3
+    font_thickness = max(line_width - 1, 1)
+
+    for x1, y1, x2, y2, conf, cls in np.asarray(detections).reshape(-1, 6):
+        color = class_color(cls)
+        p1, p2 = (int(x1), int(y1)), (int(x2), int(y2))
+        cv2.rectangle(annotated, p1, p2, color, thickness=line_width, lineType=cv2.LINE_AA)
+
+        label = f"{names.get(int(cls), int(cls))} {conf:.2f}"
+        w, h = cv2.getTextSize(label, 0, fontScale=font_scale, thickness=font_thickness)[0]
+        outside = p1[1] >= h + 3
+        label_p2 = (p1[0] + w, p1[1] - h - 3 if outside else p1[1] + h + 3)
+        cv2.rectangle(annotated, p1, label_p2, color, -1, cv2.LINE_AA)
+        cv2.putText(
+            annotated, label,
+            (p1[0], p1[1] - 2 if outside else p1[1] + h + 2),
+            0, font_scale, (255, 255, 255), thickness=font_thickness, lineType=cv2.LINE_AA
+        )
+
+    return annotated
+
+
+def render_detections(frame, detections, names: dict, size: tuple) -> np.ndarray:
+    """
+    Resize a frame to display size, then draw its detections on it.
+
+    Drawing after the resize touches a display-sized image instead of the
+    full camera frame.
+
+    Args:
+        frame: Full-resolution BGR frame
+        detections: Array of shape (N, 6) in full-frame pixels
+        names: Mapping of class ID to class name
+        size: (width, height) of the display
+
+    Returns:
+        Annotated display-sized image
+    """
+    height, width = frame.shape[:2]
+    resized = cv2.resize(frame, size)
+    scaled = np.array(detections, dtype=np.float32).reshape(-1, 6)
+    scaled[:, [0, 2]] *= size[0] / width
+    scaled[:, [1, 3]] *= size[1] / height
+    return draw_detections(resized, scaled, names, copy=False)
+
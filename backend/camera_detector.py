@@ -1,92 +1,279 @@
 """
 Camera detection module for dynamic camera index resolution
+
+Device lists come from DirectShow on Windows (pygrabber) and from
+/sys/class/video4linux on Linux. Enumeration results are cached with a TTL
+and can be kept fresh by a background monitor thread that re-enumerates
+periodically and reports hot-plugged or removed cameras, so resolving
+camera names on the startup path is a dictionary lookup.
 """
-from pygrabber.dshow_graph import FilterGraph
+import os
+import re
+import sys
+import threading
+import time
+
+try:
+    from pygrabber.dshow_graph import FilterGraph
+except ImportError:  # DirectShow enumeration is only available on Windows
+    FilterGraph = None
+
+V4L2_SYSFS_PATH = "/sys/class/video4linux"
+
+# Seconds a cached device list is trusted when no monitor is running
+DEFAULT_CACHE_TTL = 30.0
+
+_device_cache = {'devices': None, 'time': 0.0}
+_cache_lock = threading.Lock()
+_monitor = {'thread': None, 'stop': None}
+
+
+def _enumerate_dshow():
+    """List (index, name) of DirectShow video input devices."""
+    if FilterGraph is None:
+        print("⚠️ Camera enumeration unavailable (pygrabber not installed)")
+        return []
+    devices = FilterGraph().get_input_devices()
+    return [(idx, name) for idx, name in enumerate(devices)]
+
+
+def _enumerate_v4l2(sysfs_path: str = V4L2_SYSFS_PATH):
+    """
+    List (index, name) of V4L2 capture devices from sysfs.
+
+    The index is N of /dev/videoN, which is what cv2.VideoCapture(N) opens.
+    Metadata nodes that share a device with a capture node are skipped.
+    """
+    if not os.path.isdir(sysfs_path):
+        return []
+
+    cameras = []
+    for entry in os.listdir(sysfs_path):
+        match = re.fullmatch(r"video(\d+)", entry)
+        if not match:
+            continue
+        node_path = os.path.join(sysfs_path, entry)
+        try:
+            with open(os.path.join(node_path, "name")) as f:
+                name = f.read().strip()
+            # index 0 is the primary (capture) node of a device
+            index_file = os.path.join(node_path, "index")
+            if os.path.exists(index_file):
+                with open(index_file) as f:
+                    if int(f.read().strip() or 0) != 0:
+                        continue
+        except (OSError, ValueError):
+            continue
+        cameras.append((int(match.group(1)), name))
+
+    return sorted(cameras)
+
+
+def enumerate_cameras():
+    """
+    Enumerate camera devices with the backend for this platform (uncached).
+
+    Returns:
+        list: List of tuples containing (index, camera_name)
+    """
+    if sys.platform.startswith("win"):
+        return _enumerate_dshow()
+    if sys.platform.startswith("linux"):
+        return _enumerate_v4l2()
+    print(f"⚠️ Camera enumeration not supported on {sys.platform}")
+    return []
+
+
+def refresh_camera_devices():
+    """
+    Re-enumerate camera devices and update the cache.
+
+    Returns:
+        list: List of tuples containing (index, camera_name)
+    """
+    try:
+        devices = enumerate_cameras()
+    except Exception as e:
+        print(f"❌ Error enumerating cameras: {e}")
+        devices = []
+
+    with _cache_lock:
+        _device_cache['devices'] = devices
+        _device_cache['time'] = time.monotonic()
+    return devices
+
+
+def list_camera_devices(max_age: float = DEFAULT_CACHE_TTL):
+    """
+    Get the cached device list, re-enumerating only if it is older than max_age.
+
+    Args:
+        max_age (float): Maximum age of the cached list in seconds
+
+    Returns:
+        list: List of tuples containing (index, camera_name)
+    """
+    with _cache_lock:
+        devices = _device_cache['devices']
+        age = time.monotonic() - _device_cache['time']
+    if devices is None or age > max_age:
+        devices = refresh_camera_devices()
+    return devices
 
 
-def get_camera_index_by_name(target_name: str):
+def get_camera_index_by_name(target_name: str, max_age: float = DEFAULT_CACHE_TTL):
     """
     Find camera index by searching for a target name in available cameras.
-    
+
     Args:
         target_name (str): Partial or full camera name to search for
-        
+        max_age (float): Maximum age of the cached device list in seconds
+
     Returns:
         int: Camera index if found, None otherwise
     """
-    try:
-        graph = FilterGraph()
-        devices = graph.get_input_devices()
-        
-        for idx, name in enumerate(devices):
-            if target_name.lower() in name.lower():
-                return idx
-        
-        print(f"⚠️ No camera found with name containing '{target_name}'")
-        return None
-        
-    except Exception as e:
-        print(f"❌ Error detecting camera: {e}")
-        return None
+    for idx, name in list_camera_devices(max_age):
+        if target_name.lower() in name.lower():
+            return idx
+
+    print(f"⚠️ No camera found with name containing '{target_name}'")
+    return None
 
 
 def list_available_cameras():
     """
     List all available camera devices.
-    
+
     Returns:
         list: List of tuples containing (index, camera_name)
     """
-    try:
-        graph = FilterGraph()
-        devices = graph.get_input_devices()
-        
-        cameras = [(idx, name) for idx, name in enumerate(devices)]
-        
-        if cameras:
-            print("\n📷 Available Cameras:")
-            for idx, name in cameras:
-                print(f"  [{idx}] {name}")
-        else:
-            print("⚠️ No cameras detected")
-            
-        return cameras
-        
-    except Exception as e:
-        print(f"❌ Error listing cameras: {e}")
-        return []
+    cameras = list_camera_devices()
+
+    if cameras:
+        print("\n📷 Available Cameras:")
+        for idx, name in cameras:
+            print(f"  [{idx}] {name}")
+    else:
+        print("⚠️ No cameras detected")
+
+    return cameras
 
 
 def get_camera_indices_from_config(camera_config):
     """
     Get camera indices based on camera names from config.
-    
+
     Args:
         camera_config (dict): Configuration dictionary with camera names
-        
+
     Returns:
         dict: Dictionary with 'BIGFACE_INDEX' and 'OD_INDEX' keys
     """
     indices = {}
-    
+
     # Get Bigface camera index
     bf_name = camera_config.get('BIGFACE_NAME', '')
     bf_index = get_camera_index_by_name(bf_name)
-    
+
     if bf_index is not None:
         indices['BIGFACE_INDEX'] = bf_index
     else:
         print(f"⚠️ Bigface camera '{bf_name}' not found. Using fallback index 0")
         indices['BIGFACE_INDEX'] = 0
-    
+
     # Get OD camera index
     od_name = camera_config.get('OD_NAME', '')
     od_index = get_camera_index_by_name(od_name)
-    
+
     if od_index is not None:
         indices['OD_INDEX'] = od_index
     else:
         print(f"⚠️ OD camera '{od_name}' not found. Using fallback index 1")
         indices['OD_INDEX'] = 1
-    
+
     return indices
+
+
+def resolve_camera_sources(cameras: dict) -> dict:
+    """
+    Fill in the device index of every live camera from the cached device list.
+
+    Capture processes receive the resolved index and open the camera
+    directly instead of enumerating devices themselves.
+
+    Args:
+        cameras (dict): CAMERAS mapping from config.py
+
+    Returns:
+        dict: Copy of cameras with SOURCE['INDEX'] set for camera sources
+    """
+    resolved = {}
+    for camera_name, camera in cameras.items():
+        source = dict(camera['SOURCE'])
+        if source.get('TYPE', 'camera') == 'camera' and source.get('INDEX') is None:
+            index = get_camera_index_by_name(source.get('NAME', ''))
+            if index is None:
+                index = source.get('FALLBACK_INDEX', 0)
+                print(f"⚠️ {camera_name} camera '{source.get('NAME', '')}' not found. Using fallback index {index}")
+            source['INDEX'] = index
+        resolved[camera_name] = {**camera, 'SOURCE': source}
+    return resolved
+
+
+def _monitor_cameras(interval: float, stop_event, on_change):
+    """Background loop re-enumerating devices and reporting changes."""
+    if sys.platform.startswith("win"):
+        # DirectShow enumeration needs COM initialised on this thread
+        try:
+            import comtypes
+            comtypes.CoInitialize()
+        except ImportError:
+            pass
+
+    previous = refresh_camera_devices()
+    while not stop_event.wait(interval):
+        devices = refresh_camera_devices()
+        if devices != previous:
+            added = [device for device in devices if device not in previous]
+            removed = [device for device in previous if device not in devices]
+            for idx, name in added:
+                print(f"📷 Camera connected: [{idx}] {name}")
+            for idx, name in removed:
+                print(f"📷 Camera disconnected: [{idx}] {name}")
+            if on_change is not None:
+                on_change(devices)
+            previous = devices
+
+
+def start_camera_monitor(interval: float = 5.0, on_change=None):
+    """
+    Start a background thread that keeps the device cache fresh for hot-plug.
+
+    The first enumeration also runs on this thread, so calling this early
+    at startup takes enumeration off the critical path.
+
+    Args:
+        interval (float): Seconds between re-enumerations
+        on_change (callable): Optional callback receiving the new device list
+    """
+    if _monitor['thread'] is not None and _monitor['thread'].is_alive():
+        return
+
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=_monitor_cameras,
+        args=(interval, stop_event, on_change),
+        name="camera-monitor",
+        daemon=True
+    )
+    _monitor['thread'] = thread
+    _monitor['stop'] = stop_event
+    thread.start()
+
+
+def stop_camera_monitor():
+    """Stop the background device monitor, if running."""
+    if _monitor['stop'] is not None:
+        _monitor['stop'].set()
+    _monitor['thread'] = None
+    _monitor['stop'] = None
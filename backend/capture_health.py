@@ -0,0 +1,254 @@
+"""
+Capture health metrics and camera watchdog
+
+Each capture process owns a SharedMetrics block with the fields below. The
+hot loop only records one latency sample and a few counters per frame;
+rates and percentiles are recomputed once per publish interval. The GUI
+reads the block directly from shared memory, so showing the numbers never
+touches the capture process.
+
+The watchdog runs inside the capture process: when a live camera stops
+delivering frames it reopens the device with exponential backoff, so a
+cable blip is recovered without restarting inspection (inference processes
+keep their models loaded and simply see no new frames meanwhile).
+"""
+import time
+from typing import Optional
+
+import numpy as np
+
+from .metrics import SharedMetrics
+
+# Fields of the per-camera capture metrics block
+CAPTURE_METRICS = (
+    'frames',               # Frames published to the ring
+    'allocations',          # Frame-sized arrays allocated by the hot loop
+    'bytes_copied',         # Bytes written into frame buffers after decoding
+    'bytes_copied_last',    # Bytes written for the most recent frame
+    'fps',                  # Frames delivered per second over the last publish interval
+    'read_ms_p50',          # Source read latency percentiles over the recent window
+    'read_ms_p95',
+    'read_ms_p99',
+    'read_ms_max',
+    'failures',             # Failed reads since start
+    'consecutive_failures', # Failed reads since the last good frame
+    'dropped_frames',       # Frames missing from the stream (from frame intervals)
+    'gaps',                 # Number of intervals in which frames went missing
+    'last_frame_time',      # time.perf_counter() of the latest frame (0 = none yet)
+    'published_time',       # time.perf_counter() of the latest publish
+    'state',                # Index into CAPTURE_STATES
+    'stalls',               # Stalls detected by the watchdog
+    'reconnects',           # Successful reopen attempts
+    'recovery_ms_last',     # Last frame before a stall -> first frame after it
+    'open_started_time',    # time.perf_counter() when the capture process began opening the source
+    'first_frame_time'      # time.perf_counter() of the first frame (startup timeline)
+)
+
+# Watchdog states published in the 'state' field
+CAPTURE_STATES = ('stopped', 'connecting', 'streaming', 'reconnecting')
+
+# A frame interval longer than this many nominal periods counts as a gap
+GAP_TOLERANCE = 1.5
+
+
+def new_capture_metrics() -> SharedMetrics:
+    """Create the shared metrics block for one capture worker."""
+    return SharedMetrics(CAPTURE_METRICS)
+
+
+class CaptureHealth:
+    """
+    Records read outcomes in the capture process and publishes them to SharedMetrics.
+
+    Dropped frames are estimated from the spacing of frame timestamps against
+    the nominal frame rate, since OpenCV does not expose the camera's own
+    frame counter.
+    """
+
+    def __init__(self, metrics: SharedMetrics, nominal_fps: Optional[float] = None,
+                 window: int = 512, publish_interval: float = 1.0):
+        """
+        Args:
+            metrics: Block from new_capture_metrics()
+            nominal_fps: Expected frame rate; enables gap detection when set
+            window: Number of recent read latencies kept for the percentiles
+            publish_interval: Seconds between rate/percentile updates
+        """
+        self.metrics = metrics
+        self.period = 1.0 / nominal_fps if nominal_fps else None
+        self.publish_interval = publish_interval
+
+        self.latencies = np.zeros(window, dtype=np.float64)
+        self.samples = 0
+        self.last_frame_time = None
+        self.consecutive_failures = 0
+
+        self.interval_start = time.perf_counter()
+        self.interval_frames = 0
+
+    def record(self, ok: bool, read_started: float, read_finished: float) -> None:
+        """
+        Record one read of the frame source.
+
+        Args:
+            ok: Whether the read produced a frame
+            read_started: time.perf_counter() before the read
+            read_finished: time.perf_counter() after the read (the frame timestamp)
+        """
+        self.latencies[self.samples % len(self.latencies)] = read_finished - read_started
+        self.samples += 1
+
+        if ok:
+            if self.period is not None and self.last_frame_time is not None:
+                missing = round((read_finished - self.last_frame_time) / self.period) - 1
+                if missing > 0 and read_finished - self.last_frame_time > GAP_TOLERANCE * self.period:
+                    self.metrics.add('dropped_frames', missing)
+                    self.metrics.add('gaps')
+            self.last_frame_time = read_finished
+            self.interval_frames += 1
+            if self.consecutive_failures:
+                self.consecutive_failures = 0
+                self.metrics.set('consecutive_failures', 0)
+            self.metrics.set('last_frame_time', read_finished)
+        else:
+            self.consecutive_failures += 1
+            self.metrics.add('failures')
+            self.metrics.set('consecutive_failures', self.consecutive_failures)
+
+        if read_finished - self.interval_start >= self.publish_interval:
+            self.publish(read_finished)
+
+    def publish(self, now: Optional[float] = None) -> None:
+        """Recompute fps and latency percentiles and write them to shared memory."""
+        if now is None:
+            now = time.perf_counter()
+
+        elapsed = now - self.interval_start
+        if elapsed > 0:
+            self.metrics.set('fps', self.interval_frames / elapsed)
+        self.interval_start = now
+        self.interval_frames = 0
+
+        recent = self.latencies[:min(self.samples, len(self.latencies))]
+        if len(recent):
+            p50, p95, p99 = np.percentile(recent, (50, 95, 99)) * 1000.0
+            self.metrics.set('read_ms_p50', p50)
+            self.metrics.set('read_ms_p95', p95)
+            self.metrics.set('read_ms_p99', p99)
+            self.metrics.set('read_ms_max', recent.max() * 1000.0)
+        self.metrics.set('published_time', now)
+
+
+class CaptureWatchdog:
+    """
+    Detects stalled live cameras and reopens them with exponential backoff.
+
+    A camera counts as stalled after too many consecutive failed reads or
+    when no frame has arrived for the stall timeout. The backoff delay only
+    resets once a frame arrives, so a device that opens but never delivers
+    does not cause a tight reconnect loop.
+    """
+
+    def __init__(self, metrics: SharedMetrics, health: CaptureHealth, config: dict):
+        """
+        Args:
+            metrics: Block from new_capture_metrics()
+            health: CaptureHealth of the same capture loop
+            config: CAPTURE_WATCHDOG entry from config.py
+        """
+        self.metrics = metrics
+        self.health = health
+        self.stall_timeout = config.get('STALL_TIMEOUT_MS', 500) / 1000.0
+        self.max_failures = config.get('MAX_CONSECUTIVE_FAILURES', 10)
+        self.backoff_initial = config.get('BACKOFF_INITIAL_MS', 50) / 1000.0
+        self.backoff_max = config.get('BACKOFF_MAX_MS', 2000) / 1000.0
+
+        self.delay = self.backoff_initial
+        self.opened_at = time.perf_counter()
+        self.stalled_since = None
+
+    def set_state(self, state: str) -> None:
+        """Publish the watchdog state."""
+        self.metrics.set('state', CAPTURE_STATES.index(state))
+
+    def is_stalled(self, now: float) -> bool:
+        """True if the camera should be reopened."""
+        if self.health.consecutive_failures >= self.max_failures:
+            return True
+        # A freshly (re)opened device gets the full timeout to deliver its first frame
+        last_activity = max(self.health.last_frame_time or 0.0, self.opened_at)
+        return now - last_activity > self.stall_timeout
+
+    def on_frame(self, timestamp: float) -> None:
+        """Record a delivered frame; completes a recovery in progress."""
+        if self.stalled_since is not None:
+            self.metrics.set('recovery_ms_last', (timestamp - self.stalled_since) * 1000.0)
+            self.stalled_since = None
+            self.delay = self.backoff_initial
+            self.set_state('streaming')
+
+    def reconnect(self, source, camera_name: str) -> None:
+        """
+        Reopen the source until it opens again, sleeping with exponential backoff.
+
+        Args:
+            source: FrameSource to reopen
+            camera_name: Camera key, for logging
+        """
+        if self.stalled_since is None:
+            self.stalled_since = self.health.last_frame_time or time.perf_counter()
+            self.metrics.add('stalls')
+            print(f"⚠️ {camera_name} {source.description} stalled. Reconnecting...")
+        self.set_state('reconnecting')
+
+        attempt = 0
+        while True:
+            attempt += 1
+            # The device may have been renumbered after a replug
+            if source.reopen(rediscover=attempt > 1):
+                break
+            if attempt == 1 or attempt % 10 == 0:
+                print(f"⚠️ {camera_name} reopen attempt {attempt} failed. Retrying in {self.delay * 1000:.0f} ms")
+            time.sleep(self.delay)
+            self.delay = min(self.delay * 2, self.backoff_max)
+
+        print(f"✅ {camera_name} reopened {source.description} after {attempt} attempt(s)")
+        self.metrics.add('reconnects')
+        self.health.consecutive_failures = 0
+        self.metrics.set('consecutive_failures', 0)
+        self.opened_at = time.perf_counter()
+
+
+def capture_health_summary(snapshot: dict, stale_after: float = 2.0) -> dict:
+    """
+    Interpret a capture metrics snapshot for display.
+
+    Args:
+        snapshot: SharedMetrics.snapshot() of a capture metrics block
+        stale_after: Seconds without a frame after which the camera counts as stalled
+
+    Returns:
+        Dict with 'state' ('waiting', 'ok', 'failing', 'stalled' or 'reconnecting') and 'text'
+    """
+    now = time.perf_counter()
+    last_frame = snapshot['last_frame_time']
+
+    if CAPTURE_STATES[int(snapshot['state'])] == 'reconnecting':
+        state = 'reconnecting'
+    elif snapshot['consecutive_failures'] > 0:
+        state = 'failing'
+    elif not last_frame:
+        state = 'waiting'
+    elif now - last_frame > stale_after:
+        state = 'stalled'
+    else:
+        state = 'ok'
+
+    text = (
+        f"{snapshot['fps']:.1f} fps | read p50/p95/p99 "
+        f"{snapshot['read_ms_p50']:.1f}/{snapshot['read_ms_p95']:.1f}/{snapshot['read_ms_p99']:.1f} ms | "
+        f"dropped {int(snapshot['dropped_frames'])} | fails {int(snapshot['consecutive_failures'])}"
+    )
+    if snapshot['reconnects']:
+        text += f" | reconnects {int(snapshot['reconnects'])} ({snapshot['recovery_ms_last']:.0f} ms)"
+    return {'state': state, 'text': text}
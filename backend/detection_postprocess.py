@@ -0,0 +1,110 @@
+"""
+Vectorized detection post-processing
+
+Turns the (N, 6) detection array of one frame into defect-to-roller
+assignments without per-box Python work:
+
+1. boxes are ordered left to right (stable sort on the integer x1),
+2. class and confidence masks split rollers from defects,
+3. a containment matrix marks which rollers hold a corner of each defect,
+4. argmax picks the first (leftmost) matching roller for every defect.
+
+The result is identical to the per-box point_inside() loops it replaces,
+including their roller numbering: with k rollers in view the leftmost one
+is the newest roller ID, and nothing is assigned while more rollers are in
+view than max_rollers.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+# Rollers below this confidence are not used for defect assignment
+ROLLER_CONFIDENCE = 0.80
+
+
+class DefectAssignment(NamedTuple):
+    """Defects of one frame in left-to-right order."""
+    classes: np.ndarray     # (D,) class IDs of the defects
+    roller_ids: np.ndarray  # (D,) roller ID each defect belongs to (0 = none)
+
+
+def find_class_index(class_names: dict, name: str):
+    """Class ID of the class with the given name, or None."""
+    return next((key for key, value in class_names.items() if value == name), None)
+
+
+def sort_detections(detections: np.ndarray):
+    """
+    Order detections left to right.
+
+    Args:
+        detections: Array of shape (N, 6) with x1, y1, x2, y2, conf, cls
+
+    Returns:
+        (boxes, confidences, classes): int64 (N, 4) pixel boxes sorted by x1
+        (stable, so ties keep model order), float64 confidences, int64 class IDs
+    """
+    boxes = detections[:, :4].astype(np.int64)
+    order = np.argsort(boxes[:, 0], kind='stable')
+    # Compare in float64 like the per-box code did with float(conf)
+    return boxes[order], detections[order, 4].astype(np.float64), detections[order, 5].astype(np.int64)
+
+
+def corner_containment(defects: np.ndarray, rollers: np.ndarray) -> np.ndarray:
+    """
+    Matrix of which rollers contain a corner of which defect.
+
+    Args:
+        defects: (D, 4) integer boxes
+        rollers: (R, 4) integer boxes
+
+    Returns:
+        Boolean (D, R) array; True if corner (x1, y1) or (x2, y2) of the
+        defect lies in the roller box (edges inclusive)
+    """
+    rx1, ry1, rx2, ry2 = (rollers[:, i][None, :] for i in range(4))
+    dx1, dy1, dx2, dy2 = (defects[:, i][:, None] for i in range(4))
+    return (
+        ((rx1 <= dx1) & (dx1 <= rx2) & (ry1 <= dy1) & (dy1 <= ry2)) |
+        ((rx1 <= dx2) & (dx2 <= rx2) & (ry1 <= dy2) & (dy2 <= ry2))
+    )
+
+
+def assign_defects(detections: np.ndarray, roller_class: int, roller_number: int, max_rollers: int,
+                   roller_conf: float = ROLLER_CONFIDENCE) -> DefectAssignment:
+    """
+    Assign every defect detection to a roller ID.
+
+    Args:
+        detections: Array of shape (N, 6) with x1, y1, x2, y2, conf, cls
+        roller_class: Class ID of the roller class
+        roller_number: ID of the newest roller that has entered the view
+        max_rollers: Rollers that can be in view at once (2 for BF, 3 for OD)
+        roller_conf: Minimum confidence of rollers used for the assignment
+
+    Returns:
+        DefectAssignment with the defects sorted by x1
+    """
+    if len(detections) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return DefectAssignment(empty, empty)
+
+    boxes, confidences, classes = sort_detections(detections)
+
+    is_roller = classes == roller_class
+    rollers = boxes[is_roller & (confidences > roller_conf)]
+    defects = boxes[~is_roller]
+    defect_classes = classes[~is_roller]
+
+    roller_ids = np.zeros(len(defects), dtype=np.int64)
+    check = min(roller_number, max_rollers)
+    if len(defects) == 0 or len(rollers) == 0 or len(rollers) > check:
+        return DefectAssignment(defect_classes, roller_ids)
+
+    inside = corner_containment(defects, rollers)
+
+    # Leftmost roller is the newest: IDs count down from roller_number
+    ids = roller_number - np.arange(len(rollers))
+    matched = inside.any(axis=1)
+    roller_ids[matched] = ids[inside.argmax(axis=1)[matched]]
+    return DefectAssignment(defect_classes, roller_ids)
@@ -0,0 +1,164 @@
+"""
+Shared-memory ring of detection results
+
+The inference loops publish compact detection arrays (x1, y1, x2, y2, conf,
+cls) instead of annotated copies of the frame. Each entry records which
+ring the inferred frame lives in (camera ring or latch ring) and its
+sequence number there, so a consumer that wants a picture (the GUI canvas)
+fetches the raw frame itself and draws at its own resolution.
+
+Uses the same single-writer seqlock scheme as SharedFrameRing.
+"""
+import time
+from multiprocessing import RawArray, RawValue
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+# Ring the inferred frame was read from
+SOURCE_FRAME_RING = 0
+SOURCE_LATCH_RING = 1
+
+
+def class_names_key(model_key: str) -> str:
+    """shared_data key of a model's class names (published by the process running it)."""
+    return f"class_names_{model_key}"
+
+
+class DetectionPacket(NamedTuple):
+    """Detections of one inferred frame."""
+    seq: int
+    timestamp: float
+    frame_seq: int          # Sequence number of the frame in its source ring
+    source: int             # SOURCE_FRAME_RING or SOURCE_LATCH_RING
+    detections: np.ndarray  # (N, 6) float32 in full-frame pixels
+
+
+class DetectionRing:
+    """Fixed-size ring of detection arrays in shared memory."""
+
+    # Per-slot metadata layout
+    META_SEQ = 0
+    META_TIMESTAMP = 1
+    META_FRAME_SEQ = 2
+    META_SOURCE = 3
+    META_COUNT = 4
+    META_FIELDS = 5
+
+    def __init__(self, max_detections: int = 300, slots: int = 8):
+        """
+        Args:
+            max_detections: Boxes kept per entry (extra boxes are dropped)
+            slots: Number of entries kept in the ring
+        """
+        if slots < 2:
+            raise ValueError("DetectionRing needs at least 2 slots")
+
+        self.max_detections = max_detections
+        self.slots = slots
+
+        self._detections = RawArray('f', slots * max_detections * 6)
+        self._meta = RawArray('d', self.META_FIELDS * slots)
+        self._versions = RawArray('q', slots)  # Seqlock counters, odd = being written
+        self._head = RawValue('q', 0)  # Last published sequence number, 0 = empty
+
+        self._detections_np = None
+        self._meta_np = None
+        self._versions_np = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # numpy views are rebuilt lazily in the receiving process
+        state['_detections_np'] = None
+        state['_meta_np'] = None
+        state['_versions_np'] = None
+        return state
+
+    def _views(self):
+        if self._detections_np is None:
+            self._detections_np = np.frombuffer(self._detections, dtype=np.float32).reshape(self.slots, self.max_detections, 6)
+            self._meta_np = np.frombuffer(self._meta, dtype=np.float64).reshape(self.slots, self.META_FIELDS)
+            self._versions_np = np.frombuffer(self._versions, dtype=np.int64)
+        return self._detections_np, self._meta_np, self._versions_np
+
+    @property
+    def latest_seq(self) -> int:
+        """Sequence number of the most recently published entry (0 if none)."""
+        return self._head.value
+
+    def write(self, detections, frame_seq: int, source: int = SOURCE_FRAME_RING, timestamp: Optional[float] = None) -> int:
+        """
+        Publish the detections of one frame.
+
+        Args:
+            detections: Array of shape (N, 6) with x1, y1, x2, y2, conf, cls
+            frame_seq: Sequence number of the inferred frame in its source ring
+            source: SOURCE_FRAME_RING or SOURCE_LATCH_RING
+            timestamp: Capture time of the frame; defaults to now
+
+        Returns:
+            Sequence number assigned to the entry
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        boxes, meta, versions = self._views()
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 6)[:self.max_detections]
+        slot = (self._head.value + 1) % self.slots
+        seq = self._head.value + 1
+
+        versions[slot] += 1  # Odd: readers of this slot will retry
+        boxes[slot, :len(detections)] = detections
+        meta[slot, self.META_SEQ] = seq
+        meta[slot, self.META_TIMESTAMP] = timestamp
+        meta[slot, self.META_FRAME_SEQ] = frame_seq
+        meta[slot, self.META_SOURCE] = source
+        meta[slot, self.META_COUNT] = len(detections)
+        versions[slot] += 1  # Even: slot is consistent again
+
+        self._head.value = seq
+        return seq
+
+    def get(self, seq: int) -> Optional[DetectionPacket]:
+        """
+        Read the entry with an exact sequence number.
+
+        Returns:
+            DetectionPacket, or None if it was never written or has been overwritten
+        """
+        if seq <= 0 or seq > self._head.value:
+            return None
+
+        boxes, meta, versions = self._views()
+        slot = seq % self.slots
+        while True:
+            version = int(versions[slot])
+            if version & 1:
+                continue
+            labels = meta[slot].copy()
+            if int(labels[self.META_SEQ]) != seq:
+                return None
+            detections = boxes[slot, :int(labels[self.META_COUNT])].copy()
+            if int(versions[slot]) == version:
+                return DetectionPacket(
+                    seq,
+                    float(labels[self.META_TIMESTAMP]),
+                    int(labels[self.META_FRAME_SEQ]),
+                    int(labels[self.META_SOURCE]),
+                    detections
+                )
+
+    def latest(self) -> Optional[DetectionPacket]:
+        """
+        Read the most recently published entry.
+
+        Returns:
+            DetectionPacket, or None if nothing has been written yet
+        """
+        while True:
+            head = self._head.value
+            if head == 0:
+                return None
+            packet = self.get(head)
+            if packet is not None:
+                return packet
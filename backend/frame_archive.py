@@ -0,0 +1,233 @@
+"""
+Append-only frame archive for all-frames mode
+
+Instead of one JPEG file per inferred frame, all-frames mode appends
+encoded frames to rolling segment files. A segment is a single file:
+
+    file header   b'WFA1' + format version
+    records       header (frame number, roller ID, wall-clock timestamp,
+                  detection count, JPEG size), the (N, 6) float32
+                  detections, then the JPEG bytes
+    footer        written when the segment is closed: the offset index of
+                  every record plus a trailer pointing at it
+
+Writes go through a buffered file, so a frame costs a fraction of a
+write() call instead of a create, a directory-entry update, a write and a
+close. Segment names carry the session start time, so a new session never
+overwrites earlier frames. Segments left without a footer (process killed)
+are still readable: the reader falls back to scanning their records.
+"""
+import os
+import struct
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import cv2
+import numpy as np
+
+SEGMENT_EXTENSION = ".wfa"
+
+_FILE_MAGIC = b'WFA1'
+_FILE_HEADER = struct.Struct('<4sH')           # magic, version
+_FORMAT_VERSION = 1
+_RECORD_MAGIC = b'FREC'
+_RECORD_HEADER = struct.Struct('<4sQqdII')     # magic, frame number, roller ID, timestamp, detections, JPEG size
+_INDEX_ENTRY = struct.Struct('<QQqdII')        # offset, frame number, roller ID, timestamp, detections, JPEG size
+_TRAILER_MAGIC = b'FIDX'
+_TRAILER = struct.Struct('<4sQI')              # magic, index offset, record count
+
+
+class ArchiveRecord(NamedTuple):
+    """Location and metadata of one archived frame."""
+    segment: str
+    offset: int             # Start of the record header in the segment
+    frame_number: int
+    roller_id: int
+    timestamp: float        # time.time() when the frame was archived
+    detections: int         # Number of detections stored with the frame
+    jpeg_size: int
+
+
+class FrameArchiveWriter:
+    """Appends frames to rolling segment files in one directory."""
+
+    def __init__(self, directory: str, prefix: str = "frames", segment_mb: float = 256, jpeg_quality: int = 90,
+                 buffer_kb: int = 1024, on_segment_closed=None):
+        """
+        Args:
+            directory: Directory receiving the segments
+            prefix: Start of the segment file names
+            segment_mb: Size at which a segment is closed and a new one started
+            jpeg_quality: cv2 JPEG quality of the archived frames
+            buffer_kb: Write buffer per segment
+            on_segment_closed: Callable(path, size) run after a segment is closed
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_bytes = int(segment_mb * 1024 * 1024)
+        self.encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+        self.buffer_bytes = int(buffer_kb * 1024)
+        self.on_segment_closed = on_segment_closed
+
+        self.session = time.strftime("%Y%m%d_%H%M%S")
+        self.segment_number = 0
+        self.lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._index = []
+
+    def append(self, image, frame_number: int, roller_id: int = 0, timestamp: float = None, detections=None) -> ArchiveRecord:
+        """
+        Encode a frame and append it to the current segment.
+
+        Args:
+            image: BGR frame
+            frame_number: Frame number within the session
+            roller_id: Roller the frame belongs to (0 = unknown)
+            timestamp: time.time() of the frame; defaults to now
+            detections: Optional (N, 6) array of x1, y1, x2, y2, conf, cls
+
+        Returns:
+            ArchiveRecord of the appended frame
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        ok, jpeg = cv2.imencode('.jpg', image, self.encode_params)
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        boxes = np.ascontiguousarray(
+            np.zeros((0, 6), dtype=np.float32) if detections is None else np.asarray(detections, dtype=np.float32).reshape(-1, 6)
+        )
+        header = _RECORD_HEADER.pack(_RECORD_MAGIC, frame_number, roller_id, timestamp, len(boxes), len(jpeg))
+
+        # Encoding ran outside the lock, so several writer threads can encode at once
+        with self.lock:
+            if self._file is None:
+                self._open_segment()
+            offset = self._file.tell()
+            self._file.write(header + boxes.tobytes() + jpeg.tobytes())
+            self._index.append((offset, frame_number, roller_id, timestamp, len(boxes), len(jpeg)))
+            record = ArchiveRecord(self._path, offset, frame_number, roller_id, timestamp, len(boxes), len(jpeg))
+            if self._file.tell() >= self.segment_bytes:
+                self._close_segment()
+        return record
+
+    def close(self) -> None:
+        """Close the current segment (writes its footer)."""
+        with self.lock:
+            if self._file is not None:
+                self._close_segment()
+
+    def _open_segment(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.segment_number += 1
+        name = f"{self.prefix}_{self.session}_{os.getpid()}_{self.segment_number:05d}{SEGMENT_EXTENSION}"
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path, "wb", buffering=self.buffer_bytes)
+        self._file.write(_FILE_HEADER.pack(_FILE_MAGIC, _FORMAT_VERSION))
+        self._index = []
+
+    def _close_segment(self):
+        index_offset = self._file.tell()
+        self._file.write(b''.join(_INDEX_ENTRY.pack(*entry) for entry in self._index))
+        self._file.write(_TRAILER.pack(_TRAILER_MAGIC, index_offset, len(self._index)))
+        size = self._file.tell()
+        self._file.close()
+        path = self._path
+        self._file = None
+        self._path = None
+        if self.on_segment_closed is not None:
+            self.on_segment_closed(path, size)
+
+
+def list_segments(directory: str) -> list:
+    """Segment files of a directory, oldest first (names sort by session and number)."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(SEGMENT_EXTENSION)
+    )
+
+
+class FrameArchiveReader:
+    """Reads frames from one segment file or a directory of segments."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Segment file or directory of segments
+        """
+        self.segments = list_segments(path) if os.path.isdir(path) else [path]
+
+    def records(self):
+        """Yield an ArchiveRecord for every frame, segment by segment."""
+        for segment in self.segments:
+            yield from self.segment_records(segment)
+
+    def segment_records(self, segment: str) -> list:
+        """
+        Records of one segment, from its footer or, for an unclosed segment, by scanning it.
+
+        Returns:
+            List of ArchiveRecord in write order
+        """
+        with open(segment, "rb") as f:
+            magic, _ = _FILE_HEADER.unpack(f.read(_FILE_HEADER.size))
+            if magic != _FILE_MAGIC:
+                raise ValueError(f"{segment} is not a frame archive segment")
+
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size >= _FILE_HEADER.size + _TRAILER.size:
+                f.seek(size - _TRAILER.size)
+                magic, index_offset, count = _TRAILER.unpack(f.read(_TRAILER.size))
+                if magic == _TRAILER_MAGIC and index_offset + count * _INDEX_ENTRY.size + _TRAILER.size == size:
+                    f.seek(index_offset)
+                    data = f.read(count * _INDEX_ENTRY.size)
+                    return [ArchiveRecord(segment, *entry) for entry in _INDEX_ENTRY.iter_unpack(data)]
+
+            return self._scan(f, segment, size)
+
+    @staticmethod
+    def _scan(f, segment, size):
+        records = []
+        offset = _FILE_HEADER.size
+        while offset + _RECORD_HEADER.size <= size:
+            f.seek(offset)
+            magic, frame_number, roller_id, timestamp, count, jpeg_size = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+            end = offset + _RECORD_HEADER.size + count * 24 + jpeg_size
+            if magic != _RECORD_MAGIC or end > size:
+                break  # Footer or a record cut off by a crash
+            records.append(ArchiveRecord(segment, offset, frame_number, roller_id, timestamp, count, jpeg_size))
+            offset = end
+        return records
+
+    def find(self, roller_id: Optional[int] = None, frame_number: Optional[int] = None) -> list:
+        """Records matching a roller ID and/or frame number."""
+        return [
+            record for record in self.records()
+            if (roller_id is None or record.roller_id == roller_id)
+            and (frame_number is None or record.frame_number == frame_number)
+        ]
+
+    @staticmethod
+    def _read_payload(record: ArchiveRecord):
+        with open(record.segment, "rb") as f:
+            f.seek(record.offset + _RECORD_HEADER.size)
+            boxes = f.read(record.detections * 24)
+            jpeg = f.read(record.jpeg_size)
+        return boxes, jpeg
+
+    def read_jpeg(self, record: ArchiveRecord) -> bytes:
+        """Encoded JPEG of a record, exactly as archived."""
+        return self._read_payload(record)[1]
+
+    def read_detections(self, record: ArchiveRecord) -> np.ndarray:
+        """(N, 6) float32 detections stored with a record."""
+        boxes, _ = self._read_payload(record)
+        return np.frombuffer(boxes, dtype=np.float32).reshape(-1, 6).copy()
+
+    def read_image(self, record: ArchiveRecord) -> np.ndarray:
+        """Decoded BGR frame of a record."""
+        return cv2.imdecode(np.frombuffer(self.read_jpeg(record), dtype=np.uint8), cv2.IMREAD_COLOR)
@@ -0,0 +1,327 @@
+"""
+Shared-memory frame ring buffer for camera feeds
+
+Each ring holds N frames in one shared block. Every frame is stamped with a
+monotonically increasing sequence number (starting at 1) and its capture
+timestamp from time.perf_counter(), which is a system-wide clock and can be
+compared across processes on the same host.
+
+Publication is lock-free: every slot has a seqlock version counter that the
+single writer makes odd while it fills the slot and even once it is done.
+Readers copy without locking and retry only if the version moved underneath
+them (a torn read), so the capture process never waits on a reader. This
+relies on the store ordering of x86 line PCs.
+
+Writers can either copy a finished frame in with write() or claim the next
+slot with begin_write(), produce the frame straight into shared memory and
+publish it with commit().
+"""
+import time
+from multiprocessing import RawArray, RawValue
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class FramePacket(NamedTuple):
+    """A frame read from a SharedFrameRing."""
+    seq: int
+    timestamp: float
+    frame: np.ndarray
+    roller_id: int = 0      # Roller the frame was latched for (latch rings only)
+    tag: int = 0            # Sensor index that triggered the latch (latch rings only)
+    source_seq: int = 0     # Sequence number in the camera ring the frame was copied from
+
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of frames in shared memory.
+
+    A single process writes frames; any number of processes read them by
+    "latest", "next after seq X" or "closest to time T". Instances are
+    passed to processes as Process args. With slots=3 the ring doubles as a
+    lock-free triple buffer for display frames.
+    """
+
+    # Per-slot metadata layout
+    META_SEQ = 0
+    META_TIMESTAMP = 1
+    META_ROLLER_ID = 2
+    META_TAG = 3
+    META_SOURCE_SEQ = 4
+    META_FIELDS = 5
+
+    def __init__(self, frame_shape, slots: int = 16):
+        """
+        Args:
+            frame_shape: Shape of one frame (height, width, channels)
+            slots: Number of frames kept in the ring
+        """
+        if slots < 2:
+            raise ValueError("SharedFrameRing needs at least 2 slots")
+
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        self.frame_size = int(np.prod(self.frame_shape))
+
+        self._frames = RawArray('B', self.frame_size * slots)
+        self._meta = RawArray('d', self.META_FIELDS * slots)
+        self._versions = RawArray('q', slots)  # Seqlock counters, odd = being written
+        self._head = RawValue('q', 0)  # Last published sequence number, 0 = empty
+
+        self._frames_np = None
+        self._meta_np = None
+        self._versions_np = None
+
+        # Process-local count of reads that had to be retried
+        self.torn_reads = 0
+        # Slot claimed by begin_write(), writer process only
+        self._pending_slot = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # numpy views are rebuilt lazily in the receiving process
+        state['_frames_np'] = None
+        state['_meta_np'] = None
+        state['_versions_np'] = None
+        state['torn_reads'] = 0
+        return state
+
+    def _views(self):
+        if self._frames_np is None:
+            self._frames_np = np.frombuffer(self._frames, dtype=np.uint8).reshape((self.slots,) + self.frame_shape)
+            self._meta_np = np.frombuffer(self._meta, dtype=np.float64).reshape(self.slots, self.META_FIELDS)
+            self._versions_np = np.frombuffer(self._versions, dtype=np.int64)
+        return self._frames_np, self._meta_np, self._versions_np
+
+    @property
+    def latest_seq(self) -> int:
+        """Sequence number of the most recently published frame (0 if none)."""
+        return self._head.value
+
+    def wait_for_new(self, after_seq: int, timeout: Optional[float] = None, poll_interval: float = 0.0005) -> int:
+        """
+        Block until a frame newer than after_seq is published.
+
+        Args:
+            after_seq: Last sequence number the caller has consumed
+            timeout: Seconds to wait at most (None = forever)
+            poll_interval: Sleep between checks of the head
+
+        Returns:
+            The new head sequence number, or 0 on timeout
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            head = self._head.value
+            if head > after_seq:
+                return head
+            if deadline is not None and time.perf_counter() >= deadline:
+                return 0
+            time.sleep(poll_interval)
+
+    def write(self, frame, timestamp: Optional[float] = None, roller_id: int = 0, tag: int = 0, source_seq: int = 0) -> int:
+        """
+        Publish a frame into the next slot of the ring.
+
+        Args:
+            frame: Frame to copy (must match frame_shape)
+            timestamp: Capture time (time.perf_counter()); defaults to now
+            roller_id: Roller the frame belongs to, if known
+            tag: Sensor index that triggered a latch
+            source_seq: Sequence number of the frame in its camera ring
+
+        Returns:
+            Sequence number assigned to the frame
+        """
+        np.copyto(self.begin_write(), frame)
+        return self.commit(timestamp, roller_id=roller_id, tag=tag, source_seq=source_seq)
+
+    def begin_write(self) -> np.ndarray:
+        """
+        Claim the next slot so a frame can be produced directly into shared memory.
+
+        Readers skip the slot until commit() or abort(). Only one write may be
+        in progress at a time.
+
+        Returns:
+            Writable view of the slot (frame_shape, uint8, C-contiguous)
+        """
+        frames, meta, versions = self._views()
+        slot = (self._head.value + 1) % self.slots
+
+        versions[slot] += 1  # Odd: readers of this slot will retry
+        meta[slot, self.META_SEQ] = 0  # The frame it held is gone
+        self._pending_slot = slot
+        return frames[slot]
+
+    def commit(self, timestamp: Optional[float] = None, roller_id: int = 0, tag: int = 0, source_seq: int = 0) -> int:
+        """
+        Publish the slot claimed by begin_write().
+
+        Args:
+            timestamp: Capture time (time.perf_counter()); defaults to now
+            roller_id: Roller the frame belongs to, if known
+            tag: Sensor index that triggered a latch
+            source_seq: Sequence number of the frame in its camera ring
+
+        Returns:
+            Sequence number assigned to the frame
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        _, meta, versions = self._views()
+        slot = self._pending_slot
+        seq = self._head.value + 1
+
+        meta[slot, self.META_SEQ] = seq
+        meta[slot, self.META_TIMESTAMP] = timestamp
+        meta[slot, self.META_ROLLER_ID] = roller_id
+        meta[slot, self.META_TAG] = tag
+        meta[slot, self.META_SOURCE_SEQ] = source_seq
+        versions[slot] += 1  # Even: slot is consistent again
+        self._pending_slot = None
+
+        self._head.value = seq
+        return seq
+
+    def abort(self) -> None:
+        """Release the slot claimed by begin_write() without publishing it."""
+        _, _, versions = self._views()
+        versions[self._pending_slot] += 1  # Left empty (seq 0)
+        self._pending_slot = None
+
+    def _read_slot(self, slot: int, expected_seq: Optional[int] = None, out=None) -> Optional[FramePacket]:
+        frames, meta, versions = self._views()
+        if out is None:
+            out = np.empty(self.frame_shape, dtype=np.uint8)
+
+        while True:
+            version = int(versions[slot])
+            if version & 1:
+                # A slot held open by begin_write() no longer has the requested frame
+                if expected_seq is not None and int(meta[slot, self.META_SEQ]) != expected_seq:
+                    return None
+                self.torn_reads += 1
+                continue
+
+            seq = int(meta[slot, self.META_SEQ])
+            if seq == 0 or (expected_seq is not None and seq != expected_seq):
+                return None
+            labels = meta[slot].copy()
+            np.copyto(out, frames[slot])
+
+            if int(versions[slot]) == version:
+                return FramePacket(
+                    seq,
+                    float(labels[self.META_TIMESTAMP]),
+                    out,
+                    int(labels[self.META_ROLLER_ID]),
+                    int(labels[self.META_TAG]),
+                    int(labels[self.META_SOURCE_SEQ])
+                )
+            self.torn_reads += 1
+
+    def get(self, seq: int, out=None) -> Optional[FramePacket]:
+        """
+        Read the frame with an exact sequence number.
+
+        Args:
+            seq: Sequence number to read
+            out: Optional preallocated array to copy the frame into
+
+        Returns:
+            FramePacket, or None if the frame was never written or has been overwritten
+        """
+        if seq <= 0 or seq > self._head.value:
+            return None
+        return self._read_slot(seq % self.slots, expected_seq=seq, out=out)
+
+    def latest(self, out=None) -> Optional[FramePacket]:
+        """
+        Read the most recently published frame.
+
+        Returns:
+            FramePacket, or None if nothing has been written yet
+        """
+        while True:
+            head = self._head.value
+            if head == 0:
+                return None
+            packet = self.get(head, out=out)
+            if packet is not None:
+                return packet
+
+    def next_after(self, seq: int, out=None) -> Optional[FramePacket]:
+        """
+        Read the oldest frame still in the ring with a sequence number above seq.
+
+        If the reader has fallen more than a full ring behind, frames in
+        between are lost; the gap is visible through the returned seq.
+
+        Args:
+            seq: Last sequence number the caller has consumed
+            out: Optional preallocated array to copy the frame into
+
+        Returns:
+            FramePacket, or None if no newer frame is available
+        """
+        while True:
+            head = self._head.value
+            if head <= seq:
+                return None
+            # Stay one slot clear of the writer's next target
+            oldest = max(1, head - self.slots + 2)
+            packet = self.get(max(seq + 1, oldest), out=out)
+            if packet is not None:
+                return packet
+
+    def closest_to(self, timestamp: float, out=None) -> Optional[FramePacket]:
+        """
+        Read the frame whose capture timestamp is closest to a given time.
+
+        Args:
+            timestamp: Target time on the time.perf_counter() clock
+            out: Optional preallocated array to copy the frame into
+
+        Returns:
+            FramePacket, or None if nothing has been written yet
+        """
+        _, meta, _ = self._views()
+        while True:
+            # Candidate selection may see a slot mid-write; get() validates it
+            seqs = meta[:, self.META_SEQ].copy()
+            stamps = meta[:, self.META_TIMESTAMP].copy()
+            valid = seqs > 0
+            if not valid.any():
+                return None
+            deltas = np.where(valid, np.abs(stamps - timestamp), np.inf)
+            slot = int(np.argmin(deltas))
+            packet = self.get(int(seqs[slot]), out=out)
+            if packet is not None:
+                return packet
+
+    def frames_for_roller(self, roller_id: int, tag: Optional[int] = None) -> list:
+        """
+        Read every frame still in the ring that was latched for a roller.
+
+        Args:
+            roller_id: Roller ID to look up
+            tag: Optional sensor index to restrict the lookup to
+
+        Returns:
+            List of FramePackets ordered by sequence number
+        """
+        _, meta, _ = self._views()
+        matches = meta[:, self.META_ROLLER_ID] == roller_id
+        if tag is not None:
+            matches &= meta[:, self.META_TAG] == tag
+
+        packets = []
+        for seq in sorted(int(value) for value in meta[matches, self.META_SEQ] if value > 0):
+            packet = self.get(seq)
+            # The slot may have been reused since the metadata scan
+            if packet is not None and packet.roller_id == roller_id and (tag is None or packet.tag == tag):
+                packets.append(packet)
+        return packets
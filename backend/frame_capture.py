@@ -1,84 +1,373 @@
 """
 Frame capture module for camera feeds
+
+One generic capture worker runs per entry in CAMERAS (config.py). The
+per-camera configuration decides the frame source, resolution, fps,
+flip/rotation and ROI; the worker writes into that camera's frame ring.
+When PLC sensor edges are configured for the camera, the worker also
+latches the frame(s) nearest to each edge into the camera's latch ring.
+
+With ZERO_COPY enabled the worker decodes into a preallocated buffer (or
+straight into the ring slot when no transform is configured) and applies
+the flip/rotation directly into shared memory, so the hot loop allocates
+nothing per frame. Allocation and copy counters are published through a
+SharedMetrics block so the effect can be checked on the line, alongside the
+capture health metrics (delivered fps, read latency, failures, drops).
+
+Live cameras are supervised by a CaptureWatchdog that reopens a stalled or
+disconnected device with exponential backoff instead of exiting.
 """
 import cv2
-import sys
 import numpy as np
 import time
-from .camera_detector import get_camera_index_by_name
+from .frame_sources import create_frame_source, is_same_buffer
+from .capture_health import CAPTURE_STATES, CaptureHealth, CaptureWatchdog, new_capture_metrics
+from .preprocessing import compute_letterbox, new_model_input, letterbox_into
+
+ROTATIONS = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE
+}
 
 
-def capture_frames_bigface(shared_frame_bigface, frame_lock_bigface, frame_shape, camera_name):
+def get_camera_frame_shape(camera_config: dict) -> tuple:
     """
-    Continuously capture frames from the Bigface camera.
-    
+    Compute the shape of the frames a camera publishes after rotation and ROI.
+
     Args:
-        shared_frame_bigface: Shared memory array for frame storage
-        frame_lock_bigface: Lock for thread-safe frame access
-        frame_shape: Shape of the frame (height, width, channels)
-        camera_name: Name of the camera to find dynamically
+        camera_config: Camera entry from CAMERAS
+
+    Returns:
+        Frame shape (height, width, channels)
     """
-    
-    # Dynamically find camera index
-    camera_index = get_camera_index_by_name(camera_name)
-    
-    if camera_index is None:
-        print(f"⚠️ Camera '{camera_name}' not found. Using fallback index 0")
-        camera_index = 0
-    
-    cap = cv2.VideoCapture(camera_index)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 960)
-
-    if not cap.isOpened():
-        print(f"❌ Failed to open Bigface camera at index {camera_index}.")
-        sys.exit(1)
+    width, height = camera_config['RESOLUTION']
+    if camera_config.get('ROTATION', 0) in (90, 270):
+        width, height = height, width
 
+    roi = camera_config.get('ROI')
+    if roi:
+        width, height = roi[2], roi[3]
 
-    while True:
-        ret, frame = cap.read()
-        if ret:
-            with frame_lock_bigface:
-                np_frame = np.frombuffer(shared_frame_bigface.get_obj(), dtype=np.uint8).reshape(frame_shape)
-                np.copyto(np_frame, frame)
-        else:
-            print("Failed to capture frame from Bigface camera.")
-            time.sleep(0.1)
+    return (height, width, 3)
+
+
+def get_camera_raw_shape(camera_config: dict) -> tuple:
+    """Shape of the frames delivered by a camera's source, before any transform."""
+    width, height = camera_config['RESOLUTION']
+    return (height, width, 3)
+
+
+def transform_frame(frame, camera_config: dict):
+    """
+    Apply the configured flip, rotation and ROI crop to a raw frame.
+
+    Args:
+        frame: Frame as delivered by the source
+        camera_config: Camera entry from CAMERAS
+
+    Returns:
+        Transformed frame (the ROI crop is a view, not a copy)
+    """
+    flip = camera_config.get('FLIP')
+    if flip is not None:
+        frame = cv2.flip(frame, flip)
+
+    rotation = camera_config.get('ROTATION', 0)
+    if rotation:
+        frame = cv2.rotate(frame, ROTATIONS[rotation])
+
+    roi = camera_config.get('ROI')
+    if roi:
+        x, y, w, h = roi
+        frame = frame[y:y + h, x:x + w]
+
+    return frame
+
+
+class FrameTransformer:
+    """
+    Applies a camera's flip, rotation and ROI crop into a caller-owned buffer.
+
+    Intermediate buffers are allocated once here, so apply() never
+    allocates. The last operation writes straight into the destination.
+    """
+
+    def __init__(self, camera_config: dict):
+        """
+        Args:
+            camera_config: Camera entry from CAMERAS
+        """
+        self.flip = camera_config.get('FLIP')
+        self.rotation = camera_config.get('ROTATION', 0)
+        self.roi = camera_config.get('ROI')
+        self.raw_shape = get_camera_raw_shape(camera_config)
+
+        height, width = self.raw_shape[:2]
+        if self.rotation in (90, 270):
+            height, width = width, height
+        rotated_shape = (height, width, 3)
+
+        # Scratch space for every step that is not the last one
+        self._flipped = None
+        if self.flip is not None and (self.rotation or self.roi):
+            self._flipped = np.empty(self.raw_shape, dtype=np.uint8)
+        self._rotated = None
+        if self.rotation and self.roi:
+            self._rotated = np.empty(rotated_shape, dtype=np.uint8)
+
+    @property
+    def identity(self) -> bool:
+        """True if frames are published unchanged, so sources can decode into the ring slot."""
+        return self.flip is None and not self.rotation and not self.roi
+
+    def apply(self, frame, dst) -> int:
+        """
+        Transform a raw frame into dst.
 
+        Args:
+            frame: Raw frame from the source
+            dst: Destination buffer of the published frame shape
 
-def capture_frames_od(shared_frame_od, frame_lock_od, frame_shape, camera_name):
+        Returns:
+            Number of bytes written into buffers
+        """
+        copied = 0
+        if self.flip is not None:
+            target = dst if self._flipped is None else self._flipped
+            cv2.flip(frame, self.flip, dst=target)
+            frame = target
+            copied += target.nbytes
+
+        if self.rotation:
+            target = dst if self._rotated is None and not self.roi else self._rotated
+            cv2.rotate(frame, ROTATIONS[self.rotation], dst=target)
+            frame = target
+            copied += target.nbytes
+
+        if self.roi:
+            x, y, w, h = self.roi
+            frame = frame[y:y + h, x:x + w]
+
+        if frame is not dst:
+            np.copyto(dst, frame)
+            copied += dst.nbytes
+        return copied
+
+
+class FrameLatcher:
+    """
+    Copies the frames nearest to PLC sensor edges into a latch ring.
+
+    Runs inside the capture process: after every captured frame poll() reads
+    the edge board, and for each new edge latches the frame whose timestamp
+    is closest to the edge (plus the following frames if more than one is
+    configured), tagged with the roller ID from the PLC.
     """
-    Continuously capture frames from the OD camera.
-    
+
+    def __init__(self, camera_name, frame_ring, latch_ring, edge_board, latch_config):
+        """
+        Args:
+            camera_name: Key of the camera in CAMERAS
+            frame_ring: The camera's SharedFrameRing
+            latch_ring: SharedFrameRing receiving the latched frames
+            edge_board: SensorEdgeBoard written by the PLC process
+            latch_config: FRAME_LATCH entry from config.py
+        """
+        self.frame_ring = frame_ring
+        self.latch_ring = latch_ring
+        self.edge_board = edge_board
+        self.offset = latch_config.get('OFFSET_MS', 0) / 1000.0
+        self.frames_per_edge = latch_config.get('FRAMES_PER_EDGE', 1)
+        self.timeout = latch_config.get('TIMEOUT_MS', 100) / 1000.0
+
+        self.tags = [
+            edge_board.tag(name) for name, spec in latch_config['SENSORS'].items()
+            if spec['CAMERA'] == camera_name
+        ]
+        # Ignore edges that happened before this process started
+        self.seen = {tag: edge_board.read_index(tag).count for tag in self.tags}
+        self.pending = []
+        self.buffer = np.empty(frame_ring.frame_shape, dtype=np.uint8)
+
+    def poll(self, last_timestamp: float) -> None:
+        """
+        Pick up new sensor edges and latch any frames that are now available.
+
+        Args:
+            last_timestamp: Capture timestamp of the frame just written
+        """
+        for tag in self.tags:
+            edge = self.edge_board.read_index(tag)
+            if edge.count != self.seen[tag]:
+                self.seen[tag] = edge.count
+                self.pending.append({
+                    'tag': tag,
+                    'roller_id': edge.roller_id,
+                    'target': edge.timestamp + self.offset,
+                    'after_seq': None,
+                    'remaining': self.frames_per_edge
+                })
+
+        for latch in self.pending:
+            if latch['after_seq'] is None:
+                # Wait until a frame at or past the edge exists, so the nearest one is known
+                if last_timestamp < latch['target'] and time.perf_counter() - latch['target'] < self.timeout:
+                    continue
+                packet = self.frame_ring.closest_to(latch['target'], out=self.buffer)
+                self._latch(latch, packet)
+
+            while latch['remaining'] > 0 and self.frame_ring.latest_seq > latch['after_seq']:
+                packet = self.frame_ring.next_after(latch['after_seq'], out=self.buffer)
+                self._latch(latch, packet)
+
+        self.pending = [latch for latch in self.pending if latch['remaining'] > 0]
+
+    def _latch(self, latch, packet):
+        self.latch_ring.write(
+            packet.frame,
+            packet.timestamp,
+            roller_id=latch['roller_id'],
+            tag=latch['tag'],
+            source_seq=packet.seq
+        )
+        latch['after_seq'] = packet.seq
+        latch['remaining'] -= 1
+
+
+def capture_frames(camera_name, camera_config, frame_ring, latch_ring=None, edge_board=None, latch_config=None,
+                   model_ring=None, metrics=None, watchdog_config=None):
+    """
+    Continuously capture frames from one camera into its frame ring.
+
     Args:
-        shared_frame_od: Shared memory array for frame storage
-        frame_lock_od: Lock for thread-safe frame access
-        frame_shape: Shape of the frame (height, width, channels)
-        camera_name: Name of the camera to find dynamically
-    """    
-    # Dynamically find camera index
-    camera_index = get_camera_index_by_name(camera_name)
-    
-    if camera_index is None:
-        print(f"⚠️ Camera '{camera_name}' not found. Using fallback index 1")
-        camera_index = 1
-    
-    cap = cv2.VideoCapture(camera_index)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, frame_shape[1])
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, frame_shape[0])
-
-    if not cap.isOpened():
-        print(f"❌ Failed to open OD camera at index {camera_index}.")
-        return
+        camera_name: Key of the camera in CAMERAS (e.g. 'BIGFACE', 'OD')
+        camera_config: Camera entry from CAMERAS
+        frame_ring: SharedFrameRing receiving the captured frames
+        latch_ring: Optional SharedFrameRing receiving frames latched at PLC sensor edges
+        edge_board: SensorEdgeBoard written by the PLC process (required with latch_ring)
+        latch_config: FRAME_LATCH entry from config.py (required with latch_ring)
+        model_ring: Optional SharedFrameRing receiving ROI-cropped, letterboxed
+            model inputs built from camera_config['MODEL_INPUT']
+        metrics: Optional SharedMetrics from new_capture_metrics()
+        watchdog_config: CAPTURE_WATCHDOG entry from config.py (defaults apply when None)
+    """
+    if metrics is None:
+        metrics = new_capture_metrics()
+
+    latcher = None
+    if latch_ring is not None:
+        latcher = FrameLatcher(camera_name, frame_ring, latch_ring, edge_board, latch_config)
+        if not latcher.tags:
+            latcher = None
+
+    model_transform = None
+    if model_ring is not None:
+        model_input = camera_config['MODEL_INPUT']
+        model_transform = compute_letterbox(frame_ring.frame_shape, model_input['IMGSZ'], model_input.get('ROI'))
+        model_buffer = new_model_input(model_transform)
+
+    zero_copy = camera_config.get('ZERO_COPY', True)
+    transformer = FrameTransformer(camera_config)
+    raw_buffer = None
+    if zero_copy and not transformer.identity:
+        raw_buffer = np.empty(transformer.raw_shape, dtype=np.uint8)
+
+    if watchdog_config is None:
+        watchdog_config = {}
+    source_config = camera_config['SOURCE']
+    source = create_frame_source(
+        source_config,
+        transformer.raw_shape,
+        fps=camera_config.get('FPS'),
+        read_timeout_ms=watchdog_config.get('READ_TIMEOUT_MS')
+    )
+    if source_config.get('TYPE', 'camera') == 'camera':
+        nominal_fps = camera_config.get('FPS')
+    else:
+        nominal_fps = source_config.get('FPS')
+    health = CaptureHealth(metrics, nominal_fps)
+    watchdog = CaptureWatchdog(metrics, health, watchdog_config) if source.live else None
 
+    metrics.set('state', CAPTURE_STATES.index('connecting'))
+    metrics.set('open_started_time', time.perf_counter())
+    if not source.open():
+        print(f"❌ Failed to open {camera_name} {source.description}.")
+        if watchdog is None:
+            metrics.set('state', CAPTURE_STATES.index('stopped'))
+            return
+        watchdog.reconnect(source, camera_name)
+
+    print(f"✅ {camera_name} capturing from {source.description} ({'zero-copy' if zero_copy else 'copying'} path)")
+    metrics.set('state', CAPTURE_STATES.index('streaming'))
+    first_frame = True
 
     while True:
-        ret, frame = cap.read()
+        if watchdog is not None and watchdog.is_stalled(time.perf_counter()):
+            watchdog.reconnect(source, camera_name)
+
+        read_started = time.perf_counter()
+        if zero_copy:
+            slot = frame_ring.begin_write()
+            target = slot if raw_buffer is None else raw_buffer
+            ret, frame = source.read_into(target)
+            timestamp = time.perf_counter()
+            if not ret:
+                frame_ring.abort()
+            else:
+                copied = 0
+                if not is_same_buffer(frame, target):
+                    # The source could not decode in place
+                    metrics.add('allocations')
+                if frame is not slot:
+                    copied = transformer.apply(frame, slot)
+                frame = slot
+        else:
+            ret, frame = source.read()
+            timestamp = time.perf_counter()
+            if ret:
+                metrics.add('allocations')
+                copied = 0
+                if camera_config.get('FLIP') is not None:
+                    metrics.add('allocations')
+                    copied += frame.nbytes
+                if camera_config.get('ROTATION', 0):
+                    metrics.add('allocations')
+                    copied += frame.nbytes
+                frame = transform_frame(frame, camera_config)
+                copied += frame.nbytes
+
+        if ret or not source.exhausted:
+            health.record(ret, read_started, timestamp)
+
         if ret:
-            frame = cv2.flip(frame, -1)
-            with frame_lock_od:
-                np_frame = np.frombuffer(shared_frame_od.get_obj(), dtype=np.uint8).reshape(frame_shape)
-                np.copyto(np_frame, frame)
+            if zero_copy:
+                seq = frame_ring.commit(timestamp)
+            else:
+                seq = frame_ring.write(frame, timestamp)
+            if model_transform is not None:
+                letterbox_into(frame, model_buffer, model_transform)
+                model_ring.write(model_buffer, timestamp, source_seq=seq)
+                copied += model_buffer.nbytes
+
+            if first_frame:
+                metrics.set('first_frame_time', timestamp)
+                first_frame = False
+            metrics.add('frames')
+            metrics.add('bytes_copied', copied)
+            metrics.set('bytes_copied_last', copied)
+            if watchdog is not None:
+                watchdog.on_frame(timestamp)
+
+            if latcher is not None:
+                latcher.poll(timestamp)
+        elif source.exhausted:
+            print(f"{camera_name} {source.description} finished replaying.")
+            source.release()
+            metrics.set('state', CAPTURE_STATES.index('stopped'))
+            return
         else:
-            print("Failed to capture frame from OD camera.")
+            # Report the first failure of a streak, then every 100th
+            if health.consecutive_failures % 100 == 1:
+                print(f"Failed to capture frame from {camera_name} camera ({health.consecutive_failures} in a row).")
             time.sleep(0.01)
@@ -0,0 +1,76 @@
+"""
+Sequence-aware frame reading for the inference loops
+
+A FrameCursor remembers the sequence number of the last frame it handed
+out, so every published frame is inferred at most once: when the loop comes
+back before the camera has produced a new frame it waits instead of
+re-running the model on the same pixels. Frames published while the loop
+was busy show up as a gap in the sequence numbers and are counted as missed.
+"""
+from typing import Optional
+
+from .frame_buffer import FramePacket, SharedFrameRing
+from .metrics import SharedMetrics
+
+# Fields of the per-camera inference metrics block
+INFERENCE_METRICS = (
+    'frames_inferred',      # Continuous-mode frames run through the model
+    'latched_inferred',     # Sensor-latched frames run through the model
+    'duplicates_skipped',   # Times the loop found no new frame and waited instead of re-inferring
+    'frames_missed',        # Frames published but never inferred (overwritten while busy)
+    'frames_unsaved',       # Inferred frames not saved because the full frame was overwritten meanwhile
+    'inference_errors',     # Frames skipped because the model or inference server failed on them
+    'last_seq'              # Sequence number of the last inferred frame
+)
+
+
+def new_inference_metrics() -> SharedMetrics:
+    """Create the shared metrics block for one inference loop."""
+    return SharedMetrics(INFERENCE_METRICS)
+
+
+class FrameCursor:
+    """Hands out each frame of a SharedFrameRing at most once."""
+
+    def __init__(self, ring: SharedFrameRing, metrics: Optional[SharedMetrics] = None):
+        """
+        Args:
+            ring: Ring to read (the frame ring or the model-input ring)
+            metrics: Optional block from new_inference_metrics()
+        """
+        self.ring = ring
+        self.metrics = metrics if metrics is not None else new_inference_metrics()
+        self.last_seq = 0
+        self.waiting = False
+
+    def next(self, timeout: Optional[float] = None) -> Optional[FramePacket]:
+        """
+        Return the latest frame if it has not been handed out yet.
+
+        Waits up to timeout for a new frame; older frames that were
+        overwritten in the meantime are counted as missed.
+
+        Returns:
+            FramePacket, or None if no new frame arrived in time
+        """
+        if self.ring.latest_seq <= self.last_seq:
+            # Count each wait once, not every poll of it
+            if not self.waiting:
+                self.waiting = True
+                self.metrics.add('duplicates_skipped')
+            if not self.ring.wait_for_new(self.last_seq, timeout):
+                return None
+
+        packet = self.ring.latest()
+        if packet is None or packet.seq <= self.last_seq:
+            return None
+
+        if self.last_seq:
+            missed = packet.seq - self.last_seq - 1
+            if missed > 0:
+                self.metrics.add('frames_missed', missed)
+        self.last_seq = packet.seq
+        self.waiting = False
+        self.metrics.add('frames_inferred')
+        self.metrics.set('last_seq', packet.seq)
+        return packet
@@ -0,0 +1,323 @@
+"""
+Frame source backends for the capture processes
+
+A frame source hides where frames come from so the capture loop can feed
+the shared-memory rings from a live camera, a recorded video file or a
+folder of images. File-based sources replay at a configurable fps, or as
+fast as possible, which lets the inspection pipeline run offline.
+"""
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import cv2
+
+from .camera_detector import get_camera_index_by_name
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+def is_same_buffer(frame, buffer) -> bool:
+    """True if OpenCV returned the caller's buffer rather than a new allocation."""
+    return frame is buffer or (
+        frame is not None
+        and frame.shape == buffer.shape
+        and frame.__array_interface__['data'][0] == buffer.__array_interface__['data'][0]
+    )
+
+
+class _Pacer:
+    """Sleeps between reads to hold a target frame rate (no-op when fps is falsy)."""
+
+    def __init__(self, fps: Optional[float]):
+        self.period = 1.0 / fps if fps else 0.0
+        self.next_deadline = None
+
+    def wait(self):
+        if not self.period:
+            return
+        now = time.perf_counter()
+        if self.next_deadline is None:
+            self.next_deadline = now
+        remaining = self.next_deadline - now
+        if remaining > 0:
+            time.sleep(remaining)
+        else:
+            # Running behind: don't try to catch up with a burst of frames
+            self.next_deadline = now
+        self.next_deadline += self.period
+
+
+class FrameSource:
+    """
+    Base class for frame sources.
+
+    Subclasses implement open(), read() and release() with the same
+    contract as cv2.VideoCapture: read() returns (ret, frame). Sources that
+    can decode into a caller-owned buffer also override read_into().
+    """
+
+    description = "frame source"
+    # Live sources are watched for stalls and reopened by the capture watchdog
+    live = False
+
+    def __init__(self, frame_size=None):
+        """
+        Args:
+            frame_size: Optional (width, height) every frame is resized to
+        """
+        self.frame_size = tuple(frame_size) if frame_size else None
+        # Set when a non-looping file source has delivered its last frame
+        self.exhausted = False
+
+    def open(self) -> bool:
+        raise NotImplementedError
+
+    def read(self):
+        raise NotImplementedError
+
+    def read_into(self, buffer):
+        """
+        Read the next frame into a preallocated buffer where the backend allows it.
+
+        Args:
+            buffer: Writable array of the source's frame shape
+
+        Returns:
+            (ret, frame) where frame is buffer when it was filled in place,
+            otherwise a newly allocated frame
+        """
+        return self.read()
+
+    def release(self) -> None:
+        pass
+
+    def reopen(self, rediscover: bool = False) -> bool:
+        """
+        Release and open the source again.
+
+        Args:
+            rediscover: Look the device up again instead of reusing its last location
+        """
+        self.release()
+        return self.open()
+
+    def _fit(self, frame):
+        if self.frame_size and (frame.shape[1], frame.shape[0]) != self.frame_size:
+            frame = cv2.resize(frame, self.frame_size)
+        return frame
+
+
+class CameraFrameSource(FrameSource):
+    """Live camera opened through cv2.VideoCapture."""
+
+    live = True
+
+    def __init__(self, camera_name: str, fallback_index: int = 0, frame_size=None, fps: Optional[float] = None,
+                 index: Optional[int] = None, read_timeout_ms: Optional[int] = None):
+        """
+        Args:
+            camera_name: Name of the camera to find dynamically
+            fallback_index: Device index used when the name is not found
+            frame_size: Requested (width, height) of the camera
+            fps: Requested acquisition frame rate
+            index: Device index already resolved by the caller (skips enumeration)
+            read_timeout_ms: Upper bound on a blocking read, where the OpenCV backend supports it
+        """
+        super().__init__(frame_size)
+        self.camera_name = camera_name
+        self.fallback_index = fallback_index
+        self.index = index
+        self.read_timeout_ms = read_timeout_ms
+        self.fps = fps
+        self.description = f"camera '{camera_name}'"
+        self.cap = None
+
+    def open(self) -> bool:
+        camera_index = self.index
+        if camera_index is None:
+            camera_index = get_camera_index_by_name(self.camera_name)
+
+        if camera_index is None:
+            print(f"⚠️ Camera '{self.camera_name}' not found. Using fallback index {self.fallback_index}")
+            camera_index = self.fallback_index
+
+        self.description = f"camera '{self.camera_name}' at index {camera_index}"
+        self.cap = cv2.VideoCapture(camera_index)
+        if self.read_timeout_ms and hasattr(cv2, 'CAP_PROP_READ_TIMEOUT_MSEC'):
+            # Lets a pulled cable surface as a failed read instead of a hung one
+            self.cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, self.read_timeout_ms)
+        if self.frame_size:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.frame_size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.frame_size[1])
+        if self.fps:
+            self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+
+        return self.cap.isOpened()
+
+    def reopen(self, rediscover: bool = False) -> bool:
+        if rediscover:
+            index = get_camera_index_by_name(self.camera_name, max_age=0)
+            if index is not None:
+                self.index = index
+        return super().reopen()
+
+    def read(self):
+        return self.cap.read()
+
+    def read_into(self, buffer):
+        ret, frame = self.cap.read(buffer)
+        if ret and is_same_buffer(frame, buffer):
+            return ret, buffer
+        return ret, frame
+
+    def release(self) -> None:
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class VideoFileFrameSource(FrameSource):
+    """Recorded video file replayed through cv2.VideoCapture."""
+
+    def __init__(self, path: str, fps: Optional[float] = None, loop: bool = True, frame_size=None):
+        """
+        Args:
+            path: Path to the video file
+            fps: Replay rate; None uses the file's own rate, 0 replays as fast as possible
+            loop: Restart from the beginning at end of file
+            frame_size: Optional (width, height) every frame is resized to
+        """
+        super().__init__(frame_size)
+        self.path = path
+        self.fps = fps
+        self.loop = loop
+        self.description = f"video '{path}'"
+        self.cap = None
+        self.pacer = None
+
+    def open(self) -> bool:
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+
+        fps = self.fps
+        if fps is None:
+            fps = self.cap.get(cv2.CAP_PROP_FPS) or 0
+        self.pacer = _Pacer(fps)
+        return True
+
+    def read(self):
+        return self.read_into(None)
+
+    def read_into(self, buffer):
+        self.pacer.wait()
+        ret, frame = self.cap.read(buffer)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(buffer)
+        if not ret:
+            self.exhausted = True
+            return False, None
+        if buffer is not None and is_same_buffer(frame, buffer):
+            return True, buffer
+        return True, self._fit(frame)
+
+    def release(self) -> None:
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageFolderFrameSource(FrameSource):
+    """Directory of still images replayed in file-name order."""
+
+    def __init__(self, directory: str, fps: Optional[float] = None, loop: bool = True, frame_size=None):
+        """
+        Args:
+            directory: Directory containing .jpg/.jpeg/.png/.bmp images
+            fps: Replay rate; None or 0 replays as fast as possible
+            loop: Restart from the first image after the last one
+            frame_size: Optional (width, height) every frame is resized to
+        """
+        super().__init__(frame_size)
+        self.directory = directory
+        self.loop = loop
+        self.description = f"image folder '{directory}'"
+        self.pacer = _Pacer(fps)
+        self.files = []
+        self.position = 0
+
+    def open(self) -> bool:
+        if not os.path.isdir(self.directory):
+            return False
+
+        with os.scandir(self.directory) as entries:
+            self.files = sorted(
+                entry.path for entry in entries
+                if entry.is_file() and Path(entry.name).suffix.lower() in IMAGE_EXTENSIONS
+            )
+        self.position = 0
+        return len(self.files) > 0
+
+    def read(self):
+        self.pacer.wait()
+        if self.position >= len(self.files):
+            if not self.loop:
+                self.exhausted = True
+                return False, None
+            self.position = 0
+
+        path = self.files[self.position]
+        self.position += 1
+
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is None:
+            print(f"⚠️ Could not decode replay image {path}")
+            return False, None
+        return True, self._fit(frame)
+
+
+def create_frame_source(source_config: dict, frame_shape, fps: Optional[float] = None,
+                        read_timeout_ms: Optional[int] = None) -> FrameSource:
+    """
+    Build a frame source from its configuration entry.
+
+    Args:
+        source_config: SOURCE entry of a camera in CAMERAS (config.py)
+        frame_shape: Shape of the raw source frames (height, width, channels)
+        fps: Acquisition rate requested from live cameras
+        read_timeout_ms: Read timeout requested from live cameras
+
+    Returns:
+        Unopened FrameSource instance
+    """
+    frame_size = (frame_shape[1], frame_shape[0])
+    source_type = source_config.get('TYPE', 'camera')
+
+    if source_type == 'camera':
+        return CameraFrameSource(
+            source_config.get('NAME', ''),
+            fallback_index=source_config.get('FALLBACK_INDEX', 0),
+            frame_size=frame_size,
+            fps=fps,
+            index=source_config.get('INDEX'),
+            read_timeout_ms=read_timeout_ms
+        )
+    if source_type == 'video':
+        return VideoFileFrameSource(
+            source_config['PATH'],
+            fps=source_config.get('FPS'),
+            loop=source_config.get('LOOP', True),
+            frame_size=frame_size
+        )
+    if source_type == 'images':
+        return ImageFolderFrameSource(
+            source_config['PATH'],
+            fps=source_config.get('FPS'),
+            loop=source_config.get('LOOP', True),
+            frame_size=frame_size
+        )
+
+    raise ValueError(f"Unknown frame source type: {source_type}")
@@ -1,12 +1,21 @@
 """
 Image Management Module for Welvision
 Handles image storage, directory management, and cleanup operations
+
+The per-directory image limit is enforced through an in-memory retention
+index (see retention_index.py), so a save no longer scans the directory.
+With FRAME_ARCHIVE enabled, all-frames mode appends to segment files
+(see frame_archive.py) instead of writing one JPEG per frame.
 """
 import os
+import threading
 import cv2
 from pathlib import Path
 from typing import Optional
 
+from .frame_archive import FrameArchiveWriter
+from .retention_index import get_retention_index, build_retention_indexes
+
 
 def ensure_directory_exists(directory_path: str) -> None:
     """
@@ -80,22 +89,14 @@ def get_oldest_image(directory_path: str) -> Optional[str]:
 def cleanup_old_images(directory_path: str, max_images: int = 10000) -> None:
     """
     Remove oldest images if directory exceeds max_images limit
-    Uses os.scandir() for fast counting
+    Uses the directory's retention index, so no directory scan per call
     
     Args:
         directory_path: Path to the directory to cleanup
         max_images: Maximum number of images to keep (default: 10000)
     """
     try:
-        image_count = count_images_in_directory(directory_path)
-        
-        while image_count >= max_images:
-            oldest = get_oldest_image(directory_path)
-            if oldest and os.path.exists(oldest):
-                os.remove(oldest)
-                image_count -= 1
-            else:
-                break
+        get_retention_index(directory_path).make_room(max_images)
     except Exception as e:
         print(f"Error during cleanup in {directory_path}: {e}")
 
@@ -122,12 +123,15 @@ def save_image_with_limit(
         # Ensure directory exists
         ensure_directory_exists(directory_path)
         
-        # Cleanup old images if necessary
-        cleanup_old_images(directory_path, max_images)
+        # Cleanup old images if necessary (overwriting a file does not add one)
+        index = get_retention_index(directory_path)
+        save_path = os.path.join(directory_path, filename)
+        if save_path not in index:
+            index.make_room(max_images)
         
         # Save the image
-        save_path = os.path.join(directory_path, filename)
-        cv2.imwrite(save_path, image)
+        if cv2.imwrite(save_path, image):
+            index.add(save_path)
         
         return save_path
     except Exception as e:
@@ -199,14 +203,8 @@ def save_all_frames_image(
         Path to saved image
     """
     try:
-        if camera_type == 'BF':
-            if is_head:
-                directory = storage_paths['ALL_FRAMES']['BF']['ALL_HEAD']
-            else:
-                directory = storage_paths['ALL_FRAMES']['BF']['ALL_BF']
-        elif camera_type == 'OD':
-            directory = storage_paths['ALL_FRAMES']['OD']['ALL_OD']
-        else:
+        directory = get_all_frames_directory(camera_type, storage_paths, is_head)
+        if directory is None:
             print(f"Unknown camera type: {camera_type}")
             return ""
         
@@ -217,9 +215,120 @@ def save_all_frames_image(
         return ""
 
 
+def get_all_frames_directory(camera_type: str, storage_paths: dict, is_head: bool = False) -> Optional[str]:
+    """
+    All Frames directory of a camera
+    
+    Args:
+        camera_type: 'BF' or 'OD'
+        storage_paths: Dictionary containing storage path configuration
+        is_head: Whether this is a head frame (BF only)
+        
+    Returns:
+        Directory path, or None for an unknown camera type
+    """
+    if camera_type == 'BF':
+        return storage_paths['ALL_FRAMES']['BF']['ALL_HEAD' if is_head else 'ALL_BF']
+    if camera_type == 'OD':
+        return storage_paths['ALL_FRAMES']['OD']['ALL_OD']
+    return None
+
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def get_frame_archive(directory: str, archive_config: dict = None, max_images: int = 10000) -> FrameArchiveWriter:
+    """
+    Return the process's archive writer of a directory, creating it on first use
+    
+    Closed segments are added to the directory's retention index, so the
+    image limit and the storage governor count them like images. The
+    segment being written is left out until it is closed.
+    
+    Args:
+        directory: All Frames directory
+        archive_config: FRAME_ARCHIVE entry from config.py
+        max_images: Maximum number of files (images and segments) to keep
+    """
+    key = os.path.abspath(directory)
+    with _archives_lock:
+        archive = _archives.get(key)
+        if archive is None:
+            config = archive_config or {}
+            index = get_retention_index(directory)
+
+            def segment_closed(path, size):
+                index.make_room(max_images)
+                index.add(path, size)
+
+            archive = _archives[key] = FrameArchiveWriter(
+                directory,
+                prefix=os.path.basename(os.path.normpath(directory)),
+                segment_mb=config.get('SEGMENT_MB', 256),
+                jpeg_quality=config.get('JPEG_QUALITY', 90),
+                buffer_kb=config.get('BUFFER_KB', 1024),
+                on_segment_closed=segment_closed
+            )
+        return archive
+
+
+def archive_all_frames_image(
+    image,
+    camera_type: str,
+    frame_number: int,
+    storage_paths: dict,
+    is_head: bool = False,
+    roller_id: int = 0,
+    timestamp: float = None,
+    detections=None,
+    archive_config: dict = None,
+    max_images: int = 10000
+) -> str:
+    """
+    Append a raw frame and its detections to the camera's All Frames archive
+    (the archive counterpart of save_all_frames_image)
+    
+    Args:
+        image: Raw (unannotated) frame
+        camera_type: 'BF' or 'OD'
+        frame_number: Frame number within the session
+        storage_paths: Dictionary containing storage path configuration
+        is_head: Whether this is a head frame (BF only)
+        roller_id: Roller the frame belongs to
+        timestamp: time.time() of the frame
+        detections: (N, 6) detections of the frame
+        archive_config: FRAME_ARCHIVE entry from config.py
+        max_images: Maximum number of files to keep
+        
+    Returns:
+        Path of the segment the frame went to
+    """
+    try:
+        directory = get_all_frames_directory(camera_type, storage_paths, is_head)
+        if directory is None:
+            print(f"Unknown camera type: {camera_type}")
+            return ""
+        
+        archive = get_frame_archive(directory, archive_config, max_images)
+        return archive.append(image, frame_number, roller_id, timestamp, detections).segment
+    except Exception as e:
+        print(f"Error archiving all frames image: {e}")
+        return ""
+
+
+def close_frame_archives() -> None:
+    """Close the open segment of every archive in this process (writes their footers)."""
+    with _archives_lock:
+        archives = list(_archives.values())
+    for archive in archives:
+        archive.close()
+
+
 def initialize_storage_directories(storage_paths: dict) -> None:
     """
     Initialize all storage directories at application startup
+    and build their retention indexes (one scan per directory)
     
     Args:
         storage_paths: Dictionary containing all storage path configurations
@@ -235,5 +344,12 @@ def initialize_storage_directories(storage_paths: dict) -> None:
             for path in camera.values():
                 ensure_directory_exists(path)
         
+        # Index existing images; processes started by fork inherit the indexes,
+        # others build them on their first save in a directory
+        directories = [path for section in ('INFERENCE', 'ALL_FRAMES')
+                       for camera in storage_paths[section].values() for path in camera.values()]
+        indexed = build_retention_indexes(directories)
+        print(f"📦 Indexed {sum(indexed.values())} stored images in {len(indexed)} directories")
+        
     except Exception as e:
         print(f"❌ Error initializing storage directories: {e}")
@@ -0,0 +1,164 @@
+"""
+Asynchronous image writer pool
+
+The inference loops hand finished frames to an ImageWriterPool instead of
+saving them inline: submit() only queues a job, while worker threads draw
+the annotations, JPEG-encode and write the file and run the directory
+cleanup. cv2 releases the GIL while drawing, encoding and writing, so the
+threads run in parallel with the inference loop and with each other.
+
+The queue is bounded. When it is full a slow disk costs saved images
+(counted as drops), never inference time: DROP_POLICY 'oldest' evicts the
+oldest queued image to make room, 'newest' rejects the incoming one.
+"""
+import queue
+import threading
+import time
+
+from .metrics import SharedMetrics
+
+DROP_POLICIES = ('oldest', 'newest')
+
+# Fields of the per-process image writer metrics block
+IMAGE_WRITER_METRICS = (
+    'submitted',        # Images handed over by the inference loop
+    'written',          # Images rendered and saved
+    'dropped',          # Images discarded because the queue was full
+    'errors',           # Jobs that raised while rendering or saving
+    'queue_depth',      # Jobs waiting at the last submit
+    'write_ms_last',    # Render + encode + write time of the last job
+    'write_ms_max'      # Slowest job so far
+)
+
+
+def new_image_writer_metrics() -> SharedMetrics:
+    """Create the shared metrics block for one image writer pool."""
+    return SharedMetrics(IMAGE_WRITER_METRICS)
+
+
+class ImageWriterPool:
+    """Bounded queue of image jobs served by worker threads."""
+
+    def __init__(self, workers: int = 2, max_pending: int = 32, drop_policy: str = 'oldest',
+                 metrics: SharedMetrics = None, name: str = "image-writer"):
+        """
+        Args:
+            workers: Worker threads
+            max_pending: Jobs queued at most
+            drop_policy: 'oldest' or 'newest' (see module docstring)
+            metrics: Optional block from new_image_writer_metrics()
+            name: Prefix of the worker thread names
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}', expected one of {DROP_POLICIES}")
+
+        self.drop_policy = drop_policy
+        self.metrics = metrics if metrics is not None else new_image_writer_metrics()
+        self.jobs = queue.Queue(maxsize=max_pending)
+        # Metric updates come from several threads
+        self._metrics_lock = threading.Lock()
+
+        self.threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, render, *saves) -> bool:
+        """
+        Queue one image without blocking.
+
+        Args:
+            render: Callable returning the image to save (e.g. drawing the detections),
+                or the image itself when it is saved as-is
+            *saves: Callables taking the image (e.g. partials of save_defect_image)
+
+        Returns:
+            False if the image was dropped
+        """
+        job = (render, saves)
+        accepted = True
+        try:
+            self.jobs.put_nowait(job)
+        except queue.Full:
+            if self.drop_policy == 'oldest':
+                try:
+                    self.jobs.get_nowait()
+                    self.jobs.task_done()
+                except queue.Empty:
+                    pass
+                try:
+                    self.jobs.put_nowait(job)
+                except queue.Full:
+                    accepted = False
+            else:
+                accepted = False
+            self._dropped()
+
+        with self._metrics_lock:
+            self.metrics.add('submitted')
+            self.metrics.set('queue_depth', self.jobs.qsize())
+        return accepted
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every queued image has been written.
+
+        Returns:
+            False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.jobs.unfinished_tasks:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def _dropped(self):
+        with self._metrics_lock:
+            self.metrics.add('dropped')
+            dropped = int(self.metrics.get('dropped'))
+        if dropped == 1 or dropped % 100 == 0:
+            print(f"⚠️ Image writer queue full, {dropped} image(s) dropped")
+
+    def _run(self):
+        while True:
+            render, saves = self.jobs.get()
+            start = time.perf_counter()
+            try:
+                image = render() if callable(render) else render
+                for save in saves:
+                    save(image)
+                failed = False
+            except Exception as e:
+                print(f"❌ Error writing image: {e}")
+                failed = True
+            finally:
+                self.jobs.task_done()
+
+            write_ms = (time.perf_counter() - start) * 1000.0
+            with self._metrics_lock:
+                self.metrics.add('errors' if failed else 'written')
+                self.metrics.set('write_ms_last', write_ms)
+                if write_ms > self.metrics.get('write_ms_max'):
+                    self.metrics.set('write_ms_max', write_ms)
+
+
+def create_image_writer(config: dict = None, metrics: SharedMetrics = None, name: str = "image-writer") -> ImageWriterPool:
+    """
+    Build an ImageWriterPool from the IMAGE_WRITER entry in config.py.
+
+    Args:
+        config: IMAGE_WRITER entry (None = defaults)
+        metrics: Optional block from new_image_writer_metrics()
+        name: Prefix of the worker thread names
+    """
+    config = config or {}
+    return ImageWriterPool(
+        workers=config.get('WORKERS', 2),
+        max_pending=config.get('MAX_PENDING', 32),
+        drop_policy=config.get('DROP_POLICY', 'oldest'),
+        metrics=metrics,
+        name=name
+    )
@@ -0,0 +1,202 @@
+"""
+Inference backends for the YOLO models
+
+PyTorch is used when a CUDA device is present. On CPU-only machines the
+models can instead run through ONNX Runtime or OpenVINO, in FP32 or INT8.
+The .pt weights are exported on first use and the export is cached in
+EXPORT_DIR; it is rebuilt when the .pt file is newer than the export.
+Ultralytics loads every format through the same YOLO() class, so the
+predictors do not care which backend is active.
+
+Selection is by the INFERENCE_BACKEND config entry ('auto' picks CUDA if
+available, then OpenVINO, then ONNX Runtime, then PyTorch on CPU).
+"""
+import importlib.util
+import os
+import shutil
+
+try:
+    import torch
+except ImportError:  # Without PyTorch there is no CUDA device to pick
+    torch = None
+
+try:
+    from ultralytics import YOLO
+except ImportError:  # Needed to load or export models, not to import backend
+    YOLO = None
+
+INFERENCE_BACKENDS = ('torch', 'onnx', 'openvino')
+PRECISIONS = ('fp32', 'int8')
+
+# Export formats for the exported backends
+_EXPORT_FORMATS = {'onnx': 'onnx', 'openvino': 'openvino'}
+
+
+def _module_available(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def _cuda_available() -> bool:
+    return torch is not None and torch.cuda.is_available()
+
+
+def _require_ultralytics() -> None:
+    if YOLO is None:
+        raise ImportError("ultralytics is required to load or export the YOLO models")
+
+
+def resolve_device(device='auto'):
+    """
+    Pick the PyTorch inference device.
+
+    Args:
+        device: 'auto', 'cpu', or a CUDA device index / 'cuda:N'
+
+    Returns:
+        Device accepted by Ultralytics predict()
+    """
+    if device == 'auto':
+        return 0 if _cuda_available() else 'cpu'
+    return device
+
+
+def select_backend(backend: str = 'auto', device='auto') -> str:
+    """
+    Pick the inference backend.
+
+    Args:
+        backend: 'auto' or one of INFERENCE_BACKENDS
+        device: Configured device; 'cpu' prevents CUDA from being chosen
+
+    Returns:
+        Backend name
+    """
+    if backend != 'auto':
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}', expected one of {INFERENCE_BACKENDS}")
+        return backend
+    if device != 'cpu' and _cuda_available():
+        return 'torch'
+    if _module_available('openvino'):
+        return 'openvino'
+    if _module_available('onnxruntime'):
+        return 'onnx'
+    return 'torch'
+
+
+def exported_model_path(pt_path: str, backend: str, precision: str, imgsz: int, export_dir: str) -> str:
+    """
+    Cache location of an exported model.
+
+    Returns:
+        .onnx file for ONNX Runtime, model directory for OpenVINO
+    """
+    stem = os.path.splitext(os.path.basename(pt_path))[0]
+    name = f"{stem}_{imgsz}_{precision}"
+    if backend == 'onnx':
+        return os.path.join(export_dir, f"{name}.onnx")
+    return os.path.join(export_dir, f"{name}_openvino_model")
+
+
+def _is_stale(export_path: str, pt_path: str) -> bool:
+    if not os.path.exists(export_path):
+        return True
+    return os.path.getmtime(export_path) < os.path.getmtime(pt_path)
+
+
+def _replace(src: str, dst: str) -> None:
+    if os.path.isdir(dst):
+        shutil.rmtree(dst)
+    elif os.path.exists(dst):
+        os.remove(dst)
+    shutil.move(src, dst)
+
+
+def _quantize_onnx(fp32_path: str, int8_path: str) -> None:
+    """Dynamic INT8 weight quantization with ONNX Runtime (needs no calibration data)."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QUInt8)
+
+
+def export_model(pt_path: str, backend: str, precision: str = 'fp32', imgsz: int = 640,
+                 export_dir: str = "models/exported", calibration_data=None) -> str:
+    """
+    Export a .pt model for a CPU backend, reusing the cached export when it is current.
+
+    Args:
+        pt_path: Path to the PyTorch weights
+        backend: 'onnx' or 'openvino'
+        precision: 'fp32' or 'int8'
+        imgsz: Input size the export is built for
+        export_dir: Directory holding the exported models
+        calibration_data: Ultralytics dataset YAML for OpenVINO INT8 calibration
+
+    Returns:
+        Path to load with YOLO()
+    """
+    if backend not in _EXPORT_FORMATS:
+        raise ValueError(f"Backend '{backend}' does not use exported models")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+
+    target = exported_model_path(pt_path, backend, precision, imgsz, export_dir)
+    if not _is_stale(target, pt_path):
+        return target
+
+    _require_ultralytics()
+    os.makedirs(export_dir, exist_ok=True)
+    print(f"📦 Exporting {pt_path} to {backend} {precision.upper()} (imgsz {imgsz})...")
+
+    kwargs = {'format': _EXPORT_FORMATS[backend], 'imgsz': imgsz, 'device': 'cpu', 'dynamic': True}
+    if backend == 'openvino' and precision == 'int8':
+        kwargs['int8'] = True
+        if calibration_data:
+            kwargs['data'] = calibration_data
+    exported = YOLO(pt_path).export(**kwargs)
+
+    if backend == 'onnx' and precision == 'int8':
+        _quantize_onnx(exported, target)
+        os.remove(exported)
+    else:
+        # Ultralytics writes next to the .pt file; move the result into the cache
+        _replace(exported, target)
+
+    print(f"✅ Exported {target}")
+    return target
+
+
+def load_model(pt_path: str, backend_config: dict = None, device='auto'):
+    """
+    Load one model with the configured backend.
+
+    Args:
+        pt_path: Path to the PyTorch weights
+        backend_config: INFERENCE_BACKEND entry from config.py
+        device: 'auto', 'cpu', or a CUDA device (PyTorch backend only)
+
+    Returns:
+        (model, backend, device, half)
+    """
+    _require_ultralytics()
+    backend_config = backend_config or {}
+    backend = select_backend(backend_config.get('BACKEND', 'auto'), device)
+
+    if backend == 'torch':
+        device = resolve_device(device)
+        half = device != 'cpu'  # FP16 only on CUDA
+        model = YOLO(pt_path)
+        if half:
+            # A bare index means that CUDA device, not always cuda:0
+            model.to(f"cuda:{device}" if isinstance(device, int) else device)
+        return model, backend, device, half
+
+    path = export_model(
+        pt_path,
+        backend,
+        precision=backend_config.get('PRECISION', 'fp32'),
+        imgsz=backend_config.get('IMGSZ', 640),
+        export_dir=backend_config.get('EXPORT_DIR', "models/exported"),
+        calibration_data=backend_config.get('CALIBRATION_DATA')
+    )
+    return YOLO(path, task='detect'), backend, 'cpu', False
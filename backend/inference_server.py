@@ -0,0 +1,374 @@
+"""
+Central inference server with dynamic micro-batching
+
+One process owns every YOLO model (BF, head and OD), so each model is held
+once on the device. Inference processes talk to it through InferenceClient:
+the frame is copied into the client's shared-memory request slot and only
+a small descriptor travels over the request queue. The server collects
+requests for up to BATCH_WINDOW_MS after the first one arrives, groups
+them by model and settings, and runs each group as one batched predict.
+Detections are written back into the client's shared-memory result slot.
+"""
+import queue
+import time
+from multiprocessing import Queue, RawArray
+
+import numpy as np
+
+from .memory_policy import MemoryPolicy
+from .predictors import LocalPredictor
+
+# Fields per detection: x1, y1, x2, y2, conf, cls
+DETECTION_FIELDS = 6
+
+
+class InferenceClient:
+    """
+    Predictor that forwards frames to the inference server.
+
+    Created in the GUI process before the server starts and passed to one
+    inference process as a Process arg; not safe to share between processes.
+    """
+
+    def __init__(self, client_id: int, request_queue, max_frame_shape, slots: int = 2, max_detections: int = 300,
+                 response_timeout: float = 30.0):
+        """
+        Args:
+            client_id: Index of this client in the server's client list
+            request_queue: The server's request queue
+            max_frame_shape: Largest frame shape this client will submit
+            slots: Requests that can be in flight at once
+            max_detections: Detections kept per request
+            response_timeout: Seconds to wait for one result before giving up on the server
+        """
+        self.client_id = client_id
+        self.request_queue = request_queue
+        self.slots = slots
+        self.max_frame_bytes = int(np.prod(max_frame_shape))
+        self.max_detections = max_detections
+        self.response_timeout = response_timeout
+
+        self._frames = RawArray('B', self.max_frame_bytes * slots)
+        self._results = RawArray('f', max_detections * DETECTION_FIELDS * slots)
+        # Bumped when a request times out, so the server drops the stale request and its answer
+        self._generations = RawArray('L', slots)
+        self.responses = Queue()
+
+        self._frames_np = None
+        self._results_np = None
+        self._free_slots = list(range(slots))
+        self._finished = {}
+        self._names = {}
+        self._shared_data = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_frames_np'] = None
+        state['_results_np'] = None
+        return state
+
+    def _views(self):
+        if self._frames_np is None:
+            self._frames_np = np.frombuffer(self._frames, dtype=np.uint8).reshape(self.slots, self.max_frame_bytes)
+            self._results_np = np.frombuffer(self._results, dtype=np.float32).reshape(
+                self.slots, self.max_detections, DETECTION_FIELDS
+            )
+        return self._frames_np, self._results_np
+
+    def frame_view(self, slot: int, shape) -> np.ndarray:
+        """View of a request slot as a frame of the given shape."""
+        frames, _ = self._views()
+        return frames[slot, :int(np.prod(shape))].reshape(shape)
+
+    def start(self, shared_data, poll_interval: float = 0.05) -> None:
+        """
+        Wait until the server has loaded its models.
+
+        Raises:
+            RuntimeError: If the server failed to load them
+        """
+        self._shared_data = shared_data
+        while not shared_data.get('inference_server_ready', False):
+            self._check_server()
+            time.sleep(poll_interval)
+        self._names = dict(shared_data['model_names'])
+
+    def _check_server(self) -> None:
+        if self._shared_data is not None and self._shared_data.get('inference_server_failed', False):
+            raise RuntimeError("Inference server has failed")
+
+    def names(self, model_key: str) -> dict:
+        """Class ID -> class name mapping of a model."""
+        return self._names[model_key]
+
+    def submit(self, model_key: str, frame, conf: float, imgsz=None) -> int:
+        """
+        Queue a frame for inference without waiting for the result.
+
+        Returns:
+            Ticket to pass to result()
+        """
+        if not self._free_slots:
+            raise RuntimeError("All inference request slots are in flight")
+        if frame.nbytes > self.max_frame_bytes:
+            raise ValueError(f"Frame of shape {frame.shape} exceeds the client's request slot")
+
+        slot = self._free_slots.pop()
+        np.copyto(self.frame_view(slot, frame.shape), frame)
+        self.request_queue.put((self.client_id, slot, self._generations[slot], model_key, frame.shape, conf, imgsz))
+        return slot
+
+    def is_current(self, slot: int, generation: int) -> bool:
+        """Whether a request is still awaited (False once the client gave up on it)."""
+        return self._generations[slot] == generation
+
+    def result(self, ticket: int, poll_interval: float = 1.0) -> np.ndarray:
+        """
+        Wait for the detections of a submitted frame.
+
+        Args:
+            ticket: Value returned by submit()
+            poll_interval: Seconds between checks of the server's failure flag while waiting
+
+        Returns:
+            Array of shape (N, 6) with x1, y1, x2, y2, conf, cls
+
+        Raises:
+            RuntimeError: If the server failed or did not answer within response_timeout
+        """
+        deadline = time.perf_counter() + self.response_timeout
+        while ticket not in self._finished:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self._abandon(ticket)
+                raise RuntimeError(f"Inference server did not answer within {self.response_timeout:g} s")
+            try:
+                slot, generation, count = self.responses.get(timeout=min(poll_interval, remaining))
+            except queue.Empty:
+                try:
+                    self._check_server()
+                except RuntimeError:
+                    self._abandon(ticket)
+                    raise
+                continue
+            if self.is_current(slot, generation):
+                self._finished[slot] = count
+
+        count = self._finished.pop(ticket)
+        self._free_slots.append(ticket)
+        if count < 0:
+            raise RuntimeError("Inference server failed to process the frame")
+
+        _, results = self._views()
+        return results[ticket, :count].copy()
+
+    def _abandon(self, ticket: int) -> None:
+        # Reclaim the slot now; the server skips the stale request or drops its late answer
+        self._generations[ticket] += 1
+        self._free_slots.append(ticket)
+
+    def predict(self, model_key: str, frame, conf: float, imgsz=None) -> np.ndarray:
+        """Run one model on one frame through the server."""
+        return self.result(self.submit(model_key, frame, conf, imgsz))
+
+    def respond(self, slot: int, generation: int, detections) -> None:
+        """
+        Server side: publish the detections of a request slot (None = failed).
+
+        Answers to requests the client has given up on are dropped, so they
+        cannot overwrite the results of the slot's next request.
+        """
+        if not self.is_current(slot, generation):
+            return
+        if detections is None:
+            self.responses.put((slot, generation, -1))
+            return
+        _, results = self._views()
+        count = min(len(detections), self.max_detections)
+        results[slot, :count] = detections[:count]
+        self.responses.put((slot, generation, count))
+
+
+def create_inference_clients(request_queue, frame_shapes: dict, server_config: dict) -> dict:
+    """
+    Create one client per inference process.
+
+    Args:
+        request_queue: Queue the server reads requests from
+        frame_shapes: Mapping of client name to the largest frame shape it submits
+        server_config: INFERENCE_SERVER entry from config.py
+
+    Returns:
+        Dict of client name -> InferenceClient
+    """
+    return {
+        name: InferenceClient(
+            client_id,
+            request_queue,
+            shape,
+            slots=server_config.get('REQUEST_SLOTS', 2),
+            max_detections=server_config.get('MAX_DETECTIONS', 300),
+            response_timeout=server_config.get('RESPONSE_TIMEOUT_S', 30.0)
+        )
+        for client_id, (name, shape) in enumerate(frame_shapes.items())
+    }
+
+
+def _collect_batch(request_queue, window: float, max_batch: int, idle_timeout: float = None) -> list:
+    """
+    Block for one request, then gather more until the window closes or the batch is full.
+
+    Returns an empty list if no request arrives within idle_timeout.
+    """
+    try:
+        batch = [request_queue.get(timeout=idle_timeout)]
+    except queue.Empty:
+        return []
+    if batch[0] is None:
+        return batch
+
+    deadline = time.perf_counter() + window
+    while len(batch) < max_batch:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        try:
+            request = request_queue.get(timeout=remaining)
+        except queue.Empty:
+            break
+        batch.append(request)
+        if request is None:
+            break
+    return batch
+
+
+def run_inference_server(clients: list, request_queue, model_configs: dict, server_config: dict, shared_data,
+                         warmup_config=None, memory_config=None, memory_metrics=None, backend_config=None,
+                         model_inputs=None):
+    """
+    Inference server process: loads every model once and serves batched predictions.
+
+    Args:
+        clients: InferenceClients in client_id order
+        request_queue: Queue shared by all clients; None stops the server
+        model_configs: MODELS from config.py
+        server_config: INFERENCE_SERVER entry from config.py
+        shared_data: Shared dictionary; receives 'model_names' and 'inference_server_ready',
+            or 'inference_server_failed' if the models cannot be loaded or serving stops on an error
+        warmup_config: WARMUP entry from config.py
+        memory_config: MEMORY_POLICY entry from config.py
+        memory_metrics: Block from new_memory_metrics() for this process
+        backend_config: INFERENCE_BACKEND entry from config.py
+        model_inputs: Camera name -> MODEL_INPUT config, for warmup
+    """
+    predictor = LocalPredictor(model_configs, device=server_config.get('DEVICE', 'auto'), warmup_config=warmup_config,
+                               backend_config=backend_config, model_inputs=model_inputs)
+    try:
+        # shared_data receives the load reports and the model_load/warmup startup phases
+        predictor.start(shared_data)
+    except Exception as e:
+        print(f"❌ Inference server failed to load models: {e}")
+        # Clients waiting in start() or result() raise instead of blocking forever
+        shared_data['inference_server_failed'] = True
+        return
+
+    memory = MemoryPolicy(memory_config or {}, memory_metrics)
+    memory.freeze_heap()
+
+    shared_data['model_names'] = {key: predictor.names(key) for key in model_configs}
+    shared_data['inference_server_ready'] = True
+    print(f"✅ Inference server ready with {', '.join(model_configs)} ({predictor.backend} on {predictor.device})")
+
+    window = server_config.get('BATCH_WINDOW_MS', 2) / 1000.0
+    max_batch = server_config.get('MAX_BATCH', 8)
+    try:
+        _serve(clients, request_queue, predictor, memory, window, max_batch)
+    except Exception as e:
+        print(f"❌ Inference server stopped on an error: {e}")
+        shared_data['inference_server_failed'] = True
+
+
+def _serve(clients: list, request_queue, predictor, memory: MemoryPolicy, window: float, max_batch: int) -> None:
+    """Answer batched requests until None arrives on the request queue."""
+    while True:
+        # Wake up periodically while idle so the memory policy can run
+        batch = _collect_batch(request_queue, window, max_batch, memory.check_interval)
+        memory.maybe_reclaim(busy=bool(batch))
+        if not batch:
+            continue
+        stop = batch[-1] is None
+        if stop:
+            batch.pop()
+
+        # Requests can only share a predict call if they use the same model and settings
+        groups = {}
+        for request in batch:
+            client_id, slot, generation, model_key, shape, conf, imgsz = request
+            if not clients[client_id].is_current(slot, generation):
+                continue  # The client timed out on this request and reused the slot
+            groups.setdefault((model_key, conf, imgsz), []).append(request)
+
+        for (model_key, conf, imgsz), requests in groups.items():
+            frames = [clients[client_id].frame_view(slot, shape) for client_id, slot, _, _, shape, _, _ in requests]
+            try:
+                outputs = predictor.predict_batch(model_key, frames, conf, imgsz)
+            except Exception as e:
+                print(f"❌ Inference server error on {model_key}: {e}")
+                outputs = [None] * len(requests)
+
+            for (client_id, slot, generation, *_), detections in zip(requests, outputs):
+                clients[client_id].respond(slot, generation, detections)
+
+        if stop:
+            return
+
+
+def create_predictors(frame_rings: dict, model_rings: dict, model_configs: dict, server_config: dict, shared_data,
+                      warmup_config=None, memory_config=None, memory_metrics=None, backend_config=None,
+                      model_inputs=None):
+    """
+    Build the predictor each camera's inference process uses.
+
+    Args:
+        frame_rings: Camera name -> SharedFrameRing
+        model_rings: Camera name -> model-input SharedFrameRing or None
+        model_configs: MODELS from config.py
+        server_config: INFERENCE_SERVER entry from config.py
+        shared_data: Shared dictionary passed to the server
+        warmup_config: WARMUP entry from config.py
+        memory_config: MEMORY_POLICY entry from config.py, for the server process
+        memory_metrics: Memory metrics block for the server process
+        backend_config: INFERENCE_BACKEND entry from config.py
+        model_inputs: Camera name -> MODEL_INPUT config, for warmup
+
+    Returns:
+        (predictors, server_args): predictors by camera name, and the Process
+        args for run_inference_server (None when the server is disabled)
+    """
+    if not server_config.get('ENABLED', True):
+        predictors = {
+            name: LocalPredictor(
+                {key: spec for key, spec in model_configs.items() if spec['CAMERA'] == name},
+                device=server_config.get('DEVICE', 'auto'),
+                warmup_config=warmup_config,
+                backend_config=backend_config,
+                model_inputs=model_inputs
+            )
+            for name in frame_rings
+        }
+        return predictors, None
+
+    # Each client's request slot must fit a full frame or a model input, whichever is larger
+    frame_shapes = {}
+    for name, ring in frame_rings.items():
+        model_ring = model_rings.get(name)
+        if model_ring is not None and model_ring.frame_size > ring.frame_size:
+            frame_shapes[name] = model_ring.frame_shape
+        else:
+            frame_shapes[name] = ring.frame_shape
+
+    request_queue = Queue()
+    clients = create_inference_clients(request_queue, frame_shapes, server_config)
+    server_args = (list(clients.values()), request_queue, model_configs, server_config, shared_data, warmup_config,
+                   memory_config, memory_metrics, backend_config, model_inputs)
+    return clients, server_args
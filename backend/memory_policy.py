@@ -0,0 +1,175 @@
+"""
+Memory management policy for the inference processes
+
+Replaces per-frame torch.cuda.empty_cache() + gc.collect() calls. After
+warmup the long-lived heap (models, buffers) is moved out of the
+collector's view with gc.freeze() and the generation thresholds are
+raised, so automatic collections are rare and cheap. Memory is reclaimed
+explicitly only when the process exceeds its RSS or device-memory budget,
+or when the line has been idle for a while.
+
+Every GC pause is timed through gc.callbacks and published with the
+process memory figures in a SharedMetrics block, so the Diagnosis tab can
+show whether the hot loop still pays for garbage collection.
+"""
+import gc
+import os
+import time
+
+from .metrics import SharedMetrics
+
+try:
+    import psutil
+except ImportError:  # RSS falls back to /proc on Linux
+    psutil = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Fields of the per-process memory metrics block
+MEMORY_METRICS = (
+    'rss_mb',               # Resident set size of the process
+    'device_allocated_mb',  # CUDA memory held by tensors
+    'device_reserved_mb',   # CUDA memory held by the caching allocator
+    'frozen_objects',       # Objects moved to the permanent generation by gc.freeze()
+    'gc_collections',       # Collections run (automatic and explicit)
+    'gc_pause_ms_total',    # Time spent in the collector
+    'gc_pause_ms_max',      # Longest single collection
+    'reclaims',             # Explicit reclaims triggered by the policy
+    'reclaim_ms_last',      # Duration of the last explicit reclaim
+    'busy_gc_collections'   # Collections after warmup that ran while the line was busy
+)
+
+
+def new_memory_metrics() -> SharedMetrics:
+    """Create the shared metrics block for one process."""
+    return SharedMetrics(MEMORY_METRICS)
+
+
+def read_rss_mb():
+    """Resident set size of the current process in MB, or None if unavailable."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _cuda_available() -> bool:
+    return torch is not None and torch.cuda.is_available()
+
+
+class MemoryPolicy:
+    """
+    Budgeted memory reclaim for one process.
+
+    Call freeze_heap() once after warmup and maybe_reclaim() from the loop;
+    maybe_reclaim() does no work between checks.
+    """
+
+    def __init__(self, config: dict, metrics: SharedMetrics = None):
+        """
+        Args:
+            config: MEMORY_POLICY entry from config.py
+            metrics: Optional block from new_memory_metrics()
+        """
+        self.config = config
+        self.metrics = metrics if metrics is not None else new_memory_metrics()
+        self.check_interval = config.get('CHECK_INTERVAL_S', 1.0)
+        self.idle_after = config.get('IDLE_RECLAIM_S', 5.0)
+        self.rss_budget = config.get('RSS_BUDGET_MB')
+        self.device_budget = config.get('DEVICE_BUDGET_MB')
+        self.cuda = _cuda_available()
+
+        now = time.perf_counter()
+        self.next_check = now + self.check_interval
+        self.last_busy = now
+        self.reclaimed_since_busy = False
+        self.frozen = False
+        self._gc_started = None
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_started = time.perf_counter()
+            return
+        if self._gc_started is None:
+            return
+        pause = (time.perf_counter() - self._gc_started) * 1000.0
+        self._gc_started = None
+        self.metrics.add('gc_collections')
+        self.metrics.add('gc_pause_ms_total', pause)
+        if pause > self.metrics.get('gc_pause_ms_max'):
+            self.metrics.set('gc_pause_ms_max', pause)
+        # Only collections in the steady-state loop count against the hot path
+        if self.frozen and time.perf_counter() - self.last_busy < self.idle_after:
+            self.metrics.add('busy_gc_collections')
+
+    def freeze_heap(self) -> None:
+        """Collect once, freeze the surviving heap and apply the configured GC thresholds."""
+        gc.collect()
+        if self.config.get('FREEZE_AFTER_WARMUP', True):
+            gc.freeze()
+            self.metrics.set('frozen_objects', gc.get_freeze_count())
+        thresholds = self.config.get('GC_THRESHOLDS')
+        if thresholds:
+            gc.set_threshold(*thresholds)
+        self.frozen = True
+        self.publish()
+
+    def publish(self) -> dict:
+        """Sample process and device memory into the metrics block."""
+        rss = read_rss_mb()
+        if rss is not None:
+            self.metrics.set('rss_mb', rss)
+        if self.cuda:
+            self.metrics.set('device_allocated_mb', torch.cuda.memory_allocated() / (1024 * 1024))
+            self.metrics.set('device_reserved_mb', torch.cuda.memory_reserved() / (1024 * 1024))
+        return self.metrics.snapshot()
+
+    def maybe_reclaim(self, busy: bool = True) -> bool:
+        """
+        Reclaim memory if a budget is exceeded or the line is idle.
+
+        Args:
+            busy: Whether the caller did real work in this iteration
+
+        Returns:
+            True if a reclaim ran
+        """
+        now = time.perf_counter()
+        if busy:
+            self.last_busy = now
+            self.reclaimed_since_busy = False
+        if now < self.next_check:
+            return False
+        self.next_check = now + self.check_interval
+
+        snapshot = self.publish()
+        over_rss = self.rss_budget and snapshot['rss_mb'] > self.rss_budget
+        over_device = self.device_budget and snapshot['device_reserved_mb'] > self.device_budget
+        # Reclaim once per idle period, not on every check while idle
+        idle = now - self.last_busy > self.idle_after and not self.reclaimed_since_busy
+
+        if not (over_rss or over_device or idle):
+            return False
+
+        self.reclaim()
+        if idle:
+            self.reclaimed_since_busy = True
+        return True
+
+    def reclaim(self) -> None:
+        """Run a full collection and release cached device memory."""
+        start = time.perf_counter()
+        gc.collect()
+        if self.cuda:
+            torch.cuda.empty_cache()
+        self.metrics.add('reclaims')
+        self.metrics.set('reclaim_ms_last', (time.perf_counter() - start) * 1000.0)
+        self.publish()
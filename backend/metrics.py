@@ -0,0 +1,57 @@
+"""
+Shared-memory metric counters
+
+A small block of named float64 fields that one process updates from its
+hot loop and any other process (e.g. the GUI) reads. Updates are plain
+stores into shared memory, so they cost no more than a local variable and
+never block the writer. Each field is read independently; a snapshot is
+not guaranteed to be consistent across fields.
+"""
+from multiprocessing import RawArray
+
+import numpy as np
+
+
+class SharedMetrics:
+    """Named counters and gauges in shared memory, written by a single process."""
+
+    def __init__(self, fields):
+        """
+        Args:
+            fields: Names of the metric fields
+        """
+        self.fields = tuple(fields)
+        self.index = {name: i for i, name in enumerate(self.fields)}
+        self._values = RawArray('d', len(self.fields))
+        self._values_np = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_values_np'] = None
+        return state
+
+    def _view(self):
+        if self._values_np is None:
+            self._values_np = np.frombuffer(self._values, dtype=np.float64)
+        return self._values_np
+
+    def add(self, name: str, amount: float = 1) -> None:
+        """Increment a counter."""
+        self._view()[self.index[name]] += amount
+
+    def set(self, name: str, value: float) -> None:
+        """Set a gauge."""
+        self._view()[self.index[name]] = value
+
+    def get(self, name: str) -> float:
+        """Read one field."""
+        return float(self._view()[self.index[name]])
+
+    def snapshot(self) -> dict:
+        """Read every field into a dict."""
+        values = self._view().copy()
+        return {name: float(values[i]) for i, name in enumerate(self.fields)}
+
+    def reset(self) -> None:
+        """Zero every field."""
+        self._view()[:] = 0
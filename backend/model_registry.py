@@ -0,0 +1,85 @@
+"""
+Per-process model registry
+
+Models are only loaded in the process that runs them (the inference
+server, or each inference process when the server is disabled), using the
+paths in MODELS. The registry keeps one instance per model key and records
+how long each load took. Load reports are published to shared_data under
+'model_load_<KEY>' so the GUI can show them without touching the models.
+"""
+import os
+import time
+
+from .inference_backends import load_model
+
+
+def model_load_key(model_key: str) -> str:
+    """shared_data key of a model's load report."""
+    return f"model_load_{model_key}"
+
+
+def model_load_reports(shared_data, model_keys) -> dict:
+    """
+    Collect the published load reports.
+
+    Args:
+        shared_data: Shared dictionary
+        model_keys: Keys of MODELS
+
+    Returns:
+        Dict of model key -> report dict, or None for models not loaded yet
+    """
+    return {key: shared_data.get(model_load_key(key)) for key in model_keys}
+
+
+class ModelRegistry:
+    """Loads each configured model once in the current process."""
+
+    def __init__(self, model_configs: dict, backend_config=None, device='auto'):
+        """
+        Args:
+            model_configs: Subset of MODELS from config.py
+            backend_config: INFERENCE_BACKEND entry from config.py
+            device: 'auto', 'cpu', or a CUDA device
+        """
+        self.model_configs = model_configs
+        self.backend_config = backend_config
+        self.device = device
+        self.models = {}
+        self.reports = {}
+
+        # Settings of the loaded models (every model uses the same backend config)
+        self.backend = None
+        self.resolved_device = None
+        self.half = False
+
+    def get(self, model_key: str):
+        """Return a model, loading it on first use."""
+        model = self.models.get(model_key)
+        if model is None:
+            model = self._load(model_key)
+        return model
+
+    def publish(self, model_key: str, shared_data) -> None:
+        """Publish a model's load report (no-op without shared_data)."""
+        if shared_data is not None:
+            shared_data[model_load_key(model_key)] = self.reports[model_key]
+
+    def _load(self, model_key: str):
+        path = self.model_configs[model_key]['PATH']
+        start = time.perf_counter()
+        model, backend, device, half = load_model(path, self.backend_config, self.device)
+        load_ms = (time.perf_counter() - start) * 1000.0
+
+        self.models[model_key] = model
+        self.backend, self.resolved_device, self.half = backend, device, half
+        self.reports[model_key] = {
+            'path': path,
+            'backend': backend,
+            'device': str(device),
+            'half': half,
+            'load_ms': load_ms,
+            'pid': os.getpid()
+        }
+        print(f"✅ {model_key} model loaded with {backend} on {'GPU' if half else 'CPU'} in {load_ms:.0f} ms")
+        return model
@@ -1,13 +1,19 @@
 """
 PLC communication module using SNAP7
 """
-from snap7.type import Areas
-from snap7.util import set_bool, get_bool
-import snap7
 import time
 
+try:
+    import snap7
+    from snap7.type import Areas
+    from snap7.util import set_bool, get_bool
+except ImportError:  # Only the PLC process needs it; the rest of backend imports without it
+    snap7 = None
 
-def plc_communication(plc_ip, rack, slot, db_number, shared_data, command_queue, plc_sensors_config):
+from .startup import startup_phase
+
+
+def plc_communication(plc_ip, rack, slot, db_number, shared_data, command_queue, plc_sensors_config, edge_board=None):
     """
     Handles all PLC communication: reading sensor statuses and executing commands.
     
@@ -19,7 +25,11 @@ def plc_communication(plc_ip, rack, slot, db_number, shared_data, command_queue,
         shared_data: Shared dictionary for inter-process communication
         command_queue: Queue for receiving commands
         plc_sensors_config: Dictionary with sensor and action mappings from config
+        edge_board: Optional SensorEdgeBoard receiving rising edges of the latch sensors
     """
+    if snap7 is None:
+        print("❌ PLC Communication: python-snap7 is not installed.")
+        return
     plc_client = snap7.client.Client()
     
     # Extract sensor and action mappings from config
@@ -27,13 +37,15 @@ def plc_communication(plc_ip, rack, slot, db_number, shared_data, command_queue,
     actions = plc_sensors_config['ACTIONS']
     
     try:
-        plc_client.connect(plc_ip, rack, slot)
+        # Connects while the models load in the inference processes
+        with startup_phase(shared_data, "plc_connect", "plc"):
+            plc_client.connect(plc_ip, rack, slot)
         print("✅ PLC Communication: Connected to PLC.")
         
         # Wait for both models to be loaded before sending signals
-        while not (shared_data.get('bf_model_loaded', False) and shared_data.get('od_model_loaded', False)):
-            time.sleep(0.1)  # Check every 100ms
-        
+        with startup_phase(shared_data, "plc_wait_models", "plc"):
+            while not (shared_data.get('bf_model_loaded', False) and shared_data.get('od_model_loaded', False)):
+                time.sleep(0.1)  # Check every 100ms
         
         # Turn on Lights & Application Ready signal
         data = plc_client.read_area(Areas.DB, db_number, 0, 2)
@@ -48,10 +60,15 @@ def plc_communication(plc_ip, rack, slot, db_number, shared_data, command_queue,
         print(f"PLC Communication: Connection error: {e} ⚠")
         return
 
+    # Time of the previous sensor sample, used to estimate when an edge happened
+    previous_sample_time = time.perf_counter()
+
     try:
         while True:
             try:
+                request_time = time.perf_counter()
                 data = plc_client.read_area(Areas.DB, db_number, 0, 3)
+                sample_time = (request_time + time.perf_counter()) / 2
 
                 # Read all sensors using config mappings
                 shared_data['bigface_presence'] = get_bool(
@@ -80,6 +97,15 @@ def plc_communication(plc_ip, rack, slot, db_number, shared_data, command_queue,
                     sensors['head_classification_sensor']['bit']
                 )
 
+                # Publish rising edges for frame latching; the edge happened
+                # somewhere between the previous sample and this one
+                if edge_board is not None:
+                    edge_time = (previous_sample_time + sample_time) / 2
+                    for name in edge_board.names:
+                        state = get_bool(data, sensors[name]['byte'], sensors[name]['bit'])
+                        edge_board.record(name, state, edge_time)
+                previous_sample_time = sample_time
+
             except Exception as e:
                 print(f"PLC Communication: Error reading sensors: {e} ⚠")
 
@@ -0,0 +1,126 @@
+"""
+Model predictors for the inference processes
+
+A predictor owns (or reaches) the YOLO models and turns frames into
+detection arrays of shape (N, 6) with x1, y1, x2, y2, conf, cls. Two
+implementations share the same interface so the inference loops do not
+care where the models live:
+
+- LocalPredictor loads the models inside the calling process.
+- InferenceClient (inference_server.py) forwards frames through shared
+  memory to the central inference server process.
+
+Interface:
+    start(shared_data)                      load models / wait until they are served
+    names(model_key)                        class ID -> class name mapping
+    predict(model_key, frame, conf, imgsz)  detections for one frame
+"""
+import numpy as np
+
+from .model_registry import ModelRegistry
+from .startup import StartupGraph
+from .warmup import load_warmup_frames, warmup_configured_model
+
+# Arguments every production predict call uses
+PREDICT_DEFAULTS = {'agnostic_nms': True, 'verbose': False}
+
+
+def detections_from_result(result) -> np.ndarray:
+    """Convert one Ultralytics Results object to an (N, 6) float32 array."""
+    return result.boxes.data.cpu().numpy().astype(np.float32, copy=False)
+
+
+class LocalPredictor:
+    """Runs YOLO models inside the current process."""
+
+    def __init__(self, model_configs: dict, device='auto', warmup_config=None, backend_config=None,
+                 model_inputs=None):
+        """
+        Args:
+            model_configs: Subset of MODELS from config.py ({key: {'PATH': ..., 'CAMERA': ...}})
+            device: 'auto', 'cpu', or a CUDA device
+            warmup_config: WARMUP entry from config.py (None = no warmup)
+            backend_config: INFERENCE_BACKEND entry from config.py (None = PyTorch/auto)
+            model_inputs: Camera name -> MODEL_INPUT config, so warmup uses production input shapes
+        """
+        self.model_configs = model_configs
+        self.device = device
+        self.backend = None
+        self.half = False
+        self.warmup_config = warmup_config
+        self.model_inputs = model_inputs or {}
+        self.registry = ModelRegistry(model_configs, backend_config, device)
+        self.models = self.registry.models
+
+    def start(self, shared_data=None) -> None:
+        """
+        Load and warm up every model (call inside the process that predicts).
+
+        Model loads, the warmup image decode and each model's warmup run as a
+        dependency graph, so one model warms up while the next is still loading.
+        """
+        workers = (self.registry.backend_config or {}).get('LOAD_WORKERS', 3)
+        graph = StartupGraph(shared_data, max_workers=workers)
+        warmup_frames = {}
+
+        warmup_deps = []
+        if self.warmup_config:
+            # One decode per camera, shared by every model that sees that camera
+            cameras = {model_config.get('CAMERA') for model_config in self.model_configs.values()}
+            images = {name: path for name, path in self.warmup_config.get('IMAGES', {}).items() if name in cameras}
+            graph.add('warmup_frames', lambda: warmup_frames.update(load_warmup_frames(images, self.model_inputs)),
+                      category='warmup')
+            warmup_deps.append('warmup_frames')
+
+        for key in self.model_configs:
+            graph.add(f"model_load:{key}", lambda key=key: self._load(key, shared_data), category='model')
+            if self.warmup_config:
+                graph.add(f"warmup:{key}", lambda key=key: self._warmup(key, warmup_frames, shared_data),
+                          deps=[f"model_load:{key}"] + warmup_deps, category='warmup')
+
+        graph.run()
+
+    def _load(self, key, shared_data):
+        self.registry.get(key)
+        self.backend = self.registry.backend
+        self.device = self.registry.resolved_device
+        self.half = self.registry.half
+        self.registry.publish(key, shared_data)
+
+    def _warmup(self, key, warmup_frames, shared_data):
+        report = warmup_configured_model(self, key, self.model_configs[key], warmup_frames, self.warmup_config)
+        if report is not None:
+            self.registry.reports[key].update(report)
+            self.registry.publish(key, shared_data)
+
+    def names(self, model_key: str) -> dict:
+        """Class ID -> class name mapping of a model."""
+        return dict(self.models[model_key].names)
+
+    def predict(self, model_key: str, frame, conf: float, imgsz=None) -> np.ndarray:
+        """
+        Run one model on one frame.
+
+        Args:
+            model_key: Key of the model in MODELS
+            frame: BGR image
+            conf: Confidence threshold
+            imgsz: Inference size; None uses the model's own
+
+        Returns:
+            Array of shape (N, 6) with x1, y1, x2, y2, conf, cls
+        """
+        return self.predict_batch(model_key, [frame], conf, imgsz)[0]
+
+    def predict_batch(self, model_key: str, frames: list, conf: float, imgsz=None) -> list:
+        """
+        Run one model on several frames in a single batch.
+
+        Returns:
+            List of (N, 6) arrays, one per frame
+        """
+        kwargs = dict(PREDICT_DEFAULTS, device=self.device, conf=conf, half=self.half)
+        if imgsz is not None:
+            kwargs['imgsz'] = imgsz
+        results = self.models[model_key].predict(frames, **kwargs)
+        return [detections_from_result(result) for result in results]
@@ -0,0 +1,116 @@
+"""
+Capture-side model input preprocessing
+
+Produces ROI-cropped, letterboxed frames at the model's imgsz so inference
+can skip per-frame resizing, and maps detections on those frames back to
+full-frame coordinates for saving and display.
+"""
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+# Padding value used by Ultralytics' LetterBox
+LETTERBOX_FILL = 114
+
+
+class LetterboxTransform(NamedTuple):
+    """Geometry of one full-frame -> model-input mapping."""
+    imgsz: int
+    roi_x: int
+    roi_y: int
+    roi_width: int
+    roi_height: int
+    scale: float
+    pad_x: int
+    pad_y: int
+    resized_width: int
+    resized_height: int
+
+
+def compute_letterbox(frame_shape, imgsz: int, roi=None) -> LetterboxTransform:
+    """
+    Compute the letterbox geometry for a camera frame.
+
+    Args:
+        frame_shape: Shape of the full frame (height, width, channels)
+        imgsz: Square model input size
+        roi: Optional (x, y, width, height) region of the frame fed to the model
+
+    Returns:
+        LetterboxTransform describing the crop, scale and padding
+    """
+    if roi:
+        roi_x, roi_y, roi_width, roi_height = roi
+    else:
+        roi_x, roi_y = 0, 0
+        roi_height, roi_width = frame_shape[:2]
+
+    scale = min(imgsz / roi_height, imgsz / roi_width)
+    resized_width = int(round(roi_width * scale))
+    resized_height = int(round(roi_height * scale))
+
+    # Same centring rule as Ultralytics' LetterBox
+    pad_x = int(round((imgsz - resized_width) / 2 - 0.1))
+    pad_y = int(round((imgsz - resized_height) / 2 - 0.1))
+
+    return LetterboxTransform(
+        imgsz, roi_x, roi_y, roi_width, roi_height,
+        scale, pad_x, pad_y, resized_width, resized_height
+    )
+
+
+def new_model_input(transform: LetterboxTransform) -> np.ndarray:
+    """
+    Allocate a contiguous model input buffer with the letterbox padding filled.
+
+    The padding never changes, so letterbox_into() only writes the interior.
+    """
+    return np.full((transform.imgsz, transform.imgsz, 3), LETTERBOX_FILL, dtype=np.uint8)
+
+
+def letterbox_into(frame, dst, transform: LetterboxTransform) -> np.ndarray:
+    """
+    Crop a frame to the ROI and resize it into the interior of a model input buffer.
+
+    Args:
+        frame: Full camera frame
+        dst: Buffer from new_model_input()
+        transform: Geometry from compute_letterbox()
+
+    Returns:
+        dst
+    """
+    crop = frame[
+        transform.roi_y:transform.roi_y + transform.roi_height,
+        transform.roi_x:transform.roi_x + transform.roi_width
+    ]
+    interior = dst[
+        transform.pad_y:transform.pad_y + transform.resized_height,
+        transform.pad_x:transform.pad_x + transform.resized_width
+    ]
+    if crop.shape[:2] == interior.shape[:2]:
+        np.copyto(interior, crop)
+    else:
+        interior[:] = cv2.resize(crop, (transform.resized_width, transform.resized_height), interpolation=cv2.INTER_LINEAR)
+    return dst
+
+
+def boxes_to_frame(detections, transform: LetterboxTransform) -> np.ndarray:
+    """
+    Map detections on a model input back to full-frame coordinates.
+
+    Args:
+        detections: Array of shape (N, 6) with x1, y1, x2, y2, conf, cls in model-input pixels
+        transform: Geometry from compute_letterbox()
+
+    Returns:
+        New array of shape (N, 6) in full-frame pixels
+    """
+    mapped = np.array(detections, dtype=np.float32, copy=True).reshape(-1, 6)
+    mapped[:, [0, 2]] = (mapped[:, [0, 2]] - transform.pad_x) / transform.scale + transform.roi_x
+    mapped[:, [1, 3]] = (mapped[:, [1, 3]] - transform.pad_y) / transform.scale + transform.roi_y
+
+    mapped[:, [0, 2]] = mapped[:, [0, 2]].clip(transform.roi_x, transform.roi_x + transform.roi_width)
+    mapped[:, [1, 3]] = mapped[:, [1, 3]].clip(transform.roi_y, transform.roi_y + transform.roi_height)
+    return mapped
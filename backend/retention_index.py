@@ -0,0 +1,173 @@
+"""
+In-memory retention index for image directories
+
+Keeping a directory under its image limit used to mean scanning it on
+every save (count the files, then scan again for the oldest one per file
+deleted). A RetentionIndex scans a directory once, keeps its images in an
+insertion-ordered dict from oldest to newest, and is updated on every
+write and delete, so enforcing the limit is O(1) amortized per save.
+Each entry also carries the file's size and creation time, so the storage
+governor can account bytes and evict oldest-first across directories
+without touching the disk.
+
+Frame archive segments (frame_archive.py) are indexed like images: a
+segment counts as one file and is evicted as a whole.
+
+Indexes are process-local. Each image directory is written by a single
+inference process, so that process's index is the directory's truth; the
+index is built on the first save in a process (or up front by
+initialize_storage_directories) and shared by the image writer threads.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from .frame_archive import SEGMENT_EXTENSION
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+# Closed frame archive segments are retained like images
+RETAINED_EXTENSIONS = IMAGE_EXTENSIONS | {SEGMENT_EXTENSION}
+
+
+class RetentionIndex:
+    """Images of one directory, oldest first."""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Directory to index (scanned immediately)
+        """
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # Path -> (ctime, size in bytes), oldest first
+        self.total_bytes = 0
+        self.scan()
+
+    def scan(self) -> int:
+        """
+        Rebuild the index from the directory, ordered by creation time.
+
+        Returns:
+            Number of images found
+        """
+        found = []
+        if os.path.isdir(self.directory):
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and Path(entry.name).suffix.lower() in RETAINED_EXTENSIONS:
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue  # Deleted while scanning
+                        found.append((stat.st_ctime, entry.path, stat.st_size))
+        found.sort()
+        with self.lock:
+            self.entries = OrderedDict((path, (ctime, size)) for ctime, path, size in found)
+            self.total_bytes = sum(size for _, _, size in found)
+        return len(found)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.entries
+
+    def add(self, path: str, size: int = None) -> None:
+        """
+        Record a written image as the newest (an overwritten file moves to the end).
+
+        Args:
+            path: Path of the image
+            size: File size in bytes (default: stat the file)
+        """
+        if size is None:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+        with self.lock:
+            previous = self.entries.pop(path, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            self.entries[path] = (time.time(), size)
+            self.total_bytes += size
+
+    def discard(self, path: str) -> None:
+        """Forget an image that was removed by other means."""
+        with self.lock:
+            previous = self.entries.pop(path, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+
+    def oldest(self):
+        """Path of the oldest image, or None."""
+        with self.lock:
+            return next(iter(self.entries), None)
+
+    def oldest_time(self):
+        """Creation time of the oldest image, or None."""
+        with self.lock:
+            if not self.entries:
+                return None
+            return next(iter(self.entries.values()))[0]
+
+    def evict_oldest(self):
+        """
+        Delete the oldest image.
+
+        Returns:
+            (path, size) of the removed image, or None if the index is empty
+        """
+        with self.lock:
+            if not self.entries:
+                return None
+            path, (_, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return path, size
+
+    def make_room(self, max_images: int) -> list:
+        """
+        Delete the oldest images until fewer than max_images remain.
+
+        Files that already disappeared from disk are just dropped from the index.
+
+        Returns:
+            Paths that were removed
+        """
+        removed = []
+        while len(self.entries) >= max_images:
+            evicted = self.evict_oldest()
+            if evicted is None:
+                break
+            removed.append(evicted[0])
+        return removed
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_retention_index(directory: str) -> RetentionIndex:
+    """Return the process's index of a directory, scanning it on first use."""
+    key = os.path.abspath(directory)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = RetentionIndex(directory)
+        return index
+
+
+def build_retention_indexes(directories) -> dict:
+    """
+    Scan directories up front so the first save does not pay for it.
+
+    Returns:
+        Dict of directory -> number of images indexed
+    """
+    return {directory: len(get_retention_index(directory)) for directory in directories}
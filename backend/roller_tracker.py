@@ -0,0 +1,220 @@
+"""
+Roller tracking across frames
+
+The per-frame assignment (assign_defects) numbers the rollers in view by
+their left-to-right order, so an ID is only right while exactly the
+expected rollers are detected. RollerTracker instead follows every
+confident roller box from frame to frame:
+
+- roller boxes are matched to the existing tracks by IoU, falling back to
+  centroid distance for fast or partly detected rollers; candidate pairs
+  come from a sweep over the tracks sorted by x1, so matching stays
+  O(n log n) with many rollers in view,
+- a roller ID is bound to a track when the presence sensor fires
+  (register), not derived from box order,
+- defects are attributed to the track whose box holds one of their
+  corners, including tracks whose roller was missed in this frame, and
+  evidence seen before the ID was bound is handed over when it is.
+"""
+import bisect
+from collections import deque
+
+import numpy as np
+
+from .detection_postprocess import (
+    ROLLER_CONFIDENCE, DefectAssignment, sort_detections, corner_containment
+)
+
+
+class RollerTrack:
+    """One roller followed across frames."""
+
+    def __init__(self, track_id: int, box: np.ndarray):
+        self.track_id = track_id
+        self.box = box              # Last seen (x1, y1, x2, y2)
+        self.roller_id = 0          # Bound by the presence sensor (0 = not yet)
+        self.hits = 1               # Frames the roller was detected in
+        self.missed = 0             # Consecutive frames without a detection
+        self.evidence = []          # Defect class IDs seen before roller_id was bound
+
+
+def box_iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """IoU of one (4,) box with each of (K, 4) boxes."""
+    ix1 = np.maximum(box[0], boxes[:, 0])
+    iy1 = np.maximum(box[1], boxes[:, 1])
+    ix2 = np.minimum(box[2], boxes[:, 2])
+    iy2 = np.minimum(box[3], boxes[:, 3])
+    intersection = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union = area + areas - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1), 0.0)
+
+
+def box_centers(boxes: np.ndarray) -> np.ndarray:
+    """(K, 2) centroids of (K, 4) boxes."""
+    return np.stack([(boxes[:, 0] + boxes[:, 2]) / 2.0, (boxes[:, 1] + boxes[:, 3]) / 2.0], axis=1)
+
+
+class RollerTracker:
+    """Keeps roller tracks across frames and attributes defects to them."""
+
+    def __init__(self, config: dict = None, roller_conf: float = None):
+        """
+        Args:
+            config: ROLLER_TRACKER entry from config.py
+            roller_conf: Minimum confidence of rollers that are tracked
+                (default: the config's ROLLER_CONF, else ROLLER_CONFIDENCE)
+        """
+        config = config or {}
+        self.iou_threshold = config.get('IOU_THRESHOLD', 0.3)
+        self.max_distance = config.get('MAX_CENTROID_DISTANCE', 80)
+        self.max_missed = config.get('MAX_MISSED', 5)
+        if roller_conf is None:
+            roller_conf = config.get('ROLLER_CONF', ROLLER_CONFIDENCE)
+        self.roller_conf = roller_conf
+
+        self.tracks = []
+        self.pending_ids = deque()  # Sensor IDs waiting for their roller to be detected
+        self.next_track_id = 1
+
+    def register(self, roller_id: int) -> np.ndarray:
+        """
+        Bind a roller ID when the presence sensor fires.
+
+        The newest roller is the leftmost one, so the ID goes to the leftmost
+        live track that has no ID yet (even if its roller was missed in the
+        last frame); if there is none, it is bound to the next new track.
+
+        Returns:
+            Defect class IDs the track collected before it had an ID
+        """
+        unbound = [track for track in self.tracks if track.roller_id == 0]
+        if not unbound:
+            self.pending_ids.append(roller_id)
+            return np.empty(0, dtype=np.int64)
+
+        track = min(unbound, key=lambda t: t.box[0])
+        return self._bind(track, roller_id)
+
+    def update(self, detections: np.ndarray, roller_class: int) -> DefectAssignment:
+        """
+        Advance the tracks by one frame and attribute its defects.
+
+        Args:
+            detections: Array of shape (N, 6) with x1, y1, x2, y2, conf, cls
+            roller_class: Class ID of the roller class
+
+        Returns:
+            DefectAssignment with the frame's defects sorted by x1; defects on
+            a track without an ID yet get 0 and are kept as evidence
+        """
+        if len(detections) == 0:
+            self._age(set())
+            empty = np.empty(0, dtype=np.int64)
+            return DefectAssignment(empty, empty)
+
+        boxes, confidences, classes = sort_detections(detections)
+        is_roller = classes == roller_class
+        rollers = boxes[is_roller & (confidences > self.roller_conf)]
+        defects = boxes[~is_roller]
+        defect_classes = classes[~is_roller]
+
+        matches, unmatched = self._match(rollers)
+        for track, roller_index in matches:
+            track.box = rollers[roller_index]
+            track.hits += 1
+            track.missed = 0
+        self._age({id(track) for track, _ in matches})
+
+        new_tracks = []
+        for roller_index in unmatched:
+            track = RollerTrack(self.next_track_id, rollers[roller_index])
+            self.next_track_id += 1
+            self.tracks.append(track)
+            new_tracks.append(track)
+        # Oldest waiting ID goes to the rightmost (earliest entered) new roller
+        for track in sorted(new_tracks, key=lambda t: -t.box[0]):
+            if not self.pending_ids:
+                break
+            self._bind(track, self.pending_ids.popleft())
+
+        roller_ids = np.zeros(len(defects), dtype=np.int64)
+        if len(defects) == 0 or not self.tracks:
+            return DefectAssignment(defect_classes, roller_ids)
+
+        # Leftmost track holding a corner of the defect wins, as in assign_defects
+        tracks = sorted(self.tracks, key=lambda t: t.box[0])
+        inside = corner_containment(defects, np.stack([track.box for track in tracks]))
+        matched = inside.any(axis=1)
+        first = inside.argmax(axis=1)
+        for defect_index in np.flatnonzero(matched):
+            track = tracks[first[defect_index]]
+            if track.roller_id:
+                roller_ids[defect_index] = track.roller_id
+            else:
+                track.evidence.append(int(defect_classes[defect_index]))
+        return DefectAssignment(defect_classes, roller_ids)
+
+    def _bind(self, track: RollerTrack, roller_id: int) -> np.ndarray:
+        track.roller_id = roller_id
+        evidence = np.asarray(track.evidence, dtype=np.int64)
+        track.evidence = []
+        return evidence
+
+    def _age(self, seen: set) -> None:
+        """Count a missed frame for every track not seen and drop lost tracks."""
+        for track in self.tracks:
+            if id(track) not in seen:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+
+    def _match(self, rollers: np.ndarray):
+        """
+        Greedy one-to-one matching of roller boxes to tracks.
+
+        Returns:
+            (matches, unmatched): list of (track, roller index) and the
+            indices of rollers that start new tracks
+        """
+        if not self.tracks or len(rollers) == 0:
+            return [], list(range(len(rollers)))
+
+        tracks = sorted(self.tracks, key=lambda t: t.box[0])
+        track_boxes = np.stack([track.box for track in tracks])
+        track_x1 = track_boxes[:, 0].tolist()
+        track_centers = box_centers(track_boxes)
+        widest = int((track_boxes[:, 2] - track_boxes[:, 0]).max())
+        roller_centers = box_centers(rollers)
+
+        # Only tracks whose x-range can overlap the roller (plus the distance gate) are compared
+        candidates = []
+        for roller_index, box in enumerate(rollers):
+            lo = bisect.bisect_left(track_x1, box[0] - widest - self.max_distance)
+            hi = bisect.bisect_right(track_x1, box[2] + self.max_distance)
+            if lo == hi:
+                continue
+            ious = box_iou(box, track_boxes[lo:hi])
+            distances = np.linalg.norm(track_centers[lo:hi] - roller_centers[roller_index], axis=1)
+            for offset in np.flatnonzero((ious >= self.iou_threshold) | (distances <= self.max_distance)):
+                candidates.append((-ious[offset], distances[offset], lo + offset, roller_index))
+
+        candidates.sort()
+        matches = []
+        used_tracks, used_rollers = set(), set()
+        for _, _, track_index, roller_index in candidates:
+            if track_index in used_tracks or roller_index in used_rollers:
+                continue
+            used_tracks.add(track_index)
+            used_rollers.add(roller_index)
+            matches.append((tracks[track_index], roller_index))
+
+        unmatched = [index for index in range(len(rollers)) if index not in used_rollers]
+        return matches, unmatched
+
+
+def create_roller_tracker(config: dict = None, roller_conf: float = None):
+    """Return a RollerTracker if ROLLER_TRACKER is enabled, else None (per-frame assignment)."""
+    if not config or not config.get('ENABLED', False):
+        return None
+    return RollerTracker(config, roller_conf)
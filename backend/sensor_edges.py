@@ -0,0 +1,129 @@
+"""
+Shared board of PLC sensor edges
+
+The PLC process records every rising edge of the latch sensors here with
+an estimated edge time and the roller ID it belongs to. Capture processes
+poll the board from their hot loop (a few shared-memory reads, no Manager
+round trip) to latch the frames nearest to each edge.
+"""
+from multiprocessing import RawArray
+from typing import NamedTuple
+
+import numpy as np
+
+
+class SensorEdge(NamedTuple):
+    """Latest rising edge of one sensor."""
+    count: int          # Number of rising edges seen since start (0 = none yet)
+    timestamp: float    # Estimated edge time on the time.perf_counter() clock
+    roller_id: int      # Roller the edge belongs to
+
+
+class SensorEdgeBoard:
+    """
+    Lock-free record of rising edges for a fixed set of sensors.
+
+    Written by the PLC process only; read by any process. Each entry is
+    guarded by a seqlock version like the frame rings.
+    """
+
+    FIELD_COUNT = 0
+    FIELD_TIMESTAMP = 1
+    FIELD_ROLLER_ID = 2
+    FIELDS = 3
+
+    def __init__(self, latch_sensors: dict):
+        """
+        Args:
+            latch_sensors: FRAME_LATCH['SENSORS'] mapping of sensor name to
+                {'CAMERA': ..., 'ROLLER_ID_FROM': sensor whose edge count numbers the rollers}
+        """
+        self.names = list(latch_sensors)
+        self.roller_id_from = {
+            name: spec.get('ROLLER_ID_FROM', name) for name, spec in latch_sensors.items()
+        }
+
+        self._data = RawArray('d', self.FIELDS * len(self.names))
+        self._versions = RawArray('q', len(self.names))
+        self._data_np = None
+        self._versions_np = None
+
+        # Writer-side state, only meaningful in the PLC process
+        self._previous_states = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_data_np'] = None
+        state['_versions_np'] = None
+        return state
+
+    def _views(self):
+        if self._data_np is None:
+            self._data_np = np.frombuffer(self._data, dtype=np.float64).reshape(len(self.names), self.FIELDS)
+            self._versions_np = np.frombuffer(self._versions, dtype=np.int64)
+        return self._data_np, self._versions_np
+
+    def tag(self, name: str) -> int:
+        """Index of a sensor on the board; stored as the tag of latched frames."""
+        return self.names.index(name)
+
+    def record(self, name: str, state: bool, timestamp: float) -> bool:
+        """
+        Feed the current state of a sensor and publish a rising edge.
+
+        Args:
+            name: Sensor name
+            state: Current sensor state
+            timestamp: Estimated time of the edge if this sample is one
+
+        Returns:
+            True if this sample was a rising edge
+        """
+        previous = self._previous_states.get(name, False)
+        self._previous_states[name] = state
+        if not state or previous:
+            return False
+
+        data, versions = self._views()
+        index = self.names.index(name)
+        count = int(data[index, self.FIELD_COUNT]) + 1
+
+        source = self.roller_id_from[name]
+        if source == name:
+            roller_id = count
+        else:
+            roller_id = int(data[self.names.index(source), self.FIELD_COUNT])
+
+        versions[index] += 1
+        data[index, self.FIELD_COUNT] = count
+        data[index, self.FIELD_TIMESTAMP] = timestamp
+        data[index, self.FIELD_ROLLER_ID] = roller_id
+        versions[index] += 1
+        return True
+
+    def read(self, name: str) -> SensorEdge:
+        """
+        Read the latest rising edge of a sensor.
+
+        Args:
+            name: Sensor name
+
+        Returns:
+            SensorEdge (count 0 if the sensor has not fired yet)
+        """
+        return self.read_index(self.names.index(name))
+
+    def read_index(self, index: int) -> SensorEdge:
+        """Read the latest rising edge of the sensor at a board index."""
+        data, versions = self._views()
+        while True:
+            version = int(versions[index])
+            if version & 1:
+                continue
+            values = data[index].copy()
+            if int(versions[index]) == version:
+                return SensorEdge(
+                    int(values[self.FIELD_COUNT]),
+                    float(values[self.FIELD_TIMESTAMP]),
+                    int(values[self.FIELD_ROLLER_ID])
+                )
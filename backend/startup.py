@@ -0,0 +1,208 @@
+"""
+Startup orchestration and timeline
+
+StartupGraph runs named tasks on a thread pool as soon as their
+dependencies have finished, so independent work (loading several models,
+decoding warmup images, warming up a model whose weights are ready) overlaps
+instead of running back to back. Processes already start concurrently;
+within a process the graph is what parallelises the remaining work.
+
+Every process records its phases into shared_data under 'startup_phase_*'
+with time.perf_counter() timestamps (system-wide, like the frame
+timestamps). The GUI assembles them, together with the camera open times
+from the capture metrics, into one timeline that can be exported as a
+Chrome trace (chrome://tracing or Perfetto) and is shown in the Diagnosis tab.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+STARTUP_PHASE_PREFIX = "startup_phase_"
+
+
+def record_phase(shared_data, name: str, start: float, end: float, category: str = "startup") -> None:
+    """
+    Publish one startup phase.
+
+    Args:
+        shared_data: Shared dictionary (None = do not publish)
+        name: Phase name, unique per startup
+        start: time.perf_counter() when the phase began
+        end: time.perf_counter() when it finished
+        category: Group shown in the timeline ('model', 'warmup', 'camera', 'plc', ...)
+    """
+    if shared_data is None:
+        return
+    shared_data[STARTUP_PHASE_PREFIX + name] = {
+        'name': name,
+        'category': category,
+        'start': start,
+        'end': end,
+        'pid': os.getpid(),
+        'tid': threading.get_ident()
+    }
+
+
+@contextmanager
+def startup_phase(shared_data, name: str, category: str = "startup"):
+    """Context manager recording the enclosed block as a startup phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(shared_data, name, start, time.perf_counter(), category)
+
+
+def reset_startup_timeline(shared_data) -> None:
+    """Remove the phases of a previous startup."""
+    for key in [key for key in shared_data.keys() if key.startswith(STARTUP_PHASE_PREFIX)]:
+        shared_data.pop(key, None)
+
+
+def collect_startup_timeline(shared_data, capture_metrics: dict = None) -> list:
+    """
+    Gather every recorded phase, oldest first.
+
+    Args:
+        shared_data: Shared dictionary
+        capture_metrics: Camera name -> capture SharedMetrics; adds one
+            'camera_open' phase per camera (open started -> first frame)
+
+    Returns:
+        List of phase dicts with name, category, start, end, pid, tid
+    """
+    phases = [dict(value) for key, value in shared_data.items() if key.startswith(STARTUP_PHASE_PREFIX)]
+
+    for camera_name, metrics in (capture_metrics or {}).items():
+        open_started = metrics.get('open_started_time')
+        first_frame = metrics.get('first_frame_time')
+        if open_started and first_frame:
+            phases.append({
+                'name': f"camera_open:{camera_name}",
+                'category': 'camera',
+                'start': open_started,
+                'end': first_frame,
+                'pid': 0,
+                'tid': 0
+            })
+
+    phases.sort(key=lambda phase: phase['start'])
+    return phases
+
+
+def export_chrome_trace(phases: list, path: str) -> str:
+    """
+    Write phases as a Chrome trace-event JSON file.
+
+    Returns:
+        The path written
+    """
+    origin = min((phase['start'] for phase in phases), default=0.0)
+    events = [
+        {
+            'name': phase['name'],
+            'cat': phase['category'],
+            'ph': 'X',
+            'ts': (phase['start'] - origin) * 1e6,
+            'dur': (phase['end'] - phase['start']) * 1e6,
+            'pid': phase['pid'],
+            'tid': phase['tid']
+        }
+        for phase in phases
+    ]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, indent=1)
+    return path
+
+
+class StartupGraph:
+    """
+    Dependency graph of startup tasks executed on a thread pool.
+
+    Tasks start as soon as all their dependencies have succeeded. If a task
+    fails, its dependents are skipped and run() raises the first error once
+    the remaining independent tasks have finished.
+    """
+
+    def __init__(self, shared_data=None, max_workers: int = 4):
+        """
+        Args:
+            shared_data: Shared dictionary receiving one phase per task
+            max_workers: Tasks running at once
+        """
+        self.shared_data = shared_data
+        self.max_workers = max_workers
+        self.tasks = {}
+
+    def add(self, name: str, fn, deps=(), category: str = "startup") -> None:
+        """
+        Add a task.
+
+        Args:
+            name: Unique task name (also the phase name)
+            fn: Callable taking no arguments
+            deps: Names of tasks that must finish first
+            category: Timeline category of the phase
+        """
+        self.tasks[name] = (fn, tuple(deps), category)
+
+    def _run_task(self, name):
+        fn, _, category = self.tasks[name]
+        with startup_phase(self.shared_data, name, category):
+            return fn()
+
+    def run(self) -> dict:
+        """
+        Execute every task.
+
+        Returns:
+            Dict of task name -> return value
+        """
+        for name, (_, deps, _) in self.tasks.items():
+            missing = [dep for dep in deps if dep not in self.tasks]
+            if missing:
+                raise ValueError(f"Startup task '{name}' depends on unknown task(s) {missing}")
+
+        results = {}
+        failed = {}
+        pending = dict(self.tasks)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            while pending or running:
+                progressed = False
+                for name in list(pending):
+                    deps = pending[name][1]
+                    if any(dep in failed for dep in deps):
+                        failed[name] = None  # Skipped because a dependency failed
+                        del pending[name]
+                        progressed = True
+                    elif all(dep in results for dep in deps):
+                        running[pool.submit(self._run_task, name)] = name
+                        del pending[name]
+                        progressed = True
+
+                if not running:
+                    if pending and not progressed:
+                        raise ValueError(f"Startup tasks {sorted(pending)} have circular dependencies")
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        failed[name] = e
+
+        errors = [(name, error) for name, error in failed.items() if error is not None]
+        if errors:
+            name, error = errors[0]
+            raise RuntimeError(f"Startup task '{name}' failed: {error}") from error
+        return results
@@ -0,0 +1,239 @@
+"""
+Global storage governor for saved images and recordings
+
+IMAGE_LIMIT_PER_DIRECTORY caps each directory by file count only. The
+governor adds two global limits across every image directory and the
+video recorder's segments:
+
+- a byte budget for all saved images and recordings together, and
+- a minimum free-space floor on the disk holding them.
+
+Data is evicted by priority: tiers with a lower PRIORITY value (All
+Frames) are emptied oldest-first before any higher tier (Defect images)
+is touched, and within a tier the oldest image across its directories
+goes first.
+
+Every inference process runs a governor thread over the directories it
+writes, using the retention indexes it already keeps (no directory scans);
+the video recorder process runs one over its SegmentRetention lists.
+Each governor publishes its bytes per tier in a SharedMetrics block; the
+governors read each other's blocks, so a process only evicts a tier once
+no process holds data in a lower tier, and each takes its share of the
+excess in proportion to the bytes it holds in that tier. Eviction runs in
+batches on the governor thread, never in the inference loop or on the
+image writer threads.
+"""
+import os
+import shutil
+import threading
+import time
+
+from .metrics import SharedMetrics
+from .retention_index import get_retention_index
+
+MB = 1024 * 1024
+GB = 1024 * MB
+
+# Storage sections of IMAGE_STORAGE_PATHS, one governor tier each
+STORAGE_TIERS = ('ALL_FRAMES', 'INFERENCE')
+
+# Tier of the video recorder's segments
+RECORDINGS_TIER = 'RECORDINGS'
+
+# Fields of the per-process storage metrics block
+STORAGE_METRICS = (
+    'bytes_used_mb',        # Files in this process's directories
+    'bytes_all_frames_mb',  # ... of which All Frames
+    'bytes_inference_mb',   # ... of which Defect (inference) images
+    'bytes_recordings_mb',  # ... of which video recordings
+    'files',                # Files in this process's directories
+    'free_mb',              # Free space on the image disk
+    'evicted_files',        # Files deleted by the governor
+    'evicted_mb',           # Megabytes deleted by the governor
+    'eviction_rate',        # Files deleted per second over the last pass
+    'last_pass_ms',         # Duration of the last check/eviction pass
+    'over_limit'            # 1 while over the byte budget or under the free-space floor
+)
+
+
+def new_storage_metrics() -> SharedMetrics:
+    """Create the shared metrics block for one storage governor."""
+    return SharedMetrics(STORAGE_METRICS)
+
+
+def tier_field(tier: str) -> str:
+    """Metrics field holding a tier's bytes."""
+    return f"bytes_{tier.lower()}_mb"
+
+
+def governed_directories(storage_paths: dict, camera_type: str) -> dict:
+    """
+    Directories a camera's inference process writes, by tier.
+
+    Args:
+        storage_paths: IMAGE_STORAGE_PATHS
+        camera_type: 'BF' or 'OD'
+
+    Returns:
+        Dict of tier -> list of directories
+    """
+    return {
+        tier: list(storage_paths.get(tier, {}).get(camera_type, {}).values())
+        for tier in STORAGE_TIERS
+    }
+
+
+class StorageGovernor:
+    """Enforces the global byte budget and free-space floor for one process's directories."""
+
+    def __init__(self, config: dict, directories: dict, metrics_by_process: dict, process_name: str,
+                 indexes: dict = None):
+        """
+        Args:
+            config: STORAGE_GOVERNOR entry from config.py
+            directories: Tier -> directories of this process (governed_directories())
+            metrics_by_process: Process name -> storage SharedMetrics of every governor
+            process_name: Key of this process's block in metrics_by_process
+            indexes: Tier -> indexes to use instead of the directories' RetentionIndex
+                (anything with total_bytes, len(), oldest_time() and evict_oldest())
+        """
+        self.budget_bytes = config.get('BYTE_BUDGET_GB', 50) * GB
+        self.min_free_bytes = config.get('MIN_FREE_GB', 10) * GB
+        priority = config.get('PRIORITY', {})
+        # Every configured tier, so a process also waits while another process holds data in a lower tier
+        self.tiers = sorted(set(priority) | set(directories), key=lambda tier: priority.get(tier, 0))
+        self.interval = config.get('CHECK_INTERVAL_S', 2.0)
+        self.batch_files = config.get('BATCH_FILES', 200)
+
+        self.directories = directories
+        self.indexes = indexes or {}
+        self.metrics_by_process = metrics_by_process
+        self.metrics = metrics_by_process[process_name]
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        """Run passes every CHECK_INTERVAL_S on a daemon thread."""
+        self.thread = threading.Thread(target=self._run, name="storage-governor", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the governor thread after its current pass."""
+        self.stopped.set()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.run_pass()
+            except Exception as e:
+                print(f"❌ Storage governor error: {e}")
+
+    def _indexes(self, tier):
+        if tier in self.indexes:
+            return self.indexes[tier]
+        return [get_retention_index(directory) for directory in self.directories.get(tier, [])]
+
+    def _free_bytes(self) -> int:
+        free = None
+        for tier in self.tiers:
+            for directory in self.directories.get(tier, []):
+                if os.path.isdir(directory):
+                    disk_free = shutil.disk_usage(directory).free
+                    free = disk_free if free is None else min(free, disk_free)
+        return free if free is not None else self.min_free_bytes
+
+    def publish(self) -> dict:
+        """
+        Publish this process's usage.
+
+        Returns:
+            Dict of tier -> bytes held by this process
+        """
+        usage = {tier: sum(index.total_bytes for index in self._indexes(tier)) for tier in self.tiers}
+        self.metrics.set('bytes_used_mb', sum(usage.values()) / MB)
+        for tier, used in usage.items():
+            self.metrics.set(tier_field(tier), used / MB)
+        self.metrics.set('files', sum(len(index) for tier in self.tiers for index in self._indexes(tier)))
+        return usage
+
+    def global_usage(self) -> dict:
+        """Bytes per tier across every governor."""
+        return {
+            tier: sum(metrics.get(tier_field(tier)) for metrics in self.metrics_by_process.values()) * MB
+            for tier in self.tiers
+        }
+
+    def run_pass(self) -> int:
+        """
+        Check the limits once and evict a batch if needed.
+
+        Returns:
+            Bytes evicted
+        """
+        start = time.perf_counter()
+        usage = self.publish()
+        free = self._free_bytes()
+        self.metrics.set('free_mb', free / MB)
+
+        totals = self.global_usage()
+        excess = max(sum(totals.values()) - self.budget_bytes, self.min_free_bytes - free, 0)
+        self.metrics.set('over_limit', 1 if excess > 0 else 0)
+
+        evicted_bytes = evicted_files = 0
+        if excess > 0:
+            for tier in self.tiers:
+                if totals[tier] <= 0:
+                    continue
+                # Lowest tier still holding data anywhere; if this process has none of it, wait for the others
+                if usage[tier] > 0:
+                    share = excess * usage[tier] / totals[tier]
+                    evicted_bytes, evicted_files = self._evict(tier, share)
+                break
+
+        elapsed = time.perf_counter() - start
+        if evicted_files:
+            self.metrics.add('evicted_files', evicted_files)
+            self.metrics.add('evicted_mb', evicted_bytes / MB)
+            self.publish()
+        self.metrics.set('eviction_rate', evicted_files / max(self.interval, elapsed))
+        self.metrics.set('last_pass_ms', elapsed * 1000.0)
+        return evicted_bytes
+
+    def _evict(self, tier: str, target_bytes: float):
+        """Delete the oldest images of a tier (across its directories) up to a batch."""
+        indexes = self._indexes(tier)
+        evicted_bytes = evicted_files = 0
+        while evicted_bytes < target_bytes and evicted_files < self.batch_files:
+            candidates = [(index.oldest_time(), i) for i, index in enumerate(indexes)]
+            candidates = [(stamp, i) for stamp, i in candidates if stamp is not None]
+            if not candidates:
+                break
+            _, oldest = min(candidates)
+            evicted = indexes[oldest].evict_oldest()
+            if evicted is None:
+                continue
+            evicted_bytes += evicted[1]
+            evicted_files += 1
+        return evicted_bytes, evicted_files
+
+
+def create_storage_governor(config: dict, storage_paths: dict, camera_type: str,
+                            metrics_by_process: dict, process_name: str):
+    """
+    Start the storage governor of an inference process.
+
+    Args:
+        config: STORAGE_GOVERNOR entry from config.py
+        storage_paths: IMAGE_STORAGE_PATHS
+        camera_type: 'BF' or 'OD'
+        metrics_by_process: Process name -> storage SharedMetrics of every governor
+        process_name: Key of this process's block
+
+    Returns:
+        The running StorageGovernor, or None if disabled
+    """
+    if not config or not config.get('ENABLED', False) or not metrics_by_process or not storage_paths:
+        return None
+    governor = StorageGovernor(config, governed_directories(storage_paths, camera_type), metrics_by_process, process_name)
+    governor.start()
+    return governor
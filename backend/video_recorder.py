@@ -0,0 +1,452 @@
+"""
+Rolling video-segment recorder for continuous capture
+
+For process audits every frame of every camera can be recorded. The
+recorder runs in its own process and only reads the shared frame rings,
+so the capture and inference processes are unaffected. It reads each ring
+in sequence order (next_after), so every frame is recorded unless the
+recorder falls more than a ring behind; such gaps are counted as missed.
+
+Frames go into time-bounded video segments written with cv2.VideoWriter
+(MJPG in AVI by default, or any FOURCC/container the OpenCV build
+supports, e.g. 'avc1' in MP4). Next to each segment a CSV sidecar lists,
+per video frame, the ring sequence number, the capture timestamp
+(time.perf_counter()) and the wall-clock time. Retention works on whole
+segments: the oldest segment (video + sidecar) is deleted once a camera
+exceeds MAX_SEGMENTS or MAX_GB. The segments are also the RECORDINGS tier
+of the storage governor, so they count against the global byte budget
+and free-space floor, and no new segment is opened while the disk is
+below the floor.
+
+Encoding is the recorder's cost per frame. Each camera records on its own
+thread and cv2 releases the GIL while encoding, so the cameras encode on
+separate cores. If a camera still cannot be recorded at its full rate
+(frames_missed keeps growing in the Diagnosis tab), SCALE records a
+downscaled copy (QUALITY sets the MJPG quality where the VideoWriter
+backend supports it).
+
+Recording is switched on and off with shared_data['record_video']; the
+stop event closes the open segments before the process is terminated.
+An error while writing (disk full, codec failure) ends only the open
+segment: it is counted in the metrics and a new segment is opened after
+an exponential backoff, so a camera keeps recording once the cause clears.
+"""
+import os
+import shutil
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from .metrics import SharedMetrics
+from .storage_governor import RECORDINGS_TIER, StorageGovernor
+
+MB = 1024 * 1024
+GB = 1024 * MB
+
+SIDECAR_EXTENSION = ".csv"
+SIDECAR_HEADER = "frame,seq,timestamp,wall_time\n"
+
+# Fields of the per-camera video recorder metrics block
+VIDEO_RECORDER_METRICS = (
+    'recording',            # 1 while a segment is open
+    'frames_recorded',      # Frames written to video segments
+    'frames_missed',        # Frames overwritten in the ring before the recorder read them
+    'segments_closed',      # Segments finished
+    'segments_evicted',     # Segments deleted by retention
+    'stored_mb',            # Closed segments kept on disk
+    'write_ms_last',        # Encode + write time of the last frame
+    'write_ms_max',         # Slowest frame so far
+    'errors'                # Segments abandoned after a write or open error
+)
+
+
+def new_video_recorder_metrics() -> SharedMetrics:
+    """Create the shared metrics block for one camera's recorder."""
+    return SharedMetrics(VIDEO_RECORDER_METRICS)
+
+
+def sidecar_path(video_path: str) -> str:
+    """Path of the timestamp/seq index of a video segment."""
+    return os.path.splitext(video_path)[0] + SIDECAR_EXTENSION
+
+
+class SegmentRetention:
+    """
+    Closed segments of one camera directory, oldest first, kept within a count and byte limit.
+
+    Offers the eviction interface of RetentionIndex (total_bytes, len(),
+    oldest_time(), evict_oldest()) so the storage governor can evict
+    whole segments from its own thread.
+    """
+
+    def __init__(self, directory: str, extension: str, max_segments: int = 0, max_bytes: int = 0):
+        """
+        Args:
+            directory: Directory holding the segments (scanned immediately)
+            extension: Video file extension, e.g. '.avi'
+            max_segments: Segments kept at most (0 = no limit)
+            max_bytes: Bytes kept at most, videos and sidecars together (0 = no limit)
+        """
+        self.directory = directory
+        self.extension = extension
+        self.max_segments = max_segments
+        self.max_bytes = max_bytes
+        self.segments = deque()  # (video path, bytes, modification time), oldest first
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.scan()
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    @staticmethod
+    def _remove(video_path):
+        for path in (video_path, sidecar_path(video_path)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _size(video_path):
+        size = 0
+        for path in (video_path, sidecar_path(video_path)):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def scan(self) -> int:
+        """
+        Rebuild the list from the directory, ordered by modification time.
+
+        Returns:
+            Number of segments found
+        """
+        found = []
+        if os.path.isdir(self.directory):
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.lower().endswith(self.extension):
+                        found.append((entry.stat().st_mtime, entry.path))
+        found.sort()
+        segments = deque((path, self._size(path), mtime) for mtime, path in found)
+        with self.lock:
+            self.segments = segments
+            self.total_bytes = sum(size for _, size, _ in segments)
+        return len(segments)
+
+    def add(self, video_path: str) -> list:
+        """
+        Record a closed segment and delete the oldest ones beyond the limits.
+
+        Returns:
+            Video paths of the deleted segments
+        """
+        size = self._size(video_path)
+        evicted = []
+        with self.lock:
+            self.segments.append((video_path, size, time.time()))
+            self.total_bytes += size
+            while len(self.segments) > 1 and (
+                (self.max_segments and len(self.segments) > self.max_segments)
+                or (self.max_bytes and self.total_bytes > self.max_bytes)
+            ):
+                path, size, _ = self.segments.popleft()
+                self.total_bytes -= size
+                evicted.append(path)
+        for path in evicted:
+            self._remove(path)
+        return evicted
+
+    def oldest_time(self):
+        """Modification time of the oldest segment, or None."""
+        with self.lock:
+            return self.segments[0][2] if self.segments else None
+
+    def evict_oldest(self):
+        """
+        Delete the oldest segment (video + sidecar).
+
+        Returns:
+            (video path, bytes) of the removed segment, or None if there is none
+        """
+        with self.lock:
+            if not self.segments:
+                return None
+            path, size, _ = self.segments.popleft()
+            self.total_bytes -= size
+        self._remove(path)
+        return path, size
+
+
+class CameraRecorder:
+    """Records one camera's frame ring into rolling video segments."""
+
+    def __init__(self, camera_name: str, frame_ring, config: dict, fps: float = None, metrics: SharedMetrics = None,
+                 min_free_bytes: int = 0):
+        """
+        Args:
+            camera_name: Key of the camera in CAMERAS (used in file names)
+            frame_ring: SharedFrameRing of the camera
+            config: VIDEO_RECORDER entry from config.py
+            fps: Frame rate written into the video container (default: config FPS)
+            metrics: Optional block from new_video_recorder_metrics()
+            min_free_bytes: Free-space floor below which no new segment is opened (0 = no check)
+        """
+        self.camera_name = camera_name
+        self.ring = frame_ring
+        self.directory = os.path.join(config['DIR'], camera_name)
+        self.fourcc = cv2.VideoWriter_fourcc(*config.get('FOURCC', 'MJPG'))
+        self.extension = config.get('EXTENSION', '.avi')
+        self.segment_seconds = config.get('SEGMENT_SECONDS', 60)
+        self.fps = fps or config.get('FPS', 30)
+        self.quality = config.get('QUALITY')
+        self.metrics = metrics if metrics is not None else new_video_recorder_metrics()
+        self.min_free_bytes = min_free_bytes
+        self.backoff_initial = config.get('BACKOFF_INITIAL_MS', 500) / 1000.0
+        self.backoff_max = config.get('BACKOFF_MAX_MS', 30000) / 1000.0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.retention = SegmentRetention(
+            self.directory,
+            self.extension,
+            max_segments=config.get('MAX_SEGMENTS', 0),
+            max_bytes=int(config.get('MAX_GB', 0) * GB)
+        )
+        self.metrics.set('stored_mb', self.retention.total_bytes / MB)
+
+        height, width = frame_ring.frame_shape[:2]
+        scale = config.get('SCALE', 1.0)
+        self.frame_size = (int(width * scale), int(height * scale))
+        self.buffer = np.empty(frame_ring.frame_shape, dtype=np.uint8)
+        # Downscaled frames are resized into one reused buffer
+        self.scaled = None
+        if self.frame_size != (width, height):
+            self.scaled = np.empty((self.frame_size[1], self.frame_size[0]) + frame_ring.frame_shape[2:], dtype=np.uint8)
+        self.last_seq = 0
+        self.segment_number = 0
+        self._writer = None
+        self._sidecar = None
+        self._path = None
+        self._segment_start = 0.0
+        self._segment_frames = 0
+
+    def _open_segment(self, timestamp):
+        # Leave the floor to the storage governor; the error path retries with backoff
+        if self.min_free_bytes and shutil.disk_usage(self.directory).free < self.min_free_bytes:
+            raise RuntimeError(f"free space in {self.directory} is below the storage floor")
+        self.segment_number += 1
+        name = f"{self.camera_name}_{time.strftime('%Y%m%d_%H%M%S')}_{self.segment_number:05d}{self.extension}"
+        path = os.path.join(self.directory, name)
+        writer = cv2.VideoWriter(path, self.fourcc, self.fps, self.frame_size)
+        if not writer.isOpened():
+            raise RuntimeError(f"cv2.VideoWriter could not open {path} (codec not available?)")
+        if self.quality is not None:
+            writer.set(cv2.VIDEOWRITER_PROP_QUALITY, self.quality)
+
+        self._writer = writer
+        self._path = path
+        self._sidecar = open(sidecar_path(path), "w", buffering=64 * 1024)
+        self._sidecar.write(SIDECAR_HEADER)
+        self._segment_start = timestamp
+        self._segment_frames = 0
+        self.metrics.set('recording', 1)
+
+    def close_segment(self) -> None:
+        """Finish the open segment (if any) and apply retention."""
+        if self._writer is None:
+            return
+        self._writer.release()
+        self._sidecar.close()
+        self._writer = None
+        self._sidecar = None
+        self.metrics.set('recording', 0)
+        self.metrics.add('segments_closed')
+
+        evicted = self.retention.add(self._path)
+        if evicted:
+            self.metrics.add('segments_evicted', len(evicted))
+        self.metrics.set('stored_mb', self.retention.total_bytes / MB)
+        self._path = None
+
+    def discard_segment(self) -> None:
+        """Drop the open segment after an error; whatever reached the disk stays under retention."""
+        writer, sidecar, path = self._writer, self._sidecar, self._path
+        self._writer = None
+        self._sidecar = None
+        self._path = None
+        self.metrics.set('recording', 0)
+        try:
+            if writer is not None:
+                writer.release()
+            if sidecar is not None:
+                sidecar.close()
+        except Exception:
+            pass
+        if path is not None and os.path.exists(path):
+            try:
+                evicted = self.retention.add(path)
+            except OSError:
+                return
+            if evicted:
+                self.metrics.add('segments_evicted', len(evicted))
+            self.metrics.set('stored_mb', self.retention.total_bytes / MB)
+
+    def record_available(self, max_frames: int = None, stop_event=None) -> int:
+        """
+        Write the frames published since the last call, at most one batch of them.
+
+        When encoding falls behind capture the ring keeps overwriting frames,
+        so the batch cap hands control back to run() (stop event and record
+        flag); the frames overwritten meanwhile are counted as frames_missed.
+
+        Args:
+            max_frames: Frames written at most (default: the ring's slot count)
+            stop_event: Optional event that ends the batch early
+
+        Returns:
+            Number of frames written
+        """
+        if max_frames is None:
+            max_frames = self.ring.slots
+        written = 0
+        while written < max_frames:
+            if stop_event is not None and stop_event.is_set():
+                return written
+            packet = self.ring.next_after(self.last_seq, out=self.buffer)
+            if packet is None:
+                return written
+            if self.last_seq and packet.seq - self.last_seq > 1:
+                self.metrics.add('frames_missed', packet.seq - self.last_seq - 1)
+            self.last_seq = packet.seq
+
+            if self._writer is not None and packet.timestamp - self._segment_start >= self.segment_seconds:
+                self.close_segment()
+            if self._writer is None:
+                self._open_segment(packet.timestamp)
+
+            start = time.perf_counter()
+            frame = packet.frame
+            if self.scaled is not None:
+                frame = cv2.resize(frame, self.frame_size, dst=self.scaled, interpolation=cv2.INTER_AREA)
+            self._writer.write(frame)
+            # Capture timestamps share the perf_counter clock; map them to wall-clock time for the index
+            wall_time = time.time() - (start - packet.timestamp)
+            self._sidecar.write(f"{self._segment_frames},{packet.seq},{packet.timestamp:.6f},{wall_time:.6f}\n")
+            self._segment_frames += 1
+            written += 1
+
+            write_ms = (time.perf_counter() - start) * 1000.0
+            self.metrics.add('frames_recorded')
+            self.metrics.set('write_ms_last', write_ms)
+            if write_ms > self.metrics.get('write_ms_max'):
+                self.metrics.set('write_ms_max', write_ms)
+        return written
+
+    def run(self, shared_data, stop_event, poll_interval: float = 0.1) -> None:
+        """
+        Record while shared_data['record_video'] is set, until stop_event is set.
+
+        Args:
+            shared_data: Shared dictionary holding the 'record_video' flag
+            stop_event: multiprocessing.Event that ends the recorder
+            poll_interval: Seconds between checks of the flag while idle
+        """
+        recording = False
+        next_check = 0.0
+        delay = self.backoff_initial
+        try:
+            while not stop_event.is_set():
+                # The flag lives in the manager process: check it once per poll interval, not per frame
+                now = time.perf_counter()
+                if now >= next_check:
+                    recording = shared_data.get('record_video', False)
+                    next_check = now + poll_interval
+                if not recording:
+                    self.close_segment()
+                    self.last_seq = 0
+                    stop_event.wait(poll_interval)
+                    continue
+                if not self.last_seq:
+                    # Start from the current frame, not from what the ring still holds
+                    self.last_seq = max(self.ring.latest_seq - 1, 0)
+                try:
+                    written = self.record_available(stop_event=stop_event)
+                except Exception as e:
+                    # Only this segment is lost; frames skipped during the backoff count as missed
+                    self.metrics.add('errors')
+                    print(f"⚠️ {self.camera_name} video recorder error: {e}. Reopening in {delay * 1000:.0f} ms")
+                    self.discard_segment()
+                    stop_event.wait(delay)
+                    delay = min(delay * 2, self.backoff_max)
+                    continue
+                if written:
+                    delay = self.backoff_initial
+                else:
+                    self.ring.wait_for_new(self.last_seq, timeout=poll_interval)
+        except Exception as e:
+            print(f"❌ {self.camera_name} video recorder error: {e}")
+        finally:
+            self.close_segment()
+
+
+def run_video_recorder(frame_rings: dict, shared_data, config: dict, metrics_by_camera: dict = None,
+                       stop_event=None, camera_fps: dict = None, storage_config: dict = None,
+                       storage_metrics: dict = None):
+    """
+    Video recorder process: one recording thread per camera.
+
+    Args:
+        frame_rings: Camera name -> SharedFrameRing
+        shared_data: Shared dictionary holding the 'record_video' flag
+        config: VIDEO_RECORDER entry from config.py
+        metrics_by_camera: Camera name -> block from new_video_recorder_metrics()
+        stop_event: multiprocessing.Event set to close the segments and exit
+        camera_fps: Camera name -> nominal frame rate for the video containers
+        storage_config: STORAGE_GOVERNOR entry from config.py
+        storage_metrics: Process name -> storage SharedMetrics of every governor ('RECORDER' is this process)
+    """
+    metrics_by_camera = metrics_by_camera or {}
+    camera_fps = camera_fps or {}
+    if stop_event is None:
+        stop_event = threading.Event()
+    governed = bool(storage_config and storage_config.get('ENABLED', False) and storage_metrics)
+    min_free_bytes = int(storage_config.get('MIN_FREE_GB', 10) * GB) if governed else 0
+
+    recorders = []
+    for name, ring in frame_rings.items():
+        try:
+            recorders.append(CameraRecorder(name, ring, config, camera_fps.get(name), metrics_by_camera.get(name),
+                                            min_free_bytes=min_free_bytes))
+        except OSError as e:
+            print(f"❌ Could not prepare {name} recordings in {config.get('DIR')}: {e}")
+    print(f"🎥 Video recorder ready for {', '.join(recorder.camera_name for recorder in recorders)}")
+
+    governor = None
+    if governed and recorders:
+        governor = StorageGovernor(
+            storage_config,
+            {RECORDINGS_TIER: [recorder.directory for recorder in recorders]},
+            storage_metrics,
+            'RECORDER',
+            indexes={RECORDINGS_TIER: [recorder.retention for recorder in recorders]}
+        )
+        governor.start()
+
+    # cv2 releases the GIL while encoding, so the cameras record in parallel
+    threads = [
+        threading.Thread(target=recorder.run, args=(shared_data, stop_event), name=f"recorder-{recorder.camera_name}", daemon=True)
+        for recorder in recorders
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if governor is not None:
+        governor.stop()
+    print("✅ Video recorder stopped, segments closed")
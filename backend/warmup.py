@@ -0,0 +1,127 @@
+"""
+Adaptive model warmup
+
+Each camera's warmup image is decoded once and kept in memory; when the
+camera publishes model-ready input (MODEL_INPUT), the image is letterboxed
+the same way so warmup hits the exact shapes production uses. Every model
+is then called through the production predict signature (confidence,
+imgsz, and the predictor's own device/half) until the latency of the last
+few runs has converged, instead of a fixed number of runs.
+"""
+import time
+
+import cv2
+import numpy as np
+
+from .preprocessing import compute_letterbox, new_model_input, letterbox_into
+
+
+def load_warmup_frames(warmup_images: dict, model_inputs: dict = None) -> dict:
+    """
+    Decode the warmup images once.
+
+    Args:
+        warmup_images: WARMUP_IMAGES mapping of camera name to image path
+        model_inputs: Camera name -> MODEL_INPUT config (or None)
+
+    Returns:
+        Dict of camera name -> (frame, imgsz); imgsz is None for full frames
+    """
+    model_inputs = model_inputs or {}
+    frames = {}
+    for camera_name, image_path in (warmup_images or {}).items():
+        frame = cv2.imread(image_path)
+        if frame is None:
+            print(f"⚠️ Warmup image not found for {camera_name}: {image_path}")
+            continue
+
+        model_input = model_inputs.get(camera_name)
+        if model_input:
+            transform = compute_letterbox(frame.shape, model_input['IMGSZ'], model_input.get('ROI'))
+            frame = letterbox_into(frame, new_model_input(transform), transform)
+            frames[camera_name] = (frame, transform.imgsz)
+        else:
+            frames[camera_name] = (frame, None)
+    return frames
+
+
+def has_converged(latencies, window: int, tolerance: float) -> bool:
+    """True if the last `window` latencies lie within `tolerance` of their median."""
+    if len(latencies) < window:
+        return False
+    recent = np.asarray(latencies[-window:])
+    median = np.median(recent)
+    return median > 0 and (recent.max() - recent.min()) <= tolerance * median
+
+
+def warmup_model(predictor, model_key: str, frame, conf: float, imgsz=None,
+                 min_runs: int = 3, max_runs: int = 30, window: int = 5, tolerance: float = 0.15) -> dict:
+    """
+    Call a model until its latency converges.
+
+    Args:
+        predictor: Object with predict(model_key, frame, conf, imgsz)
+        model_key: Key of the model in MODELS
+        frame: In-memory warmup frame
+        conf: Production confidence threshold of the model
+        imgsz: Production inference size (None = the model's own)
+        min_runs: Runs always made; convergence needs a full window, so the
+            effective minimum is max(min_runs, window)
+        max_runs: Upper bound if latency never converges
+        window: Number of recent runs compared for convergence
+        tolerance: Allowed spread of the window relative to its median
+
+    Returns:
+        Dict with 'runs', 'warmup_ms', 'latency_ms' (median of the window) and 'converged'
+    """
+    latencies = []
+    start = time.perf_counter()
+    converged = False
+    while len(latencies) < max_runs:
+        run_start = time.perf_counter()
+        predictor.predict(model_key, frame, conf, imgsz)
+        latencies.append(time.perf_counter() - run_start)
+        if len(latencies) >= min_runs and has_converged(latencies, window, tolerance):
+            converged = True
+            break
+
+    return {
+        'runs': len(latencies),
+        'warmup_ms': (time.perf_counter() - start) * 1000.0,
+        'latency_ms': float(np.median(latencies[-window:])) * 1000.0,
+        'converged': converged
+    }
+
+
+def warmup_configured_model(predictor, model_key: str, model_config: dict, warmup_frames: dict,
+                            warmup_config: dict = None):
+    """
+    Warm up one model from MODELS on its camera's in-memory frame.
+
+    Returns:
+        Warmup report, or None if the model has no warmup frame or warmup failed
+    """
+    warmup_config = warmup_config or {}
+    entry = warmup_frames.get(model_config.get('CAMERA'))
+    if entry is None:
+        return None
+    frame, imgsz = entry
+    try:
+        report = warmup_model(
+            predictor, model_key, frame,
+            conf=warmup_config.get('CONF', {}).get(model_key, 0.25),
+            imgsz=imgsz,
+            min_runs=warmup_config.get('MIN_RUNS', 3),
+            max_runs=warmup_config.get('MAX_RUNS', 30),
+            window=warmup_config.get('WINDOW', 5),
+            tolerance=warmup_config.get('TOLERANCE', 0.15)
+        )
+    except Exception as e:
+        print(f"Error during {model_key} warmup: {e}")
+        return None
+
+    status = "converged" if report['converged'] else "hit MAX_RUNS"
+    print(f"{model_key} warmup {status} after {report['runs']} runs "
+          f"({report['warmup_ms']:.0f} ms, {report['latency_ms']:.1f} ms/frame)")
+    return report
+
@@ -1,255 +1,375 @@
 """
 YOLO model processing for defect detection
 """
-import gc
 import cv2
-import numpy as np
-import os
-from ultralytics import YOLO
-import torch
-from backend.image_manager import save_defect_image, save_all_frames_image
+import time
+from functools import partial
+from backend.image_manager import save_defect_image, save_all_frames_image, archive_all_frames_image, close_frame_archives
+from backend.annotation import draw_detections
+from backend.image_writer import create_image_writer
+from backend.storage_governor import create_storage_governor
+from backend.detection_ring import SOURCE_FRAME_RING, SOURCE_LATCH_RING, class_names_key
+from backend.preprocessing import compute_letterbox, new_model_input, letterbox_into, boxes_to_frame
+from backend.memory_policy import MemoryPolicy
+from backend.frame_cursor import FrameCursor
+from backend.detection_postprocess import assign_defects, find_class_index
+from backend.roller_tracker import create_roller_tracker
 
+# How long a loop waits for a new frame before checking the latch ring again
+NEW_FRAME_WAIT_S = 0.005
 
-def process_rollers_bigface(shared_frame_bigface, frame_lock_bigface, roller_queue_bigface, model_bigface_path, proximity_count_bigface, roller_updation_dict, queue_lock, shared_data, frame_shape, shared_annotated_bigface, annotated_frame_lock_bigface):
+# A failing model or inference server is logged on the first error and then every this many
+INFERENCE_ERROR_LOG_EVERY = 100
+
+
+def predict_detections(predictor, model_key, frame, conf, model_input=None, transform=None):
+    """
+    Run a model and return its detections in full-frame pixels.
+
+    Args:
+        predictor: LocalPredictor or InferenceClient
+        model_key: Key of the model in MODELS
+        frame: Full camera frame (ignored when model_input is given)
+        conf: Confidence threshold
+        model_input: Optional letterboxed model-ready frame from the capture side
+        transform: LetterboxTransform of model_input
+
+    Returns:
+        Array of shape (N, 6) with x1, y1, x2, y2, conf, cls
+    """
+    if model_input is None:
+        return predictor.predict(model_key, frame, conf)
+
+    detections = predictor.predict(model_key, model_input, conf, imgsz=transform.imgsz)
+    return boxes_to_frame(detections, transform)
+
+
+def inference_failed(metrics, model_key, error):
+    """Count a failed prediction (server timeout or failure, model error); the loop skips the frame."""
+    metrics.add('inference_errors')
+    errors = int(metrics.get('inference_errors'))
+    if errors == 1 or errors % INFERENCE_ERROR_LOG_EVERY == 0:
+        print(f"⚠️ {model_key} inference failed, frame skipped ({errors} errors so far): {error}")
+
+
+def attribute_defects(detections, roller_class, roller_number, max_rollers, tracker=None):
+    """
+    Attribute the defects of one frame to roller IDs.
+
+    Uses the roller tracker when ROLLER_TRACKER is enabled, otherwise the
+    per-frame left-to-right assignment.
+
+    Returns:
+        DefectAssignment with the defects sorted by x1
+    """
+    if tracker is not None:
+        return tracker.update(detections, roller_class)
+    return assign_defects(detections, roller_class, roller_number, max_rollers)
+
+
+def read_full_frame(frame_ring, frame_seq):
+    """
+    Fetch the full frame a model input was made from.
+
+    Returns None if the ring has overwritten it meanwhile: the detections
+    belong to that frame, so they must not be saved on a newer one.
+    """
+    packet = frame_ring.get(frame_seq)
+    return None if packet is None else packet.frame
+
+
+def render_annotated(frame, detections, names, copy=False):
+    """
+    Return a callable drawing detections onto a frame, for the image writer threads.
+
+    Frames read from the rings are private copies that the loop no longer
+    touches once handed over, so the writer draws on them in place. Pass
+    copy=True when the raw frame is also queued for the frame archive.
+    """
+    return partial(draw_detections, frame, detections, names, copy=copy)
+
+
+def stop_requested(stop_event):
+    """Whether the GUI asked the loop to stop (no stop event = run until terminated)."""
+    return stop_event is not None and stop_event.is_set()
+
+
+def finish_image_saving(image_writer, governor=None, timeout=None):
+    """
+    Write out queued images and close the archive segments before the process exits.
+
+    Args:
+        image_writer: The loop's ImageWriterPool
+        governor: The loop's StorageGovernor, if running
+        timeout: Seconds to wait for the writer queue at most
+    """
+    if not image_writer.flush(timeout):
+        print(f"⚠️ Image writer still had {image_writer.jobs.qsize()} image(s) queued at shutdown")
+    close_frame_archives()
+    if governor is not None:
+        governor.stop()
+
+
+def archive_enabled(archive_config):
+    """Whether all-frames mode goes to the frame archive (FRAME_ARCHIVE) instead of one JPEG per frame."""
+    return bool(archive_config and archive_config.get('ENABLED', False))
+
+
+def process_rollers_bigface(frame_ring_bigface, latch_ring_bigface, edge_board, roller_queue_bigface, predictor, proximity_count_bigface, roller_updation_dict, queue_lock, shared_data, detection_ring_bigface, model_ring_bigface=None, model_input_bigface=None, memory_config=None, memory_metrics=None, inference_metrics=None, tracker_config=None, writer_config=None, writer_metrics=None, storage_config=None, storage_metrics=None, archive_config=None, stop_event=None):
     """Process frames for YOLO inference."""
     
     # Get configuration from shared_data
     storage_paths = shared_data.get('image_storage_paths', {})
     image_limit = shared_data.get('image_limit', 10000)
-    warmup_images = shared_data.get('warmup_images', {})
     
     bf_triggered = False
     roller_dict = {}
-    previous_head_status = False
      
-    model_bf_path = r"models//BF_sr.pt"
-    model_head_path = r"models//BF_Head.pt"
     bf_conf = shared_data.get("bigface_confidence", 0.2)
 
-    try: 
-        model_bf = YOLO(model_bf_path)
-        model_head = YOLO(model_head_path)
-
-        if torch.cuda.is_available():
-            model_bf.to("cuda")
-            model_head.to("cuda")
-            print("BF Model now loaded in GPU")
-            
-            # Set flag that BF model is loaded
-            shared_data['bf_model_loaded'] = True
-    except:
-        print("Model is not loaded exiting process")
-        return
-        
-    class_names = model_bf.names
-
-    # Load warmup frame from config
-    warmup_frame = warmup_images.get('BIGFACE', r"assets//images//Warmup BF.jpg")
+    # Loads the BF and head models here, or waits for the inference server
     try:
-        for i in range(30):  # Process 30 warmup frames
-            results = model_bf.predict(warmup_frame, device=0, conf=1, verbose=False)
-        print("BF Warmup image YOLO processing complete.")
+        predictor.start(shared_data)
     except Exception as e:
-        print(f"Error during YOLO inference on warmup image: {e}")
-
-    try:
-        for i in range(30):  # Process 30 warmup frames
-            results = model_head.predict(warmup_frame, device=0, conf=0.5, verbose=False)
-        print("Head Model Processed on Warmup Frame ")
-
-    except Exception as e:
-        print(f"Error during head classification model inference: {e}")
-
-    def point_inside(rectangle, list_of_all_rollers , roller_number):
-
-        length = len(list_of_all_rollers)
+        print(f"Model is not loaded exiting process: {e}")
+        return
 
-        check = 2 if roller_number > 2 else roller_number
+    print("BF and head models ready")
+    shared_data['bf_model_loaded'] = True
 
-        if length > check:
-            length =- 1
+    # Models and warmup allocations are long-lived: keep them out of the collector's way
+    memory = MemoryPolicy(memory_config or {}, memory_metrics)
+    memory.freeze_heap()
 
-        roller_dictioanry = { i : list_of_all_rollers[idx] for idx,i in enumerate(range(roller_number , roller_number - length , -1)) }
+    class_names = predictor.names('BF')
+    head_names = predictor.names('HEAD')
+    # The GUI draws the detection ring itself and needs the class names for the labels
+    shared_data[class_names_key('BF')] = class_names
 
-        for idx,roller in roller_dictioanry.items():
-            entire_coordinates = roller[1:5]    
-            x1, y1 ,x2, y2  = [ int(i) for i in rectangle]
-            decision = (entire_coordinates[0] <= x1 <= entire_coordinates[2] and entire_coordinates[1] <= y1 <= entire_coordinates[3]) or (entire_coordinates[0] <= x2 <= entire_coordinates[2] and entire_coordinates[1] <= y2 <= entire_coordinates[3])
-            if decision:
-                return idx
-        return 0
+    # Draws, encodes and saves annotated images off the inference path
+    image_writer = create_image_writer(writer_config, writer_metrics, name="bf-image-writer")
+    # Keeps all saved images within the global byte budget and free-space floor, in the background
+    governor = create_storage_governor(storage_config, storage_paths, 'BF', storage_metrics, 'BIGFACE')
 
     roller_id_counter = 0
-    previous_bf_state = False
     frame_number = 0
     latest_min = 180
     latest_max = 240
     frame_number_head = 0
+    OD_PRESENCE = False
 
     # Check if allow_all_images is enabled
     allow_all = shared_data.get('allow_all_images', False)
-    
-    while True:
-        
-        current_bf_state = shared_data["bigface_presence"]
-
-        if current_bf_state and not previous_bf_state:
-            roller_id_counter += 1
+    # All frames go to segment files instead of one JPEG each
+    archive_all = archive_enabled(archive_config)
 
-            bf_triggered = True
-            roller_dict[roller_id_counter] = {'defect': False , 'defect_names': ["No defect"]}
-            print(f"\n🎯 BF New roller detected! Assigned Roller ID: {roller_id_counter}")
-
-        current_head_state = shared_data["head_classification_sensor"]
+    roller_class_index = find_class_index(class_names, 'roller')
+    if roller_class_index is None:
+        print("Roller class not found in model.")
+        return
 
-        if current_head_state and not previous_head_status:
+    # Follows rollers across frames when ROLLER_TRACKER is enabled (None = per-frame assignment)
+    tracker = create_roller_tracker(tracker_config)
 
-            with frame_lock_bigface:
-                np_frame = np.frombuffer(shared_frame_bigface.get_obj(), dtype=np.uint8).reshape(frame_shape)
-                frame = np_frame.copy()
+    def classify_head(frame, roller_id):
+        """Run the head model on a frame latched at the head classification sensor."""
+        nonlocal frame_number_head
 
-            results = model_head.predict(frame, device=0, conf=0.7, verbose=False, half=True, agnostic_nms=True)
-            # ✅ Add cache clearing
-            torch.cuda.empty_cache()
-            gc.collect()
+        try:
+            detections = predictor.predict('HEAD', frame, conf=0.7)
+        except RuntimeError as e:
+            inference_failed(frame_cursor.metrics, 'HEAD', e)
+            return
 
-            boxes = results[0].boxes.xyxy.cpu().numpy()  # shape: [N, 4]
-            classes = results[0].boxes.cls.cpu().numpy()  # class IDs
+        boxes = detections[:, :4]  # shape: [N, 4]
+        classes = detections[:, 5]  # class IDs
 
-            x1r, y1r, x2r, y2r = 0, 0, 0, 0
-            x1d, y1d, x2d, y2d = 0, 0, 0, 0 
-            for (x1,y1,x2,y2),cls in zip(boxes,classes):
-                if cls == 0:
-                    x1d, y1d, x2d, y2d = x1, y1, x2, y2
-                elif cls == 1:
-                    x1r, y1r, x2r, y2r = x1, y1, x2, y2
+        x1r, y1r, x2r, y2r = 0, 0, 0, 0
+        x1d, y1d, x2d, y2d = 0, 0, 0, 0 
+        for (x1,y1,x2,y2),cls in zip(boxes,classes):
+            if cls == 0:
+                x1d, y1d, x2d, y2d = x1, y1, x2, y2
+            elif cls == 1:
+                x1r, y1r, x2r, y2r = x1, y1, x2, y2
 
 
-            horizontal_distance = ( (x2r - x1r) - (x2d - x1d) )/2
-            vertical_distance = ( (y2r - y1r) - (y2d - y1d) )/2
+        horizontal_distance = ( (x2r - x1r) - (x2d - x1d) )/2
+        vertical_distance = ( (y2r - y1r) - (y2d - y1d) )/2
 
-            distance_pixels = (horizontal_distance + vertical_distance)/2
+        distance_pixels = (horizontal_distance + vertical_distance)/2
 
-            if distance_pixels < latest_min:
-                head_type = "High Head"
-            elif distance_pixels > latest_max:
-                head_type = "Down Head"
-            else:
-                head_type = "Normal"
-            
-            print(f"HEAD TYPE: {head_type}, Roller ID: {roller_id_counter}")
-            if head_type == "High Head" or head_type == "Down Head":
-                data = roller_dict[roller_id_counter]["defect"] | True
-                defect_names = roller_dict[roller_id_counter]['defect_names'] + [head_type]
-                roller_dict[roller_id_counter] = {'defect': data, 'defect_names': defect_names}
+        if distance_pixels < latest_min:
+            head_type = "High Head"
+        elif distance_pixels > latest_max:
+            head_type = "Down Head"
+        else:
+            head_type = "Normal"
+        
+        print(f"HEAD TYPE: {head_type}, Roller ID: {roller_id}")
+        if (head_type == "High Head" or head_type == "Down Head") and roller_id in roller_dict:
+            data = roller_dict[roller_id]["defect"] | True
+            defect_names = roller_dict[roller_id]['defect_names'] + [head_type]
+            roller_dict[roller_id] = {'defect': data, 'defect_names': defect_names}
 
-            annotated_frame = results[0].plot()
+        def render_head():
+            # The raw frame may also be queued for the frame archive
+            annotated_frame = draw_detections(frame, detections, head_names, copy=archive_head)
 
-            roller_text = f"Roller Id : {roller_id_counter}"
+            roller_text = f"Roller Id : {roller_id}"
             head_type_text = f"Head Type : {head_type}"
             distance_text = f"Distance : {distance_pixels:.2f}mm"
 
             cv2.putText(annotated_frame, roller_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             cv2.putText(annotated_frame, head_type_text, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             cv2.putText(annotated_frame, distance_text, (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            
-            frame_number_head += 1
-            
-            # Check if allow_all_images is enabled
-            allow_all = shared_data.get('allow_all_images', False)
-            
-            if allow_all:
-                # Save all head frames
-                save_all_frames_image(annotated_frame, 'BF', frame_number_head, storage_paths, is_head=True, max_images=image_limit)
-            
-            # Always save head defect frames
-            if head_type == "High Head" or head_type == "Down Head":
-                save_defect_image(annotated_frame, 'BF', frame_number_head, storage_paths, is_head_defect=True, max_images=image_limit)
-    
+            return annotated_frame
+        
+        frame_number_head += 1
+        
+        # Check if allow_all_images is enabled
+        allow_all_head = shared_data.get('allow_all_images', False)
+        
+        archive_head = allow_all_head and archive_all
+        
+        saves = []
+        if archive_head:
+            # Archive the raw head frame with its detections
+            image_writer.submit(frame, partial(archive_all_frames_image, camera_type='BF', frame_number=frame_number_head, storage_paths=storage_paths, is_head=True, roller_id=roller_id, timestamp=time.time(), detections=detections, archive_config=archive_config, max_images=image_limit))
+        elif allow_all_head:
+            # Save all head frames
+            saves.append(partial(save_all_frames_image, camera_type='BF', frame_number=frame_number_head, storage_paths=storage_paths, is_head=True, max_images=image_limit))
+        
+        # Always save head defect frames
+        if head_type == "High Head" or head_type == "Down Head":
+            saves.append(partial(save_defect_image, camera_type='BF', frame_number=frame_number_head, storage_paths=storage_paths, is_head_defect=True, max_images=image_limit))
 
-        previous_head_status = current_head_state
+        if saves:
+            image_writer.submit(render_head, *saves)
 
-        if bf_triggered:
-            with frame_lock_bigface:
-                np_frame = np.frombuffer(shared_frame_bigface.get_obj(), dtype=np.uint8).reshape(frame_shape)
-                frame = np_frame.copy()
+    # Model-ready input produced by the capture process (ROI + letterbox), if enabled
+    model_transform = None
+    if model_ring_bigface is not None:
+        model_transform = compute_letterbox(frame_ring_bigface.frame_shape, model_input_bigface['IMGSZ'], model_input_bigface.get('ROI'))
+        model_buffer = new_model_input(model_transform)
 
-            proximity_count_bigface.value += 1
-            pc = proximity_count_bigface.value
+    def detect_bf_defects(frame, model_input=None, frame_seq=0, source=SOURCE_FRAME_RING):
+        """Run the BF model on a frame and attribute defects to rollers in view."""
+        nonlocal frame_number
 
-            roller_class_index = next((key for key, value in model_bf.names.items() if value == 'roller'), None)
+        proximity_count_bigface.value += 1
 
-            results = model_bf.predict(frame, device=0, conf=bf_conf, verbose=False, half=True, agnostic_nms=True)
-            # ✅ Add cache clearing
-            torch.cuda.empty_cache()
-            gc.collect()
+        if model_transform is not None and model_input is None:
+            model_input = letterbox_into(frame, model_buffer, model_transform)
 
-            boxes = results[0].boxes
+        try:
+            detections_array = predict_detections(predictor, 'BF', frame, bf_conf, model_input, model_transform)
+        except RuntimeError as e:
+            inference_failed(frame_cursor.metrics, 'BF', e)
+            return
 
-            if roller_class_index is None:
-                print("Roller class not found in model.")
-                return
-            
+        # Defects sorted left to right, each with the roller it lies on (0 = none);
+        # runs on empty frames too so the tracker can age its tracks
+        assignment = attribute_defects(detections_array, roller_class_index, roller_id_counter, 2, tracker)
 
-            detections_for_filter = []
-            if results and results[0].boxes.data is not None:
-                for box in results[0].boxes.data:
-                    x1, y1, x2, y2, conf, cls = box 
-                    cls = int(cls)
-                    label = "roller" if cls == roller_class_index else class_names[cls]
-                    detections_for_filter.append((label, int(x1), int(y1), int(x2), int(y2), cls, float(conf)))
+        if len(detections_array) > 0:
+            frame_number += 1
 
-            filtered_detections = detections_for_filter
-            detections = sorted(filtered_detections, key=lambda x: x[1])  # Sort by x-coordinate
-            
-            
-
-                
+            # Raw detections only; the GUI renders them at display resolution
+            detection_ring_bigface.write(detections_array, frame_seq, source)
 
-            if len(detections) > 0:
-                frame_number += 1
-                annotated_frame = results[0].plot()
-                
-                
-                with annotated_frame_lock_bigface:
-                    np_annotated = np.frombuffer(shared_annotated_bigface.get_obj(), dtype=np.uint8).reshape(frame_shape)
-                    np.copyto(np_annotated, annotated_frame)
-
-                roller_only_sorted = [detection for detection in detections if detection[0] == "roller" and detection[-1] > 0.80]
-                defect_only_sorted = [detection for detection in detections if detection[0] != "roller"]
-
-                # Check if there are any defects
-                has_defects = len(defect_only_sorted) > 0
-                
-                # Save based on mode
-                if allow_all:
-                    # Save all frames (with or without defects)
-                    save_all_frames_image(annotated_frame, 'BF', frame_number, storage_paths, is_head=False, max_images=image_limit)
-                elif has_defects:
-                    # Only save frames with defects
-                    save_defect_image(annotated_frame, 'BF', frame_number, storage_paths, is_head_defect=False, max_images=image_limit)
+            # Check if there are any defects
+            has_defects = len(assignment.classes) > 0
+            
+            # Save based on mode
+            if (allow_all or has_defects) and frame is None:
+                # Only the model input was inferred: copy the full frame before the ring overwrites it
+                frame = read_full_frame(frame_ring_bigface, frame_seq)
+                if frame is None:
+                    frame_cursor.metrics.add('frames_unsaved')
+            if frame is None:
+                pass  # Nothing to save, or the frame was overwritten while it was inferred
+            elif allow_all and archive_all:
+                # Archive all raw frames with their detections
+                image_writer.submit(frame, partial(archive_all_frames_image, camera_type='BF', frame_number=frame_number, storage_paths=storage_paths, is_head=False, roller_id=roller_id_counter, timestamp=time.time(), detections=detections_array, archive_config=archive_config, max_images=image_limit))
+            elif allow_all:
+                # Save all frames (with or without defects)
+                image_writer.submit(render_annotated(frame, detections_array, class_names), partial(save_all_frames_image, camera_type='BF', frame_number=frame_number, storage_paths=storage_paths, is_head=False, max_images=image_limit))
+            elif has_defects:
+                # Only save frames with defects
+                image_writer.submit(render_annotated(frame, detections_array, class_names), partial(save_defect_image, camera_type='BF', frame_number=frame_number, storage_paths=storage_paths, is_head_defect=False, max_images=image_limit))
+
+
+            for cls, roller_id in zip(assignment.classes, assignment.roller_ids):
+
+                if roller_id == 0:
+                    continue
+                roller_id = int(roller_id)
+
+                defect_detected = True
+
+                defect_name = class_names[int(cls)]
+
+                # print(" found roller_id has defect " , roller_id , " with defect name " , defect_name)
+                if roller_id in roller_dict:
+                    data = roller_dict[roller_id]["defect"] | defect_detected
+                    defect_names = roller_dict[roller_id]['defect_names'] + [defect_name]
+                    roller_dict[roller_id] = {'defect': data, 'defect_names': defect_names}
+                else:
+                    roller_dict[roller_id] = {'defect': defect_detected, 'defect_names': [defect_name]}
+
+    presence_tag = edge_board.tag('bigface_presence')
+    head_tag = edge_board.tag('head_classification_sensor')
+    last_latch_seq = latch_ring_bigface.latest_seq
+    # Continuous inference reads model-ready input when the capture side publishes it
+    frame_cursor = FrameCursor(model_ring_bigface if model_ring_bigface is not None else frame_ring_bigface, inference_metrics)
+
+    # Wait for the first frame from the camera
+    while frame_ring_bigface.latest_seq == 0 or (model_ring_bigface is not None and model_ring_bigface.latest_seq == 0):
+        if stop_requested(stop_event):
+            return
+        time.sleep(0.01)
+    
+    # Runs until the GUI sets the stop event (or terminates the process)
+    while not stop_requested(stop_event):
 
+        # Frames latched by the capture process at the PLC sensor edges
+        latched = latch_ring_bigface.next_after(last_latch_seq)
+        busy = latched is not None
+        while latched is not None:
+            last_latch_seq = latched.seq
 
-                for detection in defect_only_sorted:
+            if latched.tag == presence_tag:
+                if latched.roller_id != roller_id_counter:
+                    roller_id_counter = latched.roller_id
 
-                    roller_id = point_inside(detection[1:5] , roller_only_sorted , roller_id_counter)
+                    bf_triggered = True
+                    roller_dict[roller_id_counter] = {'defect': False , 'defect_names': ["No defect"]}
+                    print(f"\n🎯 BF New roller detected! Assigned Roller ID: {roller_id_counter}")
 
-                    if roller_id == 0:
-                        continue
+                    if tracker is not None:
+                        # Defects the tracker saw on this roller before the sensor fired
+                        carried = [class_names[int(cls)] for cls in tracker.register(roller_id_counter)]
+                        if carried:
+                            roller_dict[roller_id_counter] = {'defect': True, 'defect_names': ["No defect"] + carried}
 
-                    defect_detected =  False if roller_id == 0 else True
+                detect_bf_defects(latched.frame, frame_seq=latched.seq, source=SOURCE_LATCH_RING)
+                frame_cursor.metrics.add('latched_inferred')
 
-                    defect_name = "No Defect" if not defect_detected else model_bf.names[detection[5]]
+            elif latched.tag == head_tag:
+                classify_head(latched.frame, latched.roller_id)
+                frame_cursor.metrics.add('latched_inferred')
 
-                    # print(" found roller_id has defect " , roller_id , " with defect name " , defect_name)
-                    if roller_id in roller_dict:
-                        data = roller_dict[roller_id]["defect"] | defect_detected
-                        defect_names = roller_dict[roller_id]['defect_names'] + [defect_name]
-                        roller_dict[roller_id] = {'defect': data, 'defect_names': defect_names}
-                    else:
-                        roller_dict[roller_id] = {'defect': defect_detected, 'defect_names': [defect_name]}
+            latched = latch_ring_bigface.next_after(last_latch_seq)
 
-    
+        if bf_triggered:
+            # Every new frame is inferred once; wait briefly instead of re-running the same frame
+            packet = frame_cursor.next(NEW_FRAME_WAIT_S)
+            if packet is not None:
+                busy = True
+                if model_ring_bigface is not None:
+                    detect_bf_defects(None, packet.frame, packet.source_seq)
+                else:
+                    detect_bf_defects(packet.frame, frame_seq=packet.seq)
 
             if shared_data['od_presence'] and not OD_PRESENCE and len(roller_dict) > 0:
                 
@@ -265,141 +385,188 @@ def process_rollers_bigface(shared_frame_bigface, frame_lock_bigface, roller_que
 
             elif not shared_data['od_presence']:
                 OD_PRESENCE = False   
-                
-        previous_bf_state = current_bf_state
+        else:
+            # Nothing to infer until a roller is latched
+            latch_ring_bigface.wait_for_new(last_latch_seq, NEW_FRAME_WAIT_S)
+
+        # Reclaims only when over budget or idle; a no-op between checks
+        memory.maybe_reclaim(busy)
 
-def process_frames_od(shared_frame_od, frame_lock_od, roller_queue_od, queue_lock, shared_data, frame_shape, roller_updation_dict, shared_annotated_od, annotated_frame_lock_od):
+    # Graceful stop: queued images and open archive segments are written out
+    finish_image_saving(image_writer, governor, (writer_config or {}).get('FLUSH_TIMEOUT_S', 5.0))
+
+def process_frames_od(frame_ring_od, latch_ring_od, edge_board, roller_queue_od, predictor, queue_lock, shared_data, roller_updation_dict, detection_ring_od, model_ring_od=None, model_input_od=None, memory_config=None, memory_metrics=None, inference_metrics=None, tracker_config=None, writer_config=None, writer_metrics=None, storage_config=None, storage_metrics=None, archive_config=None, stop_event=None):
     """Process frames for YOLO inference and track roller defects with pulse debounce & proper exit handling."""
 
     # Get configuration from shared_data
     storage_paths = shared_data.get('image_storage_paths', {})
     image_limit = shared_data.get('image_limit', 10000)
-    warmup_images = shared_data.get('warmup_images', {})
-
-    def point_inside(rectangle, list_of_all_rollers , roller_number): 
-        
-        length = len(list_of_all_rollers)
 
-        check = 3 if roller_number > 3 else roller_number
-
-        if length > check:
-            length =- 1
+    od_conf = shared_data.get("od_confidence", 0.2)
 
-        roller_dictioanry = { i : list_of_all_rollers[idx] for idx,i in enumerate(range(roller_number , roller_number - length , -1)) }
+    # Loads the OD model here, or waits for the inference server
+    try:
+        predictor.start(shared_data)
+    except Exception as e:
+        print(f"Model is not loaded exiting process: {e}")
+        return
 
-        for idx,roller in roller_dictioanry.items():
-            entire_coordinates = roller[1:5]    
-            x1, y1 ,x2, y2  = [ int(i) for i in rectangle]
-            decision = (entire_coordinates[0] <= x1 <= entire_coordinates[2] and entire_coordinates[1] <= y1 <= entire_coordinates[3]) or (entire_coordinates[0] <= x2 <= entire_coordinates[2] and entire_coordinates[1] <= y2 <= entire_coordinates[3])
-            if decision:
-                return idx
-        return 0
+    print("OD model ready")
+    shared_data['od_model_loaded'] = True
 
-    model_od_path = r"models//OD_sr.pt"
-    od_conf = shared_data.get("od_confidence", 0.2)
+    # Models and warmup allocations are long-lived: keep them out of the collector's way
+    memory = MemoryPolicy(memory_config or {}, memory_metrics)
+    memory.freeze_heap()
 
-    try: 
-        model_od = YOLO(model_od_path)
+    od_names = predictor.names('OD')
+    # The GUI draws the detection ring itself and needs the class names for the labels
+    shared_data[class_names_key('OD')] = od_names
+    od_roller_class = find_class_index(od_names, 'roller')
+    if od_roller_class is None:
+        od_roller_class = 5
+        print(f"⚠️ Roller class not found in OD model, using class {od_roller_class}")
 
-        if torch.cuda.is_available():
-            model_od.to("cuda")
-            print("OD Model now loaded in GPU")
-            
-            # Set flag that OD model is loaded
-            shared_data['od_model_loaded'] = True
-    except:
-        print("Model is not loaded exiting process")
-        return
+    # Follows rollers across frames when ROLLER_TRACKER is enabled (None = per-frame assignment)
+    tracker = create_roller_tracker(tracker_config)
 
-    # Load warmup frame from config
-    warmup_frame = warmup_images.get('OD', r"assets//images//Warmup OD.jpg")
-    try:
-        for i in range(30):  
-            model_od.predict(warmup_frame, device=0, conf=0.2, verbose=False)
-        print("OD Warmup image YOLO processing complete.")
-    except Exception as e:
-        print(f"Error during YOLO inference on warmup image: {e}")
+    # Draws, encodes and saves annotated images off the inference path
+    image_writer = create_image_writer(writer_config, writer_metrics, name="od-image-writer")
+    # Keeps all saved images within the global byte budget and free-space floor, in the background
+    governor = create_storage_governor(storage_config, storage_paths, 'OD', storage_metrics, 'OD')
 
     frame_number = 0  
     roller_dict = {}  
-    previous_od_state = False
     od_triggered = False
     roller_id_counter = 0  
     BIGFACE_DETECTED = False
 
      # Check if allow_all_images is enabled
     allow_all = shared_data.get('allow_all_images', False)
+    # All frames go to segment files instead of one JPEG each
+    archive_all = archive_enabled(archive_config)
 
-    while True:
-        current_od_state = shared_data["od_presence"]
+    # Model-ready input produced by the capture process (ROI + letterbox), if enabled
+    model_transform = None
+    if model_ring_od is not None:
+        model_transform = compute_letterbox(frame_ring_od.frame_shape, model_input_od['IMGSZ'], model_input_od.get('ROI'))
+        model_buffer = new_model_input(model_transform)
 
-        if current_od_state and not previous_od_state:
-            od_triggered = True
+    def detect_od_defects(np_frame, model_input=None, frame_seq=0, source=SOURCE_FRAME_RING):
+        """Run the OD model on a frame and attribute defects to rollers in view."""
+        nonlocal frame_number
 
-            roller_id_counter += 1
-            
-            roller_dict[roller_id_counter] = {'defect': False , 'defect_names': ["No defect"]}
+        if model_transform is not None and model_input is None:
+            model_input = letterbox_into(np_frame, model_buffer, model_transform)
 
-            print(f"\n🎯 OD New roller detected! Assigned Roller ID: {roller_id_counter} , in frame number : {frame_number + 1}")
+        try:
+            detections_array = predict_detections(predictor, 'OD', np_frame, od_conf, model_input, model_transform)
+        except RuntimeError as e:
+            inference_failed(frame_cursor.metrics, 'OD', e)
+            return
 
-        if od_triggered:
-                
-            with frame_lock_od:
-                np_frame = np.frombuffer(shared_frame_od.get_obj(), dtype=np.uint8).reshape(frame_shape)
-
-            results = model_od.predict(np_frame, device=0, conf=od_conf, verbose=False, half=True, agnostic_nms=True)
-            # ✅ Add cache clearing
-            torch.cuda.empty_cache()
-            gc.collect()
-            detections = [
-                ("roller" if int(box[-1]) == 5 else "defect", int(box[0]), int(box[1]), int(box[2]), int(box[3]), int(box[-1]) , float(box[-2]) )
-                for box in results[0].boxes.data
-            ] if results and results[0].boxes.data is not None else []
+        # Defects sorted left to right, each with the roller it lies on (0 = none);
+        # runs on empty frames too so the tracker can age its tracks
+        assignment = attribute_defects(detections_array, od_roller_class, roller_id_counter, 3, tracker)
+
+        if len(detections_array) > 0:
             
-            detections = sorted(detections, key=lambda x: x[1]) 
+            frame_number += 1
 
-            if len(detections) > 0:
-                
-                frame_number += 1
-                annotated_frame = results[0].plot()
-                
+            # Raw detections only; the GUI renders them at display resolution
+            detection_ring_od.write(detections_array, frame_seq, source)
 
-                with annotated_frame_lock_od:
-                    np_annotated = np.frombuffer(shared_annotated_od.get_obj(), dtype=np.uint8).reshape(frame_shape)
-                    np.copyto(np_annotated, annotated_frame)
+            # Check if there are any defects
+            has_defects = len(assignment.classes) > 0
+            
+            # Save based on mode (one render serves both saves)
+            archive_frame = allow_all and archive_all
+            saves = []
+            if allow_all and not archive_frame:
+                # Save all frames (with or without defects)
+                saves.append(partial(save_all_frames_image, camera_type='OD', frame_number=frame_number, storage_paths=storage_paths, is_head=False, max_images=image_limit))
+            if has_defects:
+                # Only save frames with defects
+                saves.append(partial(save_defect_image, camera_type='OD', frame_number=frame_number, storage_paths=storage_paths, is_head_defect=False, max_images=image_limit))
+            if (saves or archive_frame) and np_frame is None:
+                # Only the model input was inferred: copy the full frame before the ring overwrites it
+                np_frame = read_full_frame(frame_ring_od, frame_seq)
+                if np_frame is None:
+                    # Overwritten while it was inferred: skip the saves rather than pair the detections with another frame
+                    frame_cursor.metrics.add('frames_unsaved')
+                    saves, archive_frame = [], False
+            if archive_frame:
+                # Archive all raw frames with their detections
+                image_writer.submit(np_frame, partial(archive_all_frames_image, camera_type='OD', frame_number=frame_number, storage_paths=storage_paths, is_head=False, roller_id=roller_id_counter, timestamp=time.time(), detections=detections_array, archive_config=archive_config, max_images=image_limit))
+            if saves:
+                # Annotate a copy when the raw frame is also being archived
+                image_writer.submit(render_annotated(np_frame, detections_array, od_names, copy=archive_frame), *saves)
+
+            for cls, roller_id in zip(assignment.classes, assignment.roller_ids):
+
+                if roller_id == 0:
+                    continue
+                roller_id = int(roller_id)
+
+                defect_detected = True
+
+                defect_name = od_names[int(cls)]
+
+                if roller_id in roller_dict:
+                    roller_dict[roller_id]['defect'] |= defect_detected  # OR logic
+                    roller_dict[roller_id]['defect_names'].append(defect_name)
+                else:
+                    roller_dict[roller_id] = {'defect': defect_detected, 'defect_names': [defect_name]}
+
+    presence_tag = edge_board.tag('od_presence')
+    last_latch_seq = latch_ring_od.latest_seq
+    # Continuous inference reads model-ready input when the capture side publishes it
+    frame_cursor = FrameCursor(model_ring_od if model_ring_od is not None else frame_ring_od, inference_metrics)
+
+    # Wait for the first frame from the camera
+    while frame_ring_od.latest_seq == 0 or (model_ring_od is not None and model_ring_od.latest_seq == 0):
+        if stop_requested(stop_event):
+            return
+        time.sleep(0.01)
+
+    # Runs until the GUI sets the stop event (or terminates the process)
+    while not stop_requested(stop_event):
+
+        # Frames latched by the capture process at the OD presence sensor edge
+        latched = latch_ring_od.next_after(last_latch_seq)
+        busy = latched is not None
+        while latched is not None:
+            last_latch_seq = latched.seq
+
+            if latched.tag == presence_tag:
+                if latched.roller_id != roller_id_counter:
+                    od_triggered = True
+
+                    roller_id_counter = latched.roller_id
+                    
+                    roller_dict[roller_id_counter] = {'defect': False , 'defect_names': ["No defect"]}
 
-                roller_only_sorted = [detection for detection in detections if detection[0] == "roller"]
-                roller_only_sorted = [detection for detection in roller_only_sorted if detection[-1] > 0.80 ]
+                    print(f"\n🎯 OD New roller detected! Assigned Roller ID: {roller_id_counter} , in frame number : {frame_number + 1}")
 
-                defect_only_sorted = [detection for detection in detections if detection[0] == "defect"]
-                
-                # Check if there are any defects
-                has_defects = len(defect_only_sorted) > 0
-                
-                # Save based on mode
-                if allow_all:
-                    # Save all frames (with or without defects)
-                    save_all_frames_image(annotated_frame, 'OD', frame_number, storage_paths, is_head=False, max_images=image_limit)
-                if has_defects:
-                    # Only save frames with defects
-                    save_defect_image(annotated_frame, 'OD', frame_number, storage_paths, is_head_defect=False, max_images=image_limit)
-
-                for detection in defect_only_sorted:
-                    
-                    roller_id = point_inside( detection[1:5] , roller_only_sorted , roller_id_counter)
+                    if tracker is not None:
+                        # Defects the tracker saw on this roller before the sensor fired
+                        for cls in tracker.register(roller_id_counter):
+                            roller_dict[roller_id_counter]['defect'] = True
+                            roller_dict[roller_id_counter]['defect_names'].append(od_names[int(cls)])
 
-                    if roller_id == 0:
-                        continue
-                    
-                    defect_detected =  False if roller_id == 0 else True
+                detect_od_defects(latched.frame, frame_seq=latched.seq, source=SOURCE_LATCH_RING)
+                frame_cursor.metrics.add('latched_inferred')
 
-                    defect_name = "No Defect" if not defect_detected else model_od.names[detection[5]]
+            latched = latch_ring_od.next_after(last_latch_seq)
 
-                    if roller_id in roller_dict:
-                        roller_dict[roller_id]['defect'] |= defect_detected  # OR logic
-                        roller_dict[roller_id]['defect_names'].append(defect_name)
-                    else:
-                        roller_dict[roller_id] = {'defect': defect_detected, 'defect_names': [defect_name]}
+        if od_triggered:
+            # Every new frame is inferred once; wait briefly instead of re-running the same frame
+            packet = frame_cursor.next(NEW_FRAME_WAIT_S)
+            if packet is not None:
+                busy = True
+                if model_ring_od is not None:
+                    detect_od_defects(None, packet.frame, packet.source_seq)
+                else:
+                    detect_od_defects(packet.frame, frame_seq=packet.seq)
 
             if shared_data['bigface'] and not BIGFACE_DETECTED and len(roller_dict) > 0:
                 BIGFACE_DETECTED = True
@@ -414,5 +581,12 @@ def process_frames_od(shared_frame_od, frame_lock_od, roller_queue_od, queue_loc
             
             elif not shared_data['bigface']:
                 BIGFACE_DETECTED = False
+        else:
+            # Nothing to infer until a roller is latched
+            latch_ring_od.wait_for_new(last_latch_seq, NEW_FRAME_WAIT_S)
+
+        # Reclaims only when over budget or idle; a no-op between checks
+        memory.maybe_reclaim(busy)
 
-        previous_od_state = current_od_state
+    # Graceful stop: queued images and open archive segments are written out
+    finish_image_saving(image_writer, governor, (writer_config or {}).get('FLUSH_TIMEOUT_S', 5.0))
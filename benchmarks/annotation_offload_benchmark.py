@@ -0,0 +1,81 @@
+"""
+Annotation offload benchmark: drawing in the inference loop vs detection ring
+
+Measures what the inference loop pays per frame with detections:
+
+- before: draw_detections() on a copy of the full frame and write the
+  annotated frame into a display ring,
+- after: write the (N, 6) detection array into a DetectionRing.
+
+It also reports what the GUI now pays per displayed frame (fetch the raw
+frame, resize to the canvas, draw), which runs in the GUI process instead.
+
+Usage:
+    python benchmarks/annotation_offload_benchmark.py --boxes 20 --iterations 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.annotation import draw_detections, render_detections  # noqa: E402
+from backend.detection_ring import DetectionRing  # noqa: E402
+from backend.frame_buffer import SharedFrameRing  # noqa: E402
+
+FRAME_SHAPE = (960, 1280, 3)
+NAMES = {0: 'rust', 1: 'dent', 2: 'damage', 3: 'spherical', 4: 'lining', 5: 'roller'}
+
+
+def _random_detections(rng, count):
+    x1 = rng.uniform(0, FRAME_SHAPE[1] - 200, count)
+    y1 = rng.uniform(0, FRAME_SHAPE[0] - 200, count)
+    return np.stack([
+        x1, y1, x1 + rng.uniform(20, 200, count), y1 + rng.uniform(20, 200, count),
+        rng.uniform(0.2, 1.0, count), rng.integers(0, 6, count)
+    ], axis=1).astype(np.float32)
+
+
+def _per_call_ms(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--boxes', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--display', type=int, nargs=2, default=[640, 480], help="canvas width height")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, FRAME_SHAPE, dtype=np.uint8)
+    detections = _random_detections(rng, args.boxes)
+
+    frame_ring = SharedFrameRing(FRAME_SHAPE, slots=16)
+    frame_seq = frame_ring.write(frame)
+    annotated_ring = SharedFrameRing(FRAME_SHAPE, slots=3)
+    detection_ring = DetectionRing()
+
+    before = _per_call_ms(lambda: annotated_ring.write(draw_detections(frame, detections, NAMES)), args.iterations)
+    after = _per_call_ms(lambda: detection_ring.write(detections, frame_seq), args.iterations)
+
+    def gui_render():
+        packet = detection_ring.latest()
+        source = frame_ring.get(packet.frame_seq)
+        render_detections(source.frame, packet.detections, NAMES, tuple(args.display))
+
+    gui = _per_call_ms(gui_render, args.iterations)
+
+    print(f"Inference loop, {args.boxes} boxes per frame:")
+    print(f"  draw + annotated ring write : {before:8.3f} ms/frame")
+    print(f"  detection ring write        : {after:8.3f} ms/frame")
+    print(f"GUI render at {args.display[0]}x{args.display[1]}  : {gui:8.3f} ms/displayed frame")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Detection post-processing benchmark: per-box Python loops vs vectorized NumPy
+
+Generates random detection arrays (rollers and defects, including boxes on
+roller edges and confidences right at the 0.80 cut-off), checks that
+assign_defects() produces exactly the same defect-to-roller updates as the
+original BF/OD tuple-building, sorting and point_inside() loops, and then
+reports the per-frame cost of both.
+
+Usage:
+    python benchmarks/detection_postprocess_benchmark.py --scenes 20000 --boxes 40
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.detection_postprocess import assign_defects  # noqa: E402
+
+ROLLER_CLASS = 5
+CLASS_NAMES = {0: 'rust', 1: 'dent', 2: 'damage', 3: 'spherical', 4: 'lining', 5: 'roller'}
+
+
+def legacy_point_inside(rectangle, list_of_all_rollers, roller_number, max_rollers):
+    """point_inside() from yolo_processing.py (cap 2 for BF, 3 for OD)."""
+    length = len(list_of_all_rollers)
+
+    check = max_rollers if roller_number > max_rollers else roller_number
+
+    if length > check:
+        length =- 1  # noqa: E225 - the original assigns -1 here
+
+    roller_dictioanry = {i: list_of_all_rollers[idx] for idx, i in enumerate(range(roller_number, roller_number - length, -1))}
+
+    for idx, roller in roller_dictioanry.items():
+        entire_coordinates = roller[1:5]
+        x1, y1, x2, y2 = [int(i) for i in rectangle]
+        decision = (entire_coordinates[0] <= x1 <= entire_coordinates[2] and entire_coordinates[1] <= y1 <= entire_coordinates[3]) or (entire_coordinates[0] <= x2 <= entire_coordinates[2] and entire_coordinates[1] <= y2 <= entire_coordinates[3])
+        if decision:
+            return idx
+    return 0
+
+
+def legacy_bf(detections_array, roller_number):
+    """Original detect_bf_defects() post-processing; returns the (roller_id, name) updates."""
+    detections_for_filter = []
+    for x1, y1, x2, y2, conf, cls in detections_array:
+        cls = int(cls)
+        label = "roller" if cls == ROLLER_CLASS else CLASS_NAMES[cls]
+        detections_for_filter.append((label, int(x1), int(y1), int(x2), int(y2), cls, float(conf)))
+    detections = sorted(detections_for_filter, key=lambda x: x[1])
+
+    roller_only_sorted = [detection for detection in detections if detection[0] == "roller" and detection[-1] > 0.80]
+    defect_only_sorted = [detection for detection in detections if detection[0] != "roller"]
+
+    updates = []
+    for detection in defect_only_sorted:
+        roller_id = legacy_point_inside(detection[1:5], roller_only_sorted, roller_number, 2)
+        if roller_id == 0:
+            continue
+        updates.append((roller_id, CLASS_NAMES[detection[5]]))
+    return len(defect_only_sorted) > 0, updates
+
+
+def legacy_od(detections_array, roller_number):
+    """Original detect_od_defects() post-processing; returns the (roller_id, name) updates."""
+    detections = [
+        ("roller" if int(box[-1]) == 5 else "defect", int(box[0]), int(box[1]), int(box[2]), int(box[3]), int(box[-1]), float(box[-2]))
+        for box in detections_array
+    ]
+    detections = sorted(detections, key=lambda x: x[1])
+
+    roller_only_sorted = [detection for detection in detections if detection[0] == "roller"]
+    roller_only_sorted = [detection for detection in roller_only_sorted if detection[-1] > 0.80]
+    defect_only_sorted = [detection for detection in detections if detection[0] == "defect"]
+
+    updates = []
+    for detection in defect_only_sorted:
+        roller_id = legacy_point_inside(detection[1:5], roller_only_sorted, roller_number, 3)
+        if roller_id == 0:
+            continue
+        updates.append((roller_id, CLASS_NAMES[detection[5]]))
+    return len(defect_only_sorted) > 0, updates
+
+
+def vectorized(detections_array, roller_number, max_rollers):
+    """assign_defects() plus the update loop left in yolo_processing.py."""
+    assignment = assign_defects(detections_array, ROLLER_CLASS, roller_number, max_rollers)
+    updates = [
+        (int(roller_id), CLASS_NAMES[int(cls)])
+        for cls, roller_id in zip(assignment.classes, assignment.roller_ids)
+        if roller_id != 0
+    ]
+    return len(assignment.classes) > 0, updates
+
+
+def random_scene(rng, max_boxes):
+    """(N, 6) float32 detections: a few rollers across the frame, defects on and around them."""
+    n_rollers = int(rng.integers(0, 5))
+    n_defects = int(rng.integers(0, max(1, max_boxes - n_rollers)))
+    rows = []
+
+    rollers = []
+    for _ in range(n_rollers):
+        x1 = float(rng.integers(0, 1100))
+        y1 = float(rng.integers(0, 400))
+        w, h = float(rng.integers(80, 300)), float(rng.integers(200, 500))
+        conf = float(rng.choice([0.8, 0.79, 0.81, rng.uniform(0.5, 1.0)]))
+        rollers.append((x1, y1, x1 + w, y1 + h))
+        rows.append((x1 + rng.uniform(0, 0.99), y1, x1 + w, y1 + h, conf, ROLLER_CLASS))
+
+    for _ in range(n_defects):
+        if rollers and rng.random() < 0.7:
+            rx1, ry1, rx2, ry2 = rollers[int(rng.integers(len(rollers)))]
+            if rng.random() < 0.2:
+                x1, y1 = rx1, ry1  # Exactly on the roller corner
+            else:
+                x1 = float(rng.integers(int(rx1) - 40, int(rx2) + 1))
+                y1 = float(rng.integers(int(ry1) - 40, int(ry2) + 1))
+        else:
+            x1, y1 = float(rng.integers(0, 1200)), float(rng.integers(0, 900))
+        w, h = float(rng.integers(5, 80)), float(rng.integers(5, 80))
+        rows.append((x1, y1, x1 + w, y1 + h, float(rng.uniform(0.2, 1.0)), int(rng.integers(0, 5))))
+
+    order = rng.permutation(len(rows))
+    return np.asarray([rows[i] for i in order], dtype=np.float32).reshape(-1, 6)
+
+
+def _time(fn, scenes):
+    start = time.perf_counter()
+    for detections, roller_number in scenes:
+        fn(detections, roller_number)
+    return (time.perf_counter() - start) / len(scenes) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenes', type=int, default=20000, help="random frames to compare")
+    parser.add_argument('--boxes', type=int, default=40, help="maximum detections per frame")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    scenes = [(random_scene(rng, args.boxes), int(rng.integers(0, 7))) for _ in range(args.scenes)]
+
+    mismatches = 0
+    assigned = 0
+    for detections, roller_number in scenes:
+        bf = legacy_bf(detections, roller_number)
+        od = legacy_od(detections, roller_number)
+        if bf != vectorized(detections, roller_number, 2):
+            mismatches += 1
+        if od != vectorized(detections, roller_number, 3):
+            mismatches += 1
+        assigned += len(bf[1]) + len(od[1])
+
+    print(f"Compared {2 * len(scenes)} BF/OD frames ({assigned} defect assignments): {mismatches} mismatches")
+
+    print(f"{'':<12} {'BF us/frame':>12} {'OD us/frame':>12}")
+    print(f"{'legacy':<12} {_time(legacy_bf, scenes):>12.1f} {_time(legacy_od, scenes):>12.1f}")
+    print(f"{'vectorized':<12} {_time(lambda d, r: vectorized(d, r, 2), scenes):>12.1f} "
+          f"{_time(lambda d, r: vectorized(d, r, 3), scenes):>12.1f}")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+All-frames saving benchmark: one JPEG file per frame vs the frame archive
+
+Saves the same frames through save_image_with_limit (a file per frame, as
+all-frames mode did before) and through FrameArchiveWriter (appends to
+rolling segments), then reads the archive back to check every frame and
+its detections. Reports the time per frame and the files created. Small
+--segment-mb values exercise the segment roll-over.
+
+Usage:
+    python benchmarks/frame_archive_benchmark.py --frames 500 --segment-mb 64
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.frame_archive import FrameArchiveReader, FrameArchiveWriter  # noqa: E402
+from backend.image_manager import save_image_with_limit  # noqa: E402
+
+FRAME_SHAPE = (960, 1280, 3)
+DETECTIONS = np.array([[100, 100, 400, 600, 0.9, 5], [150, 300, 190, 340, 0.6, 0]], dtype=np.float32)
+
+
+def _frames(count):
+    """A few distinct, compressible frames (noise would make JPEG encoding dominate)."""
+    rng = np.random.default_rng(0)
+    base = cv2.resize(rng.integers(0, 255, (60, 80, 3), dtype=np.uint8), FRAME_SHAPE[1::-1])
+    return [np.roll(base, i * 7, axis=1) for i in range(min(count, 16))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--segment-mb', type=float, default=64)
+    args = parser.parse_args()
+
+    frames = _frames(args.frames)
+    root = tempfile.mkdtemp(prefix="frame_archive_benchmark_")
+    try:
+        files_dir = os.path.join(root, "files")
+        start = time.perf_counter()
+        for i in range(args.frames):
+            save_image_with_limit(frames[i % len(frames)], files_dir, f"frame{i}.jpg", max_images=args.frames + 1)
+        files_ms = (time.perf_counter() - start) * 1000.0 / args.frames
+        files_count = len(os.listdir(files_dir))
+
+        archive_dir = os.path.join(root, "archive")
+        closed = []
+        writer = FrameArchiveWriter(archive_dir, segment_mb=args.segment_mb,
+                                    jpeg_quality=95, on_segment_closed=lambda path, size: closed.append(path))
+        start = time.perf_counter()
+        for i in range(args.frames):
+            writer.append(frames[i % len(frames)], i, roller_id=i // 10, detections=DETECTIONS)
+        writer.close()
+        archive_ms = (time.perf_counter() - start) * 1000.0 / args.frames
+        archive_count = len(os.listdir(archive_dir))
+
+        reader = FrameArchiveReader(archive_dir)
+        records = list(reader.records())
+        assert [r.frame_number for r in records] == list(range(args.frames)), "archive lost or reordered frames"
+        assert len(closed) == archive_count, "closed segments were not all reported"
+        sample = records[len(records) // 2]
+        assert np.array_equal(reader.read_detections(sample), DETECTIONS)
+        assert reader.read_image(sample).shape == FRAME_SHAPE
+        assert len(reader.find(roller_id=3)) == min(10, max(args.frames - 30, 0))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{args.frames} frames of {FRAME_SHAPE[1]}x{FRAME_SHAPE[0]}, {args.segment_mb:g} MB segments")
+    print(f"{'':<10} {'ms/frame':>9} {'files':>7}")
+    print(f"{'files':<10} {files_ms:>9.2f} {files_count:>7}")
+    print(f"{'archive':<10} {archive_ms:>9.2f} {archive_count:>7}")
+    print("archive read back: frames, order and detections match")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Frame handoff microbenchmark: multiprocessing.Lock vs seqlock ring
+
+Simulates one capture process publishing 1280x960x3 frames at camera rate
+while several reader processes (inference loops / GUI threads) copy the
+latest frame, and reports how long the writer waited for the lock before
+and after the switch to the lock-free SharedFrameRing.
+
+Usage:
+    python benchmarks/frame_handoff_benchmark.py --fps 96 --readers 3 --seconds 10
+"""
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Array, Lock, Process, Queue
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.frame_buffer import SharedFrameRing  # noqa: E402
+
+FRAME_SHAPE = (960, 1280, 3)
+
+
+def _summary(samples):
+    """Return (p50, p99, max) in milliseconds for a list of seconds."""
+    if not samples:
+        return 0.0, 0.0, 0.0
+    arr = np.asarray(samples) * 1000.0
+    return float(np.percentile(arr, 50)), float(np.percentile(arr, 99)), float(arr.max())
+
+
+def _paced_loop(fps, seconds, publish):
+    """Call publish() at fps for the given duration; collect wait and publish times."""
+    period = 1.0 / fps
+    waits = []
+    totals = []
+    late = 0
+    frame = np.random.randint(0, 255, FRAME_SHAPE, dtype=np.uint8)
+    next_deadline = time.perf_counter()
+    end = next_deadline + seconds
+    while next_deadline < end:
+        start = time.perf_counter()
+        waits.append(publish(frame))
+        totals.append(time.perf_counter() - start)
+        next_deadline += period
+        remaining = next_deadline - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+        else:
+            late += 1
+    return waits, totals, late
+
+
+def lock_writer(shared, lock, fps, seconds, results):
+    np_frame = np.frombuffer(shared.get_obj(), dtype=np.uint8).reshape(FRAME_SHAPE)
+
+    def publish(frame):
+        start = time.perf_counter()
+        with lock:
+            acquired = time.perf_counter()
+            np.copyto(np_frame, frame)
+        return acquired - start
+
+    waits, totals, late = _paced_loop(fps, seconds, publish)
+    results.put(('writer', _summary(waits), _summary(totals), late))
+
+
+def lock_reader(shared, lock, seconds, results):
+    np_frame = np.frombuffer(shared.get_obj(), dtype=np.uint8).reshape(FRAME_SHAPE)
+    waits = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        with lock:
+            waits.append(time.perf_counter() - start)
+            np_frame.copy()
+    results.put(('reader', _summary(waits), len(waits)))
+
+
+def ring_writer(ring, fps, seconds, results):
+    def publish(frame):
+        # Lock-free: the writer never waits before copying
+        ring.write(frame)
+        return 0.0
+
+    waits, totals, late = _paced_loop(fps, seconds, publish)
+    results.put(('writer', _summary(waits), _summary(totals), late))
+
+
+def ring_reader(ring, seconds, results):
+    out = np.empty(FRAME_SHAPE, dtype=np.uint8)
+    reads = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        ring.latest(out=out)
+        reads += 1
+    results.put(('reader', (0.0, 0.0, 0.0), reads, ring.torn_reads))
+
+
+def run(mode, fps, readers, seconds):
+    results = Queue()
+    if mode == 'lock':
+        shared = Array('B', int(np.prod(FRAME_SHAPE)))
+        lock = Lock()
+        procs = [Process(target=lock_writer, args=(shared, lock, fps, seconds, results))]
+        procs += [Process(target=lock_reader, args=(shared, lock, seconds, results)) for _ in range(readers)]
+    else:
+        ring = SharedFrameRing(FRAME_SHAPE, slots=16)
+        ring.write(np.zeros(FRAME_SHAPE, dtype=np.uint8))
+        procs = [Process(target=ring_writer, args=(ring, fps, seconds, results))]
+        procs += [Process(target=ring_reader, args=(ring, seconds, results)) for _ in range(readers)]
+
+    for p in procs:
+        p.start()
+    reports = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    print(f"\n=== {mode} ({fps} fps, {readers} readers, {seconds}s) ===")
+    for report in reports:
+        if report[0] == 'writer':
+            p50, p99, worst = report[1]
+            print(f"  writer lock wait  p50={p50:.3f} ms  p99={p99:.3f} ms  max={worst:.3f} ms")
+            p50, p99, worst = report[2]
+            print(f"  writer publish    p50={p50:.3f} ms  p99={p99:.3f} ms  max={worst:.3f} ms  late frames={report[3]}")
+    for report in reports:
+        if report[0] == 'reader':
+            p50, p99, worst = report[1]
+            torn = report[3] if len(report) > 3 else 0
+            print(f"  reader lock wait  p50={p50:.3f} ms  p99={p99:.3f} ms  max={worst:.3f} ms  reads={report[2]}  torn reads={torn}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fps', type=float, default=96)
+    parser.add_argument('--readers', type=int, default=3)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    for mode in ('lock', 'seqlock'):
+        run(mode, args.fps, args.readers, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Image saving benchmark: inline save_defect_image vs ImageWriterPool
+
+Simulates an inference loop producing annotated frames at a fixed rate and
+saving each one, first inline (draw + JPEG encode + write + cleanup in the
+loop, as before) and then through the ImageWriterPool. A --disk-delay adds
+an artificial per-file stall to mimic a slow or busy disk. Reports the time
+the loop spends per frame and how many images were written or dropped.
+
+Usage:
+    python benchmarks/image_writer_benchmark.py --frames 300 --fps 30 --disk-delay 0.05
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from functools import partial
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.annotation import draw_detections  # noqa: E402
+from backend.image_manager import save_image_with_limit  # noqa: E402
+from backend.image_writer import ImageWriterPool  # noqa: E402
+
+FRAME_SHAPE = (960, 1280, 3)
+NAMES = {0: 'rust', 1: 'dent', 5: 'roller'}
+DETECTIONS = np.array([[100, 100, 400, 600, 0.9, 5], [150, 300, 190, 340, 0.6, 0]], dtype=np.float32)
+
+
+def _save(directory, delay, frame_number, image):
+    if delay:
+        time.sleep(delay)
+    save_image_with_limit(image, directory, f"frame{frame_number}.jpg", max_images=10000)
+
+
+def _run(frames, fps, frame, saver):
+    """Pace a loop at fps; saver(frame_number, frame) is called every frame. Returns loop ms per frame."""
+    period = 1.0 / fps
+    spent = []
+    next_tick = time.perf_counter()
+    for frame_number in range(frames):
+        start = time.perf_counter()
+        saver(frame_number, frame.copy())
+        spent.append(time.perf_counter() - start)
+        next_tick += period
+        delay = next_tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    arr = np.asarray(spent) * 1000.0
+    return float(np.median(arr)), float(np.percentile(arr, 99)), float(arr.max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--fps', type=float, default=30)
+    parser.add_argument('--disk-delay', type=float, default=0.05, help="extra seconds per written file")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-pending', type=int, default=32)
+    parser.add_argument('--drop-policy', default='oldest')
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(0).integers(0, 255, FRAME_SHAPE, dtype=np.uint8)
+    root = tempfile.mkdtemp(prefix="image_writer_benchmark_")
+    try:
+        inline_dir = os.path.join(root, "inline")
+
+        def inline(frame_number, image):
+            _save(inline_dir, args.disk_delay, frame_number, draw_detections(image, DETECTIONS, NAMES))
+
+        inline_stats = _run(args.frames, args.fps, frame, inline)
+
+        pool_dir = os.path.join(root, "pool")
+        pool = ImageWriterPool(args.workers, args.max_pending, args.drop_policy)
+
+        def queued(frame_number, image):
+            pool.submit(partial(draw_detections, image, DETECTIONS, NAMES, copy=False),
+                        partial(_save, pool_dir, args.disk_delay, frame_number))
+
+        pool_stats = _run(args.frames, args.fps, frame, queued)
+        pool.flush(timeout=60)
+        metrics = pool.metrics.snapshot()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{args.frames} frames at {args.fps:.0f} fps, disk delay {args.disk_delay * 1000:.0f} ms/file")
+    print(f"{'':<10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    print(f"{'inline':<10} {inline_stats[0]:>8.2f} {inline_stats[1]:>8.2f} {inline_stats[2]:>8.2f}")
+    print(f"{'pool':<10} {pool_stats[0]:>8.2f} {pool_stats[1]:>8.2f} {pool_stats[2]:>8.2f}")
+    print(f"pool: {metrics['written']:.0f} written, {metrics['dropped']:.0f} dropped, "
+          f"slowest write {metrics['write_ms_max']:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
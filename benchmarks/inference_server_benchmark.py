@@ -0,0 +1,130 @@
+"""
+Inference throughput benchmark: per-process models vs the central inference server
+
+Starts N worker processes that each submit frames as fast as they get
+results back, first with every worker loading its own copy of the model
+(the old layout) and then through one micro-batching inference server.
+Reports total frames/s and per-request latency for both. Runs on CPU, so
+it can be used on machines without a GPU; --backend onnx/openvino measures
+the exported CPU backends.
+
+Usage:
+    python benchmarks/inference_server_benchmark.py --model models/OD_sr.pt --device cpu --workers 3 --seconds 20
+    python benchmarks/inference_server_benchmark.py --model models/OD_sr.pt --device cpu --backend openvino --precision int8
+"""
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Manager, Process, Queue
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.frame_buffer import SharedFrameRing  # noqa: E402
+from backend.inference_server import create_predictors, run_inference_server  # noqa: E402
+from backend.predictors import LocalPredictor  # noqa: E402
+
+FRAME_SHAPE = (960, 1280, 3)
+
+
+def _load_frame(image_path):
+    if image_path:
+        frame = cv2.imread(image_path)
+        if frame is not None:
+            return cv2.resize(frame, (FRAME_SHAPE[1], FRAME_SHAPE[0]))
+    return np.random.randint(0, 255, FRAME_SHAPE, dtype=np.uint8)
+
+
+def worker(predictor, shared_data, image_path, conf, seconds, start_event, results):
+    predictor.start(shared_data)
+    frame = _load_frame(image_path)
+    predictor.predict('MODEL', frame, conf)  # First call outside the measurement
+
+    start_event.wait()
+    latencies = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        predictor.predict('MODEL', frame, conf)
+        latencies.append(time.perf_counter() - start)
+    results.put(latencies)
+
+
+def run(mode, args):
+    manager = Manager()
+    shared_data = manager.dict()
+    start_event = manager.Event()
+    results = Queue()
+
+    model_configs = {'MODEL': {'PATH': args.model, 'CAMERA': None}}
+    backend_config = {'BACKEND': args.backend, 'PRECISION': args.precision}
+    names = [f'W{i}' for i in range(args.workers)]
+
+    server_args = None
+    if mode == 'local':
+        # Every worker loads its own copy, like the old per-process layout
+        predictors = {name: LocalPredictor(model_configs, device=args.device, backend_config=backend_config) for name in names}
+    else:
+        rings = {name: SharedFrameRing(FRAME_SHAPE, slots=2) for name in names}
+        server_config = {
+            'DEVICE': args.device,
+            'BATCH_WINDOW_MS': args.window_ms,
+            'MAX_BATCH': args.max_batch
+        }
+        predictors, server_args = create_predictors(rings, {}, model_configs, server_config, shared_data,
+                                                    backend_config=backend_config)
+
+    server = None
+    if server_args is not None:
+        server = Process(target=run_inference_server, args=server_args, daemon=True)
+        server.start()
+
+    workers = [
+        Process(target=worker, args=(predictor, shared_data, args.image, args.conf, args.seconds, start_event, results))
+        for predictor in predictors.values()
+    ]
+    for process in workers:
+        process.start()
+
+    # Give every worker time to load and make its first call
+    time.sleep(args.settle)
+    start_event.set()
+
+    latencies = []
+    for _ in workers:
+        latencies.extend(results.get())
+    for process in workers:
+        process.join()
+    if server is not None:
+        server_args[1].put(None)
+        server.join()
+
+    arr = np.asarray(latencies) * 1000.0
+    print(f"\n[{mode}] {args.backend} {args.precision}, {args.workers} workers, {args.seconds:.0f} s")
+    print(f"  throughput     : {len(arr) / args.seconds:.1f} frames/s")
+    print(f"  latency p50/p99: {np.percentile(arr, 50):.1f} / {np.percentile(arr, 99):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default="models/OD_sr.pt")
+    parser.add_argument('--image', default=None, help="Image to infer on (random noise if omitted)")
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--backend', default='torch', choices=['auto', 'torch', 'onnx', 'openvino'])
+    parser.add_argument('--precision', default='fp32', choices=['fp32', 'int8'])
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--window-ms', type=float, default=2)
+    parser.add_argument('--max-batch', type=int, default=8)
+    parser.add_argument('--conf', type=float, default=0.2)
+    parser.add_argument('--settle', type=float, default=30, help="Seconds allowed for model loading")
+    args = parser.parse_args()
+
+    run('local', args)
+    run('server', args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Image retention benchmark: directory scan per save vs in-memory retention index
+
+Fills a temporary directory with N small images (the directory is at its
+limit, so every save has to evict the oldest one) and measures the cost of
+one save with the old scan-based cleanup and with the RetentionIndex.
+The image is tiny so the numbers show the retention overhead, not JPEG
+encoding.
+
+Usage:
+    python benchmarks/retention_index_benchmark.py --files 10000 100000 --saves 50
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.image_manager import save_image_with_limit  # noqa: E402
+from backend.retention_index import RetentionIndex  # noqa: E402
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+
+
+# Scan-based cleanup as it was before the retention index
+def legacy_count_images(directory_path):
+    count = 0
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.is_file() and Path(entry.name).suffix.lower() in IMAGE_EXTENSIONS:
+                count += 1
+    return count
+
+
+def legacy_oldest_image(directory_path):
+    oldest_file = None
+    oldest_time = float('inf')
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.is_file() and Path(entry.name).suffix.lower() in IMAGE_EXTENSIONS:
+                file_time = entry.stat().st_ctime
+                if file_time < oldest_time:
+                    oldest_time = file_time
+                    oldest_file = entry.path
+    return oldest_file
+
+
+def legacy_save(image, directory_path, filename, max_images):
+    os.makedirs(directory_path, exist_ok=True)
+    image_count = legacy_count_images(directory_path)
+    while image_count >= max_images:
+        oldest = legacy_oldest_image(directory_path)
+        if oldest and os.path.exists(oldest):
+            os.remove(oldest)
+            image_count -= 1
+        else:
+            break
+    save_path = os.path.join(directory_path, filename)
+    cv2.imwrite(save_path, image)
+    return save_path
+
+
+def _fill(directory, count, payload):
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(directory, f"old{i}.jpg"), "wb") as f:
+            f.write(payload)
+
+
+def _time_saves(save, directory, files, saves, image):
+    times = []
+    for i in range(saves):
+        start = time.perf_counter()
+        save(image, directory, f"frame{i}.jpg", files)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--saves', type=int, default=50)
+    args = parser.parse_args()
+
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    payload = cv2.imencode('.jpg', image)[1].tobytes()
+
+    print(f"{'files':>8} {'legacy ms/save':>15} {'index ms/save':>14} {'index build ms':>15}")
+    for files in args.files:
+        root = tempfile.mkdtemp(prefix="retention_benchmark_")
+        try:
+            legacy_dir = os.path.join(root, "legacy")
+            _fill(legacy_dir, files, payload)
+            legacy_ms = _time_saves(legacy_save, legacy_dir, files, args.saves, image)
+
+            index_dir = os.path.join(root, "index")
+            _fill(index_dir, files, payload)
+            start = time.perf_counter()
+            RetentionIndex(index_dir)
+            build_ms = (time.perf_counter() - start) * 1000.0
+            # First save builds the process's index for the directory
+            save_image_with_limit(image, index_dir, "warm.jpg", files)
+            index_ms = _time_saves(save_image_with_limit, index_dir, files, args.saves, image)
+
+            remaining = len(os.listdir(index_dir))
+            assert remaining == files, f"index left {remaining} files, expected {files}"
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+        print(f"{files:>8} {legacy_ms:>15.2f} {index_ms:>14.3f} {build_ms:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Roller attribution benchmark: per-frame left-to-right numbering vs RollerTracker
+
+Simulates rollers moving across the camera view, the presence sensor firing
+as each one enters, random dropouts of roller detections, and defects on
+some of the rollers. Counts how many defect detections each method
+attributes to the right roller and to a wrong one, then times the tracker
+with many rollers in view.
+
+Usage:
+    python benchmarks/roller_tracker_benchmark.py --frames 3000 --dropout 0.1
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.detection_postprocess import assign_defects  # noqa: E402
+from backend.roller_tracker import RollerTracker  # noqa: E402
+
+ROLLER_CLASS = 5
+FRAME_WIDTH = 1280
+ROLLER_WIDTH = 300
+SPACING = 420
+
+
+def simulate(frames, speed, dropout, seed):
+    """Return (correct, wrong) counts for the tracker and the per-frame assignment."""
+    rng = np.random.default_rng(seed)
+    tracker = RollerTracker({})
+    counts = {'tracker': [0, 0], 'per-frame': [0, 0]}
+    rollers = {}        # True roller ID -> x1
+    has_defect = {}
+    next_id = 1
+    roller_number = 0
+
+    for _ in range(frames):
+        for roller_id in list(rollers):
+            rollers[roller_id] += speed
+            if rollers[roller_id] > FRAME_WIDTH:
+                del rollers[roller_id]
+        if not rollers or min(rollers.values()) >= SPACING - ROLLER_WIDTH:
+            rollers[next_id] = -ROLLER_WIDTH + 5
+            has_defect[next_id] = rng.random() < 0.5
+            next_id += 1
+
+        # Presence sensor at x = 0
+        for roller_id, x in rollers.items():
+            if x - speed < 0 <= x:
+                roller_number = roller_id
+                tracker.register(roller_id)
+
+        rows, truth = [], []
+        for roller_id, x in rollers.items():
+            x1, x2 = max(x, 0), min(x + ROLLER_WIDTH, FRAME_WIDTH)
+            if x2 - x1 < 40:
+                continue
+            if rng.random() > dropout:
+                rows.append((x1, 100, x2, 600, rng.uniform(0.82, 0.99), ROLLER_CLASS))
+            if has_defect[roller_id] and x1 + 60 < x2 - 60:
+                dx = rng.uniform(x1 + 20, x2 - 60)
+                rows.append((dx, 300, dx + 30, 330, 0.6, 1))
+                truth.append(roller_id)
+        detections = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+
+        results = {
+            'tracker': tracker.update(detections, ROLLER_CLASS),
+            'per-frame': assign_defects(detections, ROLLER_CLASS, roller_number, 3)
+        }
+        for name, assignment in results.items():
+            for roller_id in assignment.roller_ids:
+                if roller_id:
+                    counts[name][0 if roller_id in truth else 1] += 1
+    return counts
+
+
+def time_tracker(rollers_in_view, frames=200):
+    """Milliseconds per update with the given number of rollers in view."""
+    tracker = RollerTracker({})
+    xs = np.arange(rollers_in_view) * float(SPACING)
+    start = time.perf_counter()
+    for frame in range(frames):
+        shifted = xs + frame * 10
+        detections = np.stack([
+            shifted, np.full(rollers_in_view, 100.0), shifted + ROLLER_WIDTH, np.full(rollers_in_view, 600.0),
+            np.full(rollers_in_view, 0.9), np.full(rollers_in_view, float(ROLLER_CLASS))
+        ], axis=1).astype(np.float32)
+        tracker.update(detections, ROLLER_CLASS)
+    return (time.perf_counter() - start) / frames * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--speed', type=int, default=35, help="pixels a roller moves per frame")
+    parser.add_argument('--dropout', type=float, nargs='+', default=[0.0, 0.1, 0.3],
+                        help="probability that a roller is not detected in a frame")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'dropout':<8} {'method':<10} {'correct':>8} {'wrong':>8}")
+    for dropout in args.dropout:
+        counts = simulate(args.frames, args.speed, dropout, args.seed)
+        for name, (correct, wrong) in counts.items():
+            print(f"{dropout:<8} {name:<10} {correct:>8} {wrong:>8}")
+
+    print()
+    for rollers_in_view in (3, 30, 300):
+        print(f"{rollers_in_view:>4} rollers in view: {time_tracker(rollers_in_view):.2f} ms/update")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Continuous capture benchmark: one JPEG file per frame vs video segments
+
+Publishes frames into a SharedFrameRing and records every one of them,
+first as individual JPEGs through save_image_with_limit (as all-frames
+mode would) and then with the CameraRecorder into video segments. Reports
+the time per frame, the rate that would be sustained on one core, the
+files created and the bytes on disk, and checks that the segments and
+their sidecar indexes hold every frame.
+
+Usage:
+    python benchmarks/video_recorder_benchmark.py --frames 300 --scale 1.0 0.5
+"""
+import argparse
+import csv
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.frame_buffer import SharedFrameRing  # noqa: E402
+from backend.image_manager import save_image_with_limit  # noqa: E402
+from backend.video_recorder import CameraRecorder, sidecar_path  # noqa: E402
+
+FRAME_SHAPE = (960, 1280, 3)
+
+
+def _frames(count):
+    """A few distinct, compressible frames (noise would make encoding dominate)."""
+    rng = np.random.default_rng(0)
+    base = cv2.resize(rng.integers(0, 255, (60, 80, 3), dtype=np.uint8), FRAME_SHAPE[1::-1])
+    return [np.roll(base, i * 7, axis=1) for i in range(min(count, 16))]
+
+
+def _disk_usage(directory):
+    files = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+    return len(files), sum(os.path.getsize(path) for path in files) / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--fps', type=float, default=96)
+    parser.add_argument('--scale', type=float, nargs='+', default=[1.0, 0.5])
+    parser.add_argument('--fourcc', default='MJPG')
+    parser.add_argument('--extension', default='.avi')
+    parser.add_argument('--segment-seconds', type=float, default=1.0, help="video time per segment (at --fps)")
+    args = parser.parse_args()
+
+    frames = _frames(args.frames)
+    results = []
+    root = tempfile.mkdtemp(prefix="video_recorder_benchmark_")
+    try:
+        jpeg_dir = os.path.join(root, "jpeg")
+        start = time.perf_counter()
+        for i in range(args.frames):
+            save_image_with_limit(frames[i % len(frames)], jpeg_dir, f"frame{i}.jpg", max_images=args.frames + 1)
+        results.append(("jpeg files", (time.perf_counter() - start) * 1000.0 / args.frames) + _disk_usage(jpeg_dir))
+
+        for scale in args.scale:
+            video_dir = os.path.join(root, f"video_{scale:g}")
+            config = {'DIR': video_dir, 'FOURCC': args.fourcc, 'EXTENSION': args.extension,
+                      'SEGMENT_SECONDS': args.segment_seconds, 'SCALE': scale, 'QUALITY': 90}
+            ring = SharedFrameRing(FRAME_SHAPE, slots=4)
+            recorder = CameraRecorder('CAM', ring, config, fps=args.fps)
+            elapsed = 0.0
+            for i in range(args.frames):
+                # Synthetic capture clock at --fps so segments roll over by video time
+                ring.write(frames[i % len(frames)], timestamp=i / args.fps)
+                start = time.perf_counter()
+                recorder.record_available()
+                elapsed += time.perf_counter() - start
+            recorder.close_segment()
+
+            recorded = 0
+            for video in glob.glob(os.path.join(video_dir, 'CAM', f"*{args.extension}")):
+                with open(sidecar_path(video)) as f:
+                    rows = list(csv.DictReader(f))
+                capture = cv2.VideoCapture(video)
+                assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == len(rows), f"{video}: sidecar and video disagree"
+                capture.release()
+                recorded += len(rows)
+            assert recorded == args.frames, f"recorded {recorded} of {args.frames} frames"
+            results.append((f"video x{scale:g}", elapsed * 1000.0 / args.frames) + _disk_usage(video_dir))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{args.frames} frames of {FRAME_SHAPE[1]}x{FRAME_SHAPE[0]}, {args.fourcc}{args.extension}, "
+          f"{args.segment_seconds:g} s segments at {args.fps:g} fps")
+    print(f"{'':<12} {'ms/frame':>9} {'fps/core':>9} {'files':>7} {'MB':>8}")
+    for name, ms, files, mb in results:
+        print(f"{name:<12} {ms:>9.2f} {1000.0 / ms:>9.0f} {files:>7} {mb:>8.1f}")
+    print("segments and sidecar indexes hold every frame")
+
+
+if __name__ == '__main__':
+    main()
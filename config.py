@@ -39,13 +39,152 @@ CAMERA_CONFIG = {
     'OD_NAME': "DFK 33GP1300e [OD]",
     'FRAME_WIDTH': 1280,
     'FRAME_HEIGHT': 960,
-    'FRAME_SHAPE': (960, 1280, 3)
+    'FRAME_SHAPE': (960, 1280, 3),
+    'FPS': 96,              # DFK 33GP1300e rate from the IC Capture profiles
+    'BUFFER_SLOTS': 16      # Frames kept in each shared-memory ring (~166 ms at 96 fps)
+}
+
+# Capture watchdog: reopens a live camera that stops delivering frames
+CAPTURE_WATCHDOG = {
+    'STALL_TIMEOUT_MS': 500,            # No frame for this long counts as a stall (~48 frames at 96 fps)
+    'MAX_CONSECUTIVE_FAILURES': 10,     # Failed reads in a row that count as a stall
+    'READ_TIMEOUT_MS': 300,             # Bound on a blocking cap.read() where the backend supports it
+    'BACKOFF_INITIAL_MS': 50,           # First retry delay after a failed reopen
+    'BACKOFF_MAX_MS': 2000              # Retry delay cap
+}
+
+# Camera device discovery (DirectShow on Windows, /sys/class/video4linux on Linux)
+CAMERA_DISCOVERY = {
+    'MONITOR_INTERVAL_S': 5     # Background re-enumeration period for hot-plug detection
+}
+
+# Per-camera capture configuration
+# Every entry gets its own capture process and shared-memory frame ring.
+#   SOURCE:     TYPE 'camera' opens the named device; 'video' and 'images' replay
+#               a file or folder into the same buffers for offline runs, e.g.
+#               {'TYPE': 'video', 'PATH': 'recordings/bf.avi', 'FPS': 96, 'LOOP': True}
+#               {'TYPE': 'images', 'PATH': 'recordings/od_frames', 'FPS': 0, 'LOOP': True}
+#               (replay FPS 0 = as fast as possible, None = the video's own rate)
+#   RESOLUTION: (width, height) requested from the source
+#   FPS:        Acquisition rate requested from live cameras
+#   FLIP:       cv2.flip code (0, 1, -1) or None
+#   ROTATION:   0, 90, 180 or 270 degrees clockwise, applied after FLIP
+#   ROI:        (x, y, width, height) crop applied last, or None for the full frame
+#   BUFFER_SLOTS: Frames kept in the camera's shared-memory ring
+#   ZERO_COPY: Decode into preallocated memory and flip/rotate straight into the
+#              ring slot (False = allocate and copy every frame)
+#   MODEL_INPUT: None, or {'IMGSZ': 640, 'ROI': (x, y, width, height) or None} to
+#               also publish ROI-cropped frames letterboxed to the model's imgsz
+#               (IMGSZ must match the size the model was trained at)
+CAMERAS = {
+    'BIGFACE': {
+        'SOURCE': {'TYPE': 'camera', 'NAME': CAMERA_CONFIG['BIGFACE_NAME'], 'FALLBACK_INDEX': 0},
+        'RESOLUTION': (CAMERA_CONFIG['FRAME_WIDTH'], CAMERA_CONFIG['FRAME_HEIGHT']),
+        'FPS': CAMERA_CONFIG['FPS'],
+        'FLIP': None,
+        'ROTATION': 0,
+        'ROI': None,
+        'BUFFER_SLOTS': CAMERA_CONFIG['BUFFER_SLOTS'],
+        'ZERO_COPY': True,
+        'MODEL_INPUT': None
+    },
+    'OD': {
+        'SOURCE': {'TYPE': 'camera', 'NAME': CAMERA_CONFIG['OD_NAME'], 'FALLBACK_INDEX': 1},
+        'RESOLUTION': (CAMERA_CONFIG['FRAME_WIDTH'], CAMERA_CONFIG['FRAME_HEIGHT']),
+        'FPS': CAMERA_CONFIG['FPS'],
+        'FLIP': -1,
+        'ROTATION': 0,
+        'ROI': None,
+        'BUFFER_SLOTS': CAMERA_CONFIG['BUFFER_SLOTS'],
+        'ZERO_COPY': True,
+        'MODEL_INPUT': None
+    }
+}
+
+# PLC-edge frame latching
+# On each rising edge of a sensor below, the capture process of CAMERA copies
+# the frame(s) nearest to the edge into that camera's latch ring, tagged with
+# the roller ID. Rollers are numbered by the edge count of ROLLER_ID_FROM.
+FRAME_LATCH = {
+    'SLOTS': 8,               # Latched frames kept per camera
+    'FRAMES_PER_EDGE': 1,     # Frames latched per edge, starting at the nearest one
+    'OFFSET_MS': 0,           # Shift applied to the edge time (sensor-to-field-of-view delay)
+    'TIMEOUT_MS': 100,        # Latch the best frame available if none arrives after the edge
+    'SENSORS': {
+        'bigface_presence': {'CAMERA': 'BIGFACE', 'ROLLER_ID_FROM': 'bigface_presence'},
+        'head_classification_sensor': {'CAMERA': 'BIGFACE', 'ROLLER_ID_FROM': 'bigface_presence'},
+        'od_presence': {'CAMERA': 'OD', 'ROLLER_ID_FROM': 'od_presence'}
+    }
+}
+
+# YOLO models; CAMERA is the camera whose frames (and warmup image) the model sees
+MODELS = {
+    'BF': {'PATH': "models/BF_sr.pt", 'CAMERA': 'BIGFACE'},
+    'HEAD': {'PATH': "models/BF_Head.pt", 'CAMERA': 'BIGFACE'},
+    'OD': {'PATH': "models/OD_sr.pt", 'CAMERA': 'OD'}
+}
+
+# Central inference server owning every model (False = each inference process loads its own)
+INFERENCE_SERVER = {
+    'ENABLED': True,
+    'DEVICE': 'auto',           # 'auto' (CUDA if available, else CPU), 'cpu' or a CUDA index
+    'BATCH_WINDOW_MS': 2,       # How long to gather requests after the first one
+    'MAX_BATCH': 8,             # Requests per batched predict
+    'REQUEST_SLOTS': 2,         # Requests each inference process can have in flight
+    'MAX_DETECTIONS': 300,      # Detections returned per frame
+    'RESPONSE_TIMEOUT_S': 30    # An inference process gives up on a server that has not answered for this long
+}
+
+# Inference backend of the YOLO models
+# 'auto' uses PyTorch on CUDA when a GPU is present, otherwise OpenVINO or ONNX
+# Runtime (whichever is installed) with models exported from the .pt files.
+INFERENCE_BACKEND = {
+    'BACKEND': 'auto',                  # 'auto', 'torch', 'onnx' or 'openvino'
+    'PRECISION': 'fp32',                # 'fp32' or 'int8' for the exported (CPU) backends
+    'IMGSZ': 640,                       # Input size the exports are built for
+    'EXPORT_DIR': "models/exported",    # Cache of exported models, rebuilt when the .pt is newer
+    'CALIBRATION_DATA': None,           # Dataset YAML for OpenVINO INT8 calibration (None = Ultralytics default)
+    'LOAD_WORKERS': 3                   # Models loaded / warmed up concurrently within a process
+}
+
+# Startup timeline (per-phase trace written when inspection becomes ready)
+STARTUP = {
+    'TRACE_PATH': os.path.join("logs", "startup_trace.json")    # Chrome trace; open in chrome://tracing or Perfetto
+}
+
+# Memory policy of the inference processes (replaces per-frame empty_cache/gc.collect)
+MEMORY_POLICY = {
+    'FREEZE_AFTER_WARMUP': True,        # gc.freeze() the heap once models are loaded and warm
+    'GC_THRESHOLDS': (50000, 50, 100),  # gc.set_threshold(); a high gen0 threshold keeps collections rare
+    'RSS_BUDGET_MB': 6144,              # Reclaim when process RSS exceeds this (None = no budget)
+    'DEVICE_BUDGET_MB': 3072,           # Reclaim when CUDA reserved memory exceeds this (None = no budget)
+    'IDLE_RECLAIM_S': 5,                # Reclaim once after the line has been idle this long
+    'CHECK_INTERVAL_S': 1.0             # How often budgets are checked
+}
+
+# Roller tracking: follow roller boxes across frames instead of numbering them by position per frame
+ROLLER_TRACKER = {
+    'ENABLED': True,                # False = per-frame assignment by left-to-right order
+    'IOU_THRESHOLD': 0.3,           # Minimum IoU to continue a track
+    'MAX_CENTROID_DISTANCE': 80,    # Or centroid within this many pixels (fast or partly detected rollers)
+    'MAX_MISSED': 5,                # Frames a track survives without its roller being detected
+    'ROLLER_CONF': 0.80             # Minimum confidence of tracked roller boxes
 }
 
 # Warmup Images
 WARMUP_IMAGES = {
-    'BIGFACE': r"assets\images\Warmup BF.jpg",
-    'OD': r"assets\images\Warmup OD.jpg"
+    'BIGFACE': os.path.join("assets", "images", "Warmup BF.jpg"),
+    'OD': os.path.join("assets", "images", "Warmup OD.jpg")
+}
+
+# Model warmup: each model is called with its production settings until latency converges
+WARMUP = {
+    'IMAGES': WARMUP_IMAGES,
+    'CONF': {'BF': 0.2, 'HEAD': 0.7, 'OD': 0.2},   # Confidence of the production predict calls
+    'MIN_RUNS': 3,          # Runs always made per model (convergence needs at least WINDOW runs)
+    'MAX_RUNS': 30,         # Upper bound if latency never settles
+    'WINDOW': 5,            # Recent runs compared for convergence
+    'TOLERANCE': 0.15       # Converged when the window's spread is within 15% of its median
 }
 
 # Image Storage Paths - Dynamic Desktop paths
@@ -80,6 +219,48 @@ IMAGE_STORAGE_PATHS = {
 # Image Management Configuration
 IMAGE_LIMIT_PER_DIRECTORY = 10000
 
+# Saved images are drawn, encoded and written by worker threads; the inference loop only queues them
+IMAGE_WRITER = {
+    'WORKERS': 2,               # Writer threads per inference process
+    'MAX_PENDING': 32,          # Images queued at most per process
+    'DROP_POLICY': 'oldest',    # When full: 'oldest' evicts the oldest queued image, 'newest' rejects the new one
+    'FLUSH_TIMEOUT_S': 5.0      # On Stop: time allowed to write out queued images before the process is terminated
+}
+
+# Global retention across all image directories (on top of IMAGE_LIMIT_PER_DIRECTORY)
+STORAGE_GOVERNOR = {
+    'ENABLED': True,
+    'BYTE_BUDGET_GB': 50,                           # All saved images and video recordings together
+    'MIN_FREE_GB': 10,                              # Evict while the image disk has less free space than this
+    'PRIORITY': {'ALL_FRAMES': 0, 'RECORDINGS': 1, 'INFERENCE': 2},  # Lower tiers are emptied (oldest first) before higher ones
+    'CHECK_INTERVAL_S': 2.0,                        # Time between governor passes
+    'BATCH_FILES': 200                              # Images deleted at most per pass and process
+}
+
+# All-frames mode appends raw frames + detections to rolling segment files instead of one JPEG per frame
+# (read them with backend.frame_archive.FrameArchiveReader or tools/extract_archive_frames.py)
+FRAME_ARCHIVE = {
+    'ENABLED': True,
+    'SEGMENT_MB': 256,      # Segment size before rolling over to a new file
+    'JPEG_QUALITY': 90,     # Quality of the archived frames
+    'BUFFER_KB': 1024       # Write buffer per segment
+}
+
+# Continuous recording of every camera frame into rolling video segments (own process, toggled with "Record video")
+VIDEO_RECORDER = {
+    'ENABLED': True,                                # Start the recorder process with the inspection
+    'DIR': os.path.join(DESKTOP_PATH, 'Recordings'),  # One subdirectory per camera
+    'FOURCC': 'MJPG',                               # Codec passed to cv2.VideoWriter ('avc1' for H.264 if available)
+    'EXTENSION': '.avi',                            # Container matching the codec ('.mp4' for 'avc1')
+    'SEGMENT_SECONDS': 60,                          # Segment length before rolling over to a new file
+    'SCALE': 1.0,                                   # Record downscaled (e.g. 0.5) if frames are missed at full size
+    'QUALITY': 90,                                  # MJPG quality (0-100), where the VideoWriter backend supports it
+    'MAX_SEGMENTS': 240,                            # Segments kept per camera (oldest deleted first)
+    'MAX_GB': 20,                                   # Segments kept per camera, by size (STORAGE_GOVERNOR also covers them)
+    'BACKOFF_INITIAL_MS': 500,                      # First retry delay after a write or open error
+    'BACKOFF_MAX_MS': 30000                         # Retry delay cap
+}
+
 # Default Model Confidence Thresholds
 DEFAULT_CONFIDENCE = {
     'OD': 0.2,
@@ -7,10 +7,6 @@ import tkinter.messagebox as messagebox
 import numpy as np
 import time
 from multiprocessing import Process, Array, Queue, Lock, Value, Manager
-from ultralytics import YOLO
-import snap7
-from snap7.util import set_bool
-from snap7.type import Areas
 
 # Import backend modules
 from backend import *
@@ -24,6 +20,7 @@ from .inference_page import (
     start_inspection, 
     stop_inspection, 
     toggle_allow_all_images,
+    toggle_record_video,
     update_bf_results,
     update_od_results,
     update_overall_results
@@ -32,7 +29,7 @@ from .statistics_page import setup_statistics_tab, update_statistics
 from .settings_page import setup_settings_tab, save_thresholds, create_slider, update_threshold, update_model_confidence
 
 # Import configuration
-from config import PLC_CONFIG, PLC_SENSORS, CAMERA_CONFIG, DEFECT_THRESHOLDS, DEFAULT_CONFIDENCE, UI_COLORS, IMAGE_STORAGE_PATHS, IMAGE_LIMIT_PER_DIRECTORY, WARMUP_IMAGES
+from config import PLC_CONFIG, PLC_SENSORS, CAMERA_CONFIG, CAMERAS, CAMERA_DISCOVERY, FRAME_LATCH, DEFECT_THRESHOLDS, DEFAULT_CONFIDENCE, UI_COLORS, IMAGE_STORAGE_PATHS, IMAGE_LIMIT_PER_DIRECTORY, WARMUP_IMAGES
 
 
 class WelVisionApp(tk.Tk):
@@ -137,11 +134,10 @@ class WelVisionApp(tk.Tk):
         self.SLOT = PLC_CONFIG['SLOT']
         self.DB_NUMBER = PLC_CONFIG['DB_NUMBER']
 
-        self.model_bigface = YOLO(r"models/BF_sr.pt")
-        self.model_od = YOLO(r"models/OD_sr.pt")
+        # Enumerate cameras in the background and keep the list fresh for hot-plug
+        start_camera_monitor(CAMERA_DISCOVERY['MONITOR_INTERVAL_S'])
 
-        self.model_bigface.to('cuda')
-        self.model_od.to('cuda')
+        # Models are loaded by the processes that run them (see create_processes)
 
         self.frame_shape = CAMERA_CONFIG['FRAME_SHAPE']
 
@@ -153,6 +149,7 @@ class WelVisionApp(tk.Tk):
         self.shared_data['od_presence'] = False
         self.shared_data["head_classification_sensor"] = False
         self.shared_data['allow_all_images'] = False  # New flag for all images mode
+        self.shared_data['record_video'] = False  # Video recorder writes segments while set
         self.shared_data['bf_model_loaded'] = False  # Flag for Bigface model loaded
         self.shared_data['od_model_loaded'] = False  # Flag for OD model loaded
         self.shared_data['plc_ready'] = False  # Flag for PLC ready signal sent
@@ -172,19 +169,54 @@ class WelVisionApp(tk.Tk):
         self.roller_queue_bigface = Queue()
         self.roller_updation_dict = self.manager.dict()
 
-        self.shared_frame_bigface = Array('B', np.zeros(self.frame_shape, dtype=np.uint8).flatten())
-        self.shared_frame_od = Array('B', np.zeros(self.frame_shape, dtype=np.uint8).flatten())
+        # Shared-memory frame rings written by the capture processes, one per camera
+        self.frame_rings = {
+            name: SharedFrameRing(get_camera_frame_shape(camera), slots=camera['BUFFER_SLOTS'])
+            for name, camera in CAMERAS.items()
+        }
+
+        # Model-ready (ROI + letterbox) rings for cameras with MODEL_INPUT configured
+        self.model_rings = {
+            name: SharedFrameRing((camera['MODEL_INPUT']['IMGSZ'], camera['MODEL_INPUT']['IMGSZ'], 3), slots=camera['BUFFER_SLOTS'])
+            if camera.get('MODEL_INPUT') else None
+            for name, camera in CAMERAS.items()
+        }
+
+        # Capture counters (frames, allocations, bytes copied) published by each capture process
+        self.capture_metrics = {name: new_capture_metrics() for name in CAMERAS}
+
+        # Memory and GC metrics published by each inference process and the inference server
+        self.memory_metrics = {name: new_memory_metrics() for name in ('BIGFACE', 'OD', 'INFERENCE_SERVER')}
+
+        # Frames inferred / skipped as duplicates / missed by each camera's inference loop
+        self.inference_metrics = {name: new_inference_metrics() for name in CAMERAS}
+
+        # Images queued, written and dropped by each inference process's image writer
+        self.image_writer_metrics = {name: new_image_writer_metrics() for name in CAMERAS}
+
+        # Bytes stored and evicted by each inference process's storage governor, and the video recorder's
+        self.storage_metrics = {name: new_storage_metrics() for name in (*CAMERAS, 'RECORDER')}
+
+        # Frames and segments written by the video recorder, per camera
+        self.video_recorder_metrics = {name: new_video_recorder_metrics() for name in CAMERAS}
+        self.recorder_process = None
+        self.recorder_stop = None
+
+        # Inference loops and the event that asks them to stop gracefully
+        self.inference_processes = []
+        self.inference_stop = None
+
+        # PLC sensor edges and the frames latched at them, one latch ring per camera
+        self.edge_board = SensorEdgeBoard(FRAME_LATCH['SENSORS'])
+        self.latch_rings = {
+            name: SharedFrameRing(ring.frame_shape, slots=FRAME_LATCH['SLOTS'])
+            for name, ring in self.frame_rings.items()
+        }
 
-        self.frame_lock_bigface = Lock()
-        self.frame_lock_od = Lock()
         self.queue_lock = Lock()
     
-        # Shared memory for storing annotated frames
-        self.shared_annotated_bigface = Array('B', np.zeros(self.frame_shape, dtype=np.uint8).flatten())
-        self.shared_annotated_od = Array('B', np.zeros(self.frame_shape, dtype=np.uint8).flatten())
-
-        self.annotated_frame_lock_bigface = Lock()
-        self.annotated_frame_lock_od = Lock()
+        # Detections of the latest inferred frames; the camera feeds draw them at display resolution
+        self.detection_rings = {name: DetectionRing() for name in CAMERAS}
         
         # Initialize storage directories
         from backend.image_manager import initialize_storage_directories
@@ -193,5 +225,6 @@ class WelVisionApp(tk.Tk):
     def on_closing(self):
         """Handle application closing."""
         self.camera_running = False
+        stop_camera_monitor()
         time.sleep(0.5)
         self.destroy()
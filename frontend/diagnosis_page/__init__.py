@@ -1,8 +1,106 @@
 """
 Diagnosis Page Module - System diagnostics and troubleshooting
 """
+import time
 import tkinter as tk
-from config import UI_COLORS
+from config import UI_COLORS, MODELS
+from backend.capture_health import CAPTURE_STATES
+from backend.model_registry import model_load_reports
+from backend.startup import collect_startup_timeline
+
+# Capture metrics shown in the camera health table: (field, label, format)
+CAPTURE_HEALTH_ROWS = [
+    ('fps', "Delivered FPS", "{:.1f}"),
+    ('read_ms_p50', "Read latency p50 (ms)", "{:.2f}"),
+    ('read_ms_p95', "Read latency p95 (ms)", "{:.2f}"),
+    ('read_ms_p99', "Read latency p99 (ms)", "{:.2f}"),
+    ('read_ms_max', "Read latency max (ms)", "{:.2f}"),
+    ('frames', "Frames captured", "{:.0f}"),
+    ('dropped_frames', "Dropped frames (est.)", "{:.0f}"),
+    ('gaps', "Gaps", "{:.0f}"),
+    ('failures', "Failed reads", "{:.0f}"),
+    ('consecutive_failures', "Consecutive failures", "{:.0f}"),
+    ('stalls', "Stalls", "{:.0f}"),
+    ('reconnects', "Reconnects", "{:.0f}"),
+    ('recovery_ms_last', "Last recovery (ms)", "{:.0f}"),
+    ('allocations', "Frame allocations", "{:.0f}"),
+    ('bytes_copied_last', "Bytes copied / frame", "{:.0f}"),
+]
+
+# Inference loop counters per camera: (field, label, format)
+INFERENCE_ROWS = [
+    ('frames_inferred', "Frames inferred", "{:.0f}"),
+    ('latched_inferred', "Latched frames inferred", "{:.0f}"),
+    ('duplicates_skipped', "Duplicate waits (skipped)", "{:.0f}"),
+    ('frames_missed', "Frames missed", "{:.0f}"),
+    ('frames_unsaved', "Frames not saved (overwritten)", "{:.0f}"),
+    ('inference_errors', "Inference errors (skipped)", "{:.0f}"),
+    ('last_seq', "Last frame seq", "{:.0f}"),
+]
+
+# Image writer counters per inference process: (field, label, format)
+IMAGE_WRITER_ROWS = [
+    ('submitted', "Images queued", "{:.0f}"),
+    ('written', "Images written", "{:.0f}"),
+    ('dropped', "Images dropped", "{:.0f}"),
+    ('errors', "Write errors", "{:.0f}"),
+    ('queue_depth', "Queue depth", "{:.0f}"),
+    ('write_ms_last', "Last write (ms)", "{:.1f}"),
+    ('write_ms_max', "Slowest write (ms)", "{:.1f}"),
+]
+
+# Storage governor state per inference process and the video recorder: (field, label, format)
+STORAGE_ROWS = [
+    ('bytes_used_mb', "Stored (MB)", "{:.0f}"),
+    ('bytes_all_frames_mb', "All Frames (MB)", "{:.0f}"),
+    ('bytes_inference_mb', "Defect images (MB)", "{:.0f}"),
+    ('bytes_recordings_mb', "Recordings (MB)", "{:.0f}"),
+    ('files', "Files stored", "{:.0f}"),
+    ('free_mb', "Disk free (MB)", "{:.0f}"),
+    ('evicted_files', "Files evicted", "{:.0f}"),
+    ('evicted_mb', "Evicted (MB)", "{:.0f}"),
+    ('eviction_rate', "Evictions / s", "{:.1f}"),
+    ('over_limit', "Over limit", "{:.0f}"),
+]
+
+# Video recorder state per camera: (field, label, format)
+VIDEO_RECORDER_ROWS = [
+    ('recording', "Recording", "{:.0f}"),
+    ('frames_recorded', "Frames recorded", "{:.0f}"),
+    ('frames_missed', "Frames missed", "{:.0f}"),
+    ('segments_closed', "Segments closed", "{:.0f}"),
+    ('segments_evicted', "Segments evicted", "{:.0f}"),
+    ('stored_mb', "Segments stored (MB)", "{:.0f}"),
+    ('write_ms_last', "Last frame write (ms)", "{:.2f}"),
+    ('write_ms_max', "Slowest frame write (ms)", "{:.2f}"),
+    ('errors', "Recording errors", "{:.0f}"),
+]
+
+# Model load report fields: (key, label)
+MODEL_LOAD_ROWS = [
+    ('status', "Status"),
+    ('load_ms', "Load time (ms)"),
+    ('warmup_ms', "Warmup time (ms)"),
+    ('runs', "Warmup runs"),
+    ('latency_ms', "Warm latency (ms)"),
+    ('backend', "Backend"),
+    ('device', "Device"),
+    ('pid', "Process ID"),
+]
+
+# Memory metrics shown per inference process: (field, label, format)
+MEMORY_ROWS = [
+    ('rss_mb', "Process RSS (MB)", "{:.0f}"),
+    ('device_allocated_mb', "CUDA allocated (MB)", "{:.0f}"),
+    ('device_reserved_mb', "CUDA reserved (MB)", "{:.0f}"),
+    ('frozen_objects', "Frozen objects", "{:.0f}"),
+    ('gc_collections', "GC collections", "{:.0f}"),
+    ('busy_gc_collections', "GC collections while busy", "{:.0f}"),
+    ('gc_pause_ms_total', "GC pause total (ms)", "{:.1f}"),
+    ('gc_pause_ms_max', "GC pause max (ms)", "{:.2f}"),
+    ('reclaims', "Reclaims", "{:.0f}"),
+    ('reclaim_ms_last', "Last reclaim (ms)", "{:.1f}"),
+]
 
 
 def setup_diagnosis_tab(app, parent):
@@ -27,16 +125,45 @@ def setup_diagnosis_tab(app, parent):
     )
     title_label.pack(pady=(0, 30))
     
+    # Camera capture health
+    if hasattr(app, 'capture_metrics'):
+        _setup_capture_health(app, container)
+
+    # Frames inferred, skipped and missed by the inference loops
+    if hasattr(app, 'inference_metrics'):
+        _setup_metrics_block(app, container, "Inference Frames", app.inference_metrics, INFERENCE_ROWS)
+
+    # Saved images queued, written and dropped by the image writers
+    if hasattr(app, 'image_writer_metrics'):
+        _setup_metrics_block(app, container, "Image Writer", app.image_writer_metrics, IMAGE_WRITER_ROWS)
+
+    # Global image retention: bytes per tier, free space and evictions
+    if hasattr(app, 'storage_metrics'):
+        _setup_metrics_block(app, container, "Storage", app.storage_metrics, STORAGE_ROWS)
+
+    # Continuous video recording: frames and segments written per camera
+    if hasattr(app, 'video_recorder_metrics'):
+        _setup_metrics_block(app, container, "Video Recorder", app.video_recorder_metrics, VIDEO_RECORDER_ROWS)
+
+    # Per-model load reports published by the processes that own the models
+    if hasattr(app, 'shared_data'):
+        _setup_model_loading(app, container)
+
+    # Per-phase startup timeline of the last Start
+    if hasattr(app, 'shared_data'):
+        _setup_startup_timeline(app, container)
+
+    # Inference process memory and GC
+    if hasattr(app, 'memory_metrics'):
+        _setup_metrics_block(app, container, "Inference Memory & GC", app.memory_metrics, MEMORY_ROWS)
+    
     # Placeholder content
     info_label = tk.Label(
         container,
         text="System diagnostics features will be implemented here.\n\n"
              "This section will include:\n"
-             "• Camera connection status\n"
              "• PLC connection status\n"
-             "• Model loading status\n"
-             "• System logs and errors\n"
-             "• Performance metrics",
+             "• System logs and errors",
         font=("Arial", 14),
         fg=UI_COLORS['WHITE'],
         bg=UI_COLORS['PRIMARY_BG'],
@@ -45,4 +172,198 @@ def setup_diagnosis_tab(app, parent):
     info_label.pack(pady=20)
 
 
+
+def _setup_metrics_table(parent, title, column_names, rows):
+    """
+    Build a grid of metric labels, one column per process
+
+    Args:
+        parent: Parent frame
+        title: Table title
+        column_names: Column headers
+        rows: (key, label) pairs, one per row
+
+    Returns:
+        Dict of (key, column name) -> value label
+    """
+    table_frame = tk.LabelFrame(
+        parent,
+        text=title,
+        font=("Arial", 12, "bold"),
+        fg=UI_COLORS['WHITE'],
+        bg=UI_COLORS['PRIMARY_BG'],
+        bd=2,
+        relief=tk.GROOVE
+    )
+    table_frame.pack(fill=tk.X, padx=5, pady=5)
+
+    for column, name in enumerate(column_names, start=1):
+        tk.Label(
+            table_frame,
+            text=name,
+            font=("Arial", 11, "bold"),
+            fg=UI_COLORS['WHITE'],
+            bg=UI_COLORS['PRIMARY_BG']
+        ).grid(row=0, column=column, padx=15, pady=5)
+
+    value_labels = {}
+    for row, (key, text) in enumerate(rows, start=1):
+        pady = (0, 5) if row == len(rows) else 0
+        tk.Label(
+            table_frame,
+            text=text,
+            font=("Arial", 10),
+            fg=UI_COLORS['WHITE'],
+            bg=UI_COLORS['PRIMARY_BG'],
+            anchor="w"
+        ).grid(row=row, column=0, sticky="w", padx=10, pady=pady)
+        for column, name in enumerate(column_names, start=1):
+            label = tk.Label(
+                table_frame,
+                text="-",
+                font=("Arial", 10, "bold"),
+                fg=UI_COLORS['WHITE'],
+                bg=UI_COLORS['PRIMARY_BG']
+            )
+            label.grid(row=row, column=column, padx=15, pady=pady)
+            value_labels[(key, name)] = label
+
+    return value_labels
+
+
+def _labels_exist(value_labels):
+    """True while the table is still on screen"""
+    try:
+        return all(label.winfo_exists() for label in value_labels.values())
+    except tk.TclError:
+        return False
+
+
+def _setup_capture_health(app, parent):
+    """Setup the camera capture health table"""
+    rows = [('state', "State")]
+    rows += [(field, text) for field, text, _ in CAPTURE_HEALTH_ROWS]
+    rows.append(('age', "Last frame age (s)"))
+    value_labels = _setup_metrics_table(parent, "Camera Capture Health", list(app.capture_metrics), rows)
+    _refresh_capture_health(app, value_labels)
+
+
+def _refresh_capture_health(app, value_labels):
+    """Refresh the capture health table from shared memory once per second"""
+    # Stop once the tab has been switched away from
+    if not _labels_exist(value_labels):
+        return
+
+    now = time.perf_counter()
+    for camera_name, metrics in app.capture_metrics.items():
+        snapshot = metrics.snapshot()
+        value_labels[('state', camera_name)].config(text=CAPTURE_STATES[int(snapshot['state'])])
+        for field, _, fmt in CAPTURE_HEALTH_ROWS:
+            value_labels[(field, camera_name)].config(text=fmt.format(snapshot[field]))
+        last_frame = snapshot['last_frame_time']
+        age = f"{now - last_frame:.1f}" if last_frame else "-"
+        value_labels[('age', camera_name)].config(text=age)
+
+    app.after(1000, lambda: _refresh_capture_health(app, value_labels))
+
+
+def _setup_model_loading(app, parent):
+    """Setup the model loading table"""
+    value_labels = _setup_metrics_table(parent, "Model Loading", list(MODELS), MODEL_LOAD_ROWS)
+    _refresh_model_loading(app, value_labels)
+
+
+def _refresh_model_loading(app, value_labels):
+    """Refresh the model loading table from shared_data once per second"""
+    if not _labels_exist(value_labels):
+        return
+
+    try:
+        reports = model_load_reports(app.shared_data, MODELS)
+    except (EOFError, BrokenPipeError, ConnectionError):
+        return  # Manager shut down while the app closes
+
+    for model_key, report in reports.items():
+        if report is None:
+            values = {'status': "Not loaded"}
+        else:
+            values = dict(report, status="Loaded", load_ms=f"{report['load_ms']:.0f}")
+            if 'warmup_ms' in report:
+                values['status'] = "Ready" if report['converged'] else "Ready (not converged)"
+                values['warmup_ms'] = f"{report['warmup_ms']:.0f}"
+                values['latency_ms'] = f"{report['latency_ms']:.1f}"
+        for key, _ in MODEL_LOAD_ROWS:
+            value_labels[(key, model_key)].config(text=str(values.get(key, "-")))
+
+    app.after(1000, lambda: _refresh_model_loading(app, value_labels))
+
+
+def _setup_startup_timeline(app, parent):
+    """Setup the startup timeline panel"""
+    timeline_frame = tk.LabelFrame(
+        parent,
+        text="Startup Timeline",
+        font=("Arial", 12, "bold"),
+        fg=UI_COLORS['WHITE'],
+        bg=UI_COLORS['PRIMARY_BG'],
+        bd=2,
+        relief=tk.GROOVE
+    )
+    timeline_frame.pack(fill=tk.X, padx=5, pady=5)
+
+    timeline_label = tk.Label(
+        timeline_frame,
+        text="No startup recorded yet",
+        font=("Courier", 10),
+        fg=UI_COLORS['WHITE'],
+        bg=UI_COLORS['PRIMARY_BG'],
+        justify=tk.LEFT,
+        anchor="w"
+    )
+    timeline_label.pack(fill=tk.X, padx=10, pady=5)
+    _refresh_startup_timeline(app, timeline_label)
+
+
+def _refresh_startup_timeline(app, timeline_label):
+    """Refresh the startup timeline once per second"""
+    if not _labels_exist({'timeline': timeline_label}):
+        return
+
+    try:
+        phases = collect_startup_timeline(app.shared_data, getattr(app, 'capture_metrics', None))
+    except (EOFError, BrokenPipeError, ConnectionError):
+        return  # Manager shut down while the app closes
+
+    if phases:
+        origin = phases[0]['start']
+        lines = [f"{'Phase':<28}{'Start (ms)':>12}{'Duration (ms)':>15}"]
+        for phase in phases:
+            lines.append(
+                f"{phase['name']:<28}{(phase['start'] - origin) * 1000:>12.0f}"
+                f"{(phase['end'] - phase['start']) * 1000:>15.0f}"
+            )
+        timeline_label.config(text="\n".join(lines))
+
+    app.after(1000, lambda: _refresh_startup_timeline(app, timeline_label))
+
+
+def _setup_metrics_block(app, parent, title, metrics_by_name, rows):
+    """Setup a table showing SharedMetrics blocks side by side"""
+    value_labels = _setup_metrics_table(parent, title, list(metrics_by_name), [(field, text) for field, text, _ in rows])
+    _refresh_metrics_block(app, value_labels, metrics_by_name, rows)
+
+
+def _refresh_metrics_block(app, value_labels, metrics_by_name, rows):
+    """Refresh a SharedMetrics table from shared memory once per second"""
+    if not _labels_exist(value_labels):
+        return
+
+    for name, metrics in metrics_by_name.items():
+        snapshot = metrics.snapshot()
+        for field, _, fmt in rows:
+            value_labels[(field, name)].config(text=fmt.format(snapshot[field]))
+
+    app.after(1000, lambda: _refresh_metrics_block(app, value_labels, metrics_by_name, rows))
+
+
 __all__ = ['setup_diagnosis_tab']
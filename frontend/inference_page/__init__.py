@@ -5,11 +5,11 @@ No threshold adjustment in inference page - moved to settings
 
 from .top_panel import setup_top_panel, update_confidence_display, update_model_status, update_disc_status
 from .camera_feed import setup_camera_frames
-from .status_indicators import create_status_indicator, update_status_indicator
+from .status_indicators import create_status_indicator, update_status_indicator, update_capture_health
 from .results_display import setup_results_panel, update_bf_results, update_od_results, update_overall_results
 from .controls import setup_control_buttons
 from .camera_manager import start_camera_feeds, stop_camera_feeds
-from .inspection_control import start_inspection, stop_inspection, toggle_allow_all_images
+from .inspection_control import start_inspection, stop_inspection, toggle_allow_all_images, toggle_record_video
 
 
 def setup_inference_tab(app, parent):
@@ -30,7 +30,7 @@ def setup_inference_tab(app, parent):
     # Setup results panel at bottom (BF Result, OD Result, Overall Result - 3 columns)
     setup_results_panel(app, parent)
     
-    # Setup control buttons at bottom (Start, Stop, Reset, Allow all images)
+    # Setup control buttons at bottom (Start, Stop, Reset, Allow all images, Record video)
     setup_control_buttons(app, parent)
 
 
@@ -42,6 +42,7 @@ __all__ = [
     'setup_camera_frames',
     'create_status_indicator',
     'update_status_indicator',
+    'update_capture_health',
     'setup_results_panel',
     'update_bf_results',
     'update_od_results',
@@ -52,5 +53,6 @@ __all__ = [
     'stop_camera_feeds',
     'start_inspection',
     'stop_inspection',
-    'toggle_allow_all_images'
+    'toggle_allow_all_images',
+    'toggle_record_video'
 ]
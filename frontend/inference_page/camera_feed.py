@@ -65,6 +65,16 @@ def _setup_bf_feed(app, parent):
     )
     app.bf_status_indicator.pack(padx=10, pady=(0, 5))
     
+    # Capture health (fps, read latency, drops) from the capture process
+    app.bf_health_label = tk.Label(
+        bf_container,
+        text="",
+        font=("Arial", 9),
+        fg="white",
+        bg=UI_COLORS['PRIMARY_BG']
+    )
+    app.bf_health_label.pack(padx=10)
+    
     # Camera canvas - optimized size to fit screen without scrollbar
     app.bf_canvas = tk.Canvas(
         bf_container,
@@ -108,6 +118,16 @@ def _setup_od_feed(app, parent):
     )
     app.od_status_indicator.pack(padx=10, pady=(0, 5))
     
+    # Capture health (fps, read latency, drops) from the capture process
+    app.od_health_label = tk.Label(
+        od_container,
+        text="",
+        font=("Arial", 9),
+        fg="white",
+        bg=UI_COLORS['PRIMARY_BG']
+    )
+    app.od_health_label.pack(padx=10)
+    
     # Camera canvas - optimized size to fit screen without scrollbar
     app.od_canvas = tk.Canvas(
         od_container,
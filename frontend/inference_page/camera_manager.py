@@ -8,6 +8,8 @@ import numpy as np
 import tkinter as tk
 import time
 import threading
+from backend.annotation import render_detections
+from backend.detection_ring import SOURCE_LATCH_RING, class_names_key
 
 
 def start_camera_feeds(app):
@@ -35,26 +37,76 @@ def stop_camera_feeds(app):
     time.sleep(0.1)
 
 
+def render_latest_detections(app, camera_name, model_key, size, names_cache):
+    """
+    Draw the camera's latest inferred frame with its detections at display size.
+
+    The raw frame is fetched from the ring it was inferred from (camera or
+    latch ring) and annotated after resizing, so drawing never happens in
+    the inference process. When inference is slower than the ring turns
+    over (e.g. CPU inference), the inferred frame has already been
+    overwritten; the newest frame of that ring is then shown without boxes,
+    since the detections would not line up with it on a moving conveyor.
+
+    Args:
+        app: Application instance
+        camera_name: Key of CAMERAS
+        model_key: Key of MODELS whose class names label the boxes
+        size: (width, height) of the canvas
+        names_cache: Dict kept by the caller to avoid re-reading class names
+
+    Returns:
+        Display image, or None if the source ring holds no frame yet
+    """
+    packet = app.detection_rings[camera_name].latest()
+    if packet is None:
+        return np.zeros((size[1], size[0], 3), dtype=np.uint8)
+
+    source_ring = app.latch_rings[camera_name] if packet.source == SOURCE_LATCH_RING else app.frame_rings[camera_name]
+    frame_packet = source_ring.get(packet.frame_seq)
+    if frame_packet is None:
+        frame_packet = source_ring.latest()
+        if frame_packet is None:
+            return None
+        return cv2.resize(frame_packet.frame, size)
+
+    if model_key not in names_cache:
+        names = app.shared_data.get(class_names_key(model_key))
+        if not names:
+            return cv2.resize(frame_packet.frame, size)
+        names_cache[model_key] = names
+    return render_detections(frame_packet.frame, packet.detections, names_cache[model_key], size)
+
+
 def update_od_camera(app):
     """Update OD camera feed on canvas."""
+    last_rendered = None
+    names_cache = {}
     while app.camera_running:
         try:
             # Check if canvas still exists
             if not hasattr(app, 'od_canvas') or not app.od_canvas.winfo_exists():
                 break
                 
-            with app.annotated_frame_lock_od:
-                np_frame = np.frombuffer(app.shared_annotated_od.get_obj(), dtype=np.uint8).reshape(app.frame_shape)
-                frame = np_frame.copy()
-
-            # Resize to fit canvas - larger size for new UI
+            # Fit canvas - larger size for new UI
             canvas_width = app.od_canvas.winfo_width()
             canvas_height = app.od_canvas.winfo_height()
             
             if canvas_width > 1 and canvas_height > 1:
-                resized_frame = cv2.resize(frame, (canvas_width, canvas_height))
+                size = (canvas_width, canvas_height)
             else:
-                resized_frame = cv2.resize(frame, (640, 480))
+                size = (640, 480)
+
+            # Only redraw when there are new detections or the canvas was resized
+            rendered = (app.detection_rings['OD'].latest_seq, size)
+            if rendered == last_rendered:
+                time.sleep(0.03)
+                continue
+
+            resized_frame = render_latest_detections(app, 'OD', 'OD', size, names_cache)
+            if resized_frame is None:
+                time.sleep(0.03)
+                continue
             
             # Convert frame to a format compatible with Tkinter
             img = PIL.Image.fromarray(cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB))
@@ -64,6 +116,8 @@ def update_od_camera(app):
             if hasattr(app, 'od_canvas') and app.od_canvas.winfo_exists():
                 app.od_canvas.create_image(0, 0, anchor=tk.NW, image=imgtk)
                 app.od_canvas.image = imgtk
+                # Only a drawn packet counts as rendered; a failed one is retried
+                last_rendered = rendered
             else:
                 break
 
@@ -75,24 +129,33 @@ def update_od_camera(app):
 
 def update_bf_camera(app):
     """Update Bigface camera feed on canvas."""
+    last_rendered = None
+    names_cache = {}
     while app.camera_running:
         try:
             # Check if canvas still exists
             if not hasattr(app, 'bf_canvas') or not app.bf_canvas.winfo_exists():
                 break
                 
-            with app.annotated_frame_lock_bigface:
-                np_frame = np.frombuffer(app.shared_annotated_bigface.get_obj(), dtype=np.uint8).reshape(app.frame_shape)
-                frame = np_frame.copy()
-
-            # Resize to fit canvas - larger size for new UI
+            # Fit canvas - larger size for new UI
             canvas_width = app.bf_canvas.winfo_width()
             canvas_height = app.bf_canvas.winfo_height()
             
             if canvas_width > 1 and canvas_height > 1:
-                resized_frame = cv2.resize(frame, (canvas_width, canvas_height))
+                size = (canvas_width, canvas_height)
             else:
-                resized_frame = cv2.resize(frame, (640, 480))
+                size = (640, 480)
+
+            # Only redraw when there are new detections or the canvas was resized
+            rendered = (app.detection_rings['BIGFACE'].latest_seq, size)
+            if rendered == last_rendered:
+                time.sleep(0.03)
+                continue
+
+            resized_frame = render_latest_detections(app, 'BIGFACE', 'BF', size, names_cache)
+            if resized_frame is None:
+                time.sleep(0.03)
+                continue
             
             # Convert frame to a format compatible with Tkinter
             img = PIL.Image.fromarray(cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB))
@@ -102,6 +165,8 @@ def update_bf_camera(app):
             if hasattr(app, 'bf_canvas') and app.bf_canvas.winfo_exists():
                 app.bf_canvas.create_image(0, 0, anchor=tk.NW, image=imgtk)
                 app.bf_canvas.image = imgtk
+                # Only a drawn packet counts as rendered; a failed one is retried
+                last_rendered = rendered
             else:
                 break
 
@@ -131,6 +196,7 @@ def update_all_statistics(app):
     try:
         from .results_display import update_bf_results, update_od_results, update_overall_results
         from .top_panel import update_confidence_display
+        from .status_indicators import update_capture_health
         
         # Update result displays if they exist
         if hasattr(app, 'bf_inspected_label'):
@@ -142,6 +208,9 @@ def update_all_statistics(app):
         if hasattr(app, 'overall_inspected_label'):
             update_overall_results(app)
         
+        # Update capture health under the camera feeds
+        update_capture_health(app)
+        
         # Update confidence displays
         if hasattr(app, 'bf_confidence_display'):
             update_confidence_display(app)
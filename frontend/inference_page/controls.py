@@ -3,7 +3,7 @@ Control Buttons for Inference Tab
 """
 import tkinter as tk
 from config import UI_COLORS
-from .inspection_control import start_inspection, stop_inspection, toggle_allow_all_images
+from .inspection_control import start_inspection, stop_inspection, toggle_allow_all_images, toggle_record_video
 
 
 def setup_control_buttons(app, parent):
@@ -91,6 +91,23 @@ def setup_control_buttons(app, parent):
         command=lambda: toggle_allow_all_images(app)
     )
     allow_all_images_check.pack(pady=5)
+    
+    # Record Video checkbox - every camera frame into rolling video segments
+    app.record_video_var = tk.BooleanVar(value=False)
+    record_video_check = tk.Checkbutton(
+        checkbox_container,
+        text="Record video",
+        font=("Arial", 13, "bold"),
+        variable=app.record_video_var,
+        bg=UI_COLORS['PRIMARY_BG'],
+        fg="white",
+        selectcolor=UI_COLORS['SECONDARY_BG'],
+        activebackground=UI_COLORS['PRIMARY_BG'],
+        activeforeground="white",
+        cursor="hand2",
+        command=lambda: toggle_record_video(app)
+    )
+    record_video_check.pack(pady=5)
 
 
 def reset_statistics(app):
@@ -1,35 +1,40 @@
 """
 Inspection Control Module - Start/Stop inspection operations
 """
-import gc
-import torch
-import snap7
 import tkinter.messagebox as messagebox
 import threading
-from snap7.util import set_bool
-from snap7.type import Areas
-from multiprocessing import Process
-from config import CAMERA_CONFIG, PLC_SENSORS, PLC_CONFIG
+import time
+from multiprocessing import Process, Event
+
+try:
+    import snap7
+    from snap7.util import set_bool
+    from snap7.type import Areas
+except ImportError:  # The GUI runs without a PLC; plc_communication reports the missing package
+    snap7 = None
+
+from config import CAMERAS, CAPTURE_WATCHDOG, FRAME_LATCH, PLC_SENSORS, MODELS, INFERENCE_SERVER, INFERENCE_BACKEND, MEMORY_POLICY, WARMUP, STARTUP, ROLLER_TRACKER, IMAGE_WRITER, STORAGE_GOVERNOR, FRAME_ARCHIVE, VIDEO_RECORDER
 from backend import (
     plc_communication, 
-    capture_frames_bigface, 
+    capture_frames, 
+    resolve_camera_sources,
+    create_predictors,
+    run_inference_server,
+    model_load_key,
+    model_load_reports,
+    record_phase,
+    startup_phase,
+    reset_startup_timeline,
+    collect_startup_timeline,
+    export_chrome_trace,
     handle_slot_control_bigface,
     process_rollers_bigface,
     process_frames_od,
-    capture_frames_od,
-    handle_slot_control_od
+    handle_slot_control_od,
+    run_video_recorder
 )
 
 
-def clear_gpu_cache():
-    """
-    Clear GPU memory and force garbage collection.
-    """
-    gc.collect()                   # Python garbage collector
-    torch.cuda.empty_cache()       # Free cached GPU memory
-    torch.cuda.synchronize()       # Wait for all kernels to finish
-
-
 def monitor_inspection_ready(app):
     """
     Monitor when inspection is ready (models loaded + PLC ready) and show popup.
@@ -38,30 +43,64 @@ def monitor_inspection_ready(app):
     Args:
         app: Main application instance
     """
-    import time
-    
     # Wait for both model flags to be set
     while not (app.shared_data.get('bf_model_loaded', False) and app.shared_data.get('od_model_loaded', False)):
+        if app.shared_data.get('inference_server_failed', False):
+            app.after(0, lambda: messagebox.showerror(
+                "Inspection Failed",
+                "❌ The inference server could not load the models.\n\nSee the console for details, then stop and restart the inspection."
+            ))
+            return
         time.sleep(0.1)
     
     # Wait for PLC ready flag
     while not app.shared_data.get('plc_ready', False):
         time.sleep(0.1)
     
+    # Startup timeline: every phase recorded by the processes, plus the total
+    ready_time = time.perf_counter()
+    record_phase(app.shared_data, "start_to_ready", app.startup_started, ready_time, "startup")
+    print(f"✅ Start-to-ready: {ready_time - app.startup_started:.2f} s")
+    try:
+        phases = collect_startup_timeline(app.shared_data, app.capture_metrics)
+        print(f"📊 Startup timeline written to {export_chrome_trace(phases, STARTUP['TRACE_PATH'])}")
+    except OSError as e:
+        print(f"⚠️ Could not write startup timeline: {e}")
+
     # Update UI status indicators on main thread
     app.after(0, lambda: update_ui_status_ready(app))
     
     # Show success message on main thread
+    model_lines = "".join(f"• {line}\n" for line in describe_loaded_models(app.shared_data))
     app.after(0, lambda: messagebox.showinfo(
         "Inspection Started", 
         "✅ Inspection has started successfully!\n\n"
-        "• BF Model: Loaded on GPU\n"
-        "• OD Model: Loaded on GPU\n"
+        f"{model_lines}"
         "• PLC: Connected and Ready\n"
         "• Lights: ON"
     ))
 
 
+def describe_loaded_models(shared_data) -> list:
+    """
+    One status line per model with the backend and device it was actually loaded on.
+
+    Args:
+        shared_data: Shared dictionary holding the published load reports
+
+    Returns:
+        List of strings such as "BF Model: openvino on cpu (FP32)"
+    """
+    lines = []
+    for key, report in model_load_reports(shared_data, MODELS).items():
+        if report is None:
+            lines.append(f"{key} Model: Loaded")
+        else:
+            precision = "FP16" if report.get('half') else "FP32"
+            lines.append(f"{key} Model: {report['backend']} on {report['device']} ({precision})")
+    return lines
+
+
 def update_ui_status_ready(app):
     """Update UI elements when inspection is ready"""
     from .status_indicators import update_status_indicator
@@ -80,6 +119,49 @@ def update_ui_status_ready(app):
     update_disc_status(app, ready=True)
 
 
+# Time the inference loops and the video recorder get to close their files on Stop
+GRACEFUL_STOP_S = 5.0
+
+# Cameras that have an inference loop, and the MODELS keys each loop runs
+INFERENCE_LOOP_MODELS = {'BIGFACE': ('BF', 'HEAD'), 'OD': ('OD',)}
+
+
+def camera_mapping_errors(cameras: dict, model_configs: dict) -> list:
+    """
+    Check that every inference loop has its camera and gets its models.
+
+    Args:
+        cameras: CAMERAS from config.py
+        model_configs: MODELS from config.py
+
+    Returns:
+        List of error messages (empty if the mapping is valid)
+    """
+    errors = []
+    for name, model_keys in INFERENCE_LOOP_MODELS.items():
+        if name not in cameras:
+            errors.append(f"Camera '{name}' is missing from CAMERAS")
+        for key in model_keys:
+            camera = model_configs.get(key, {}).get('CAMERA')
+            if camera != name:
+                errors.append(f"MODELS['{key}']['CAMERA'] must be '{name}', not {camera!r}")
+    for key, spec in model_configs.items():
+        if spec.get('CAMERA') not in cameras:
+            errors.append(f"MODELS['{key}']['CAMERA'] names unknown camera {spec.get('CAMERA')!r}")
+    return errors
+
+
+def cameras_without_inference(cameras: dict) -> list:
+    """
+    Cameras that are captured but have no inference loop yet.
+
+    The inference loops are specific to the BIGFACE and OD stations; other
+    cameras still get a capture process and frame ring (e.g. a third view
+    shown or recorded before its inspection logic exists).
+    """
+    return [name for name in cameras if name not in INFERENCE_LOOP_MODELS]
+
+
 def create_processes(app):
     """
     Recreates process instances before starting them.
@@ -89,19 +171,51 @@ def create_processes(app):
     """
     app.plc_process = Process(
         target=plc_communication,
-        args=(app.PLC_IP, app.RACK, app.SLOT, app.DB_NUMBER, app.shared_data, app.command_queue, PLC_SENSORS),
+        args=(app.PLC_IP, app.RACK, app.SLOT, app.DB_NUMBER, app.shared_data, app.command_queue, PLC_SENSORS, app.edge_board),
         daemon=True
     )
 
+    # One capture process per configured camera, with fresh capture metrics and
+    # device indices resolved here from the cached camera list
+    for metrics in app.capture_metrics.values():
+        metrics.reset()
+    cameras = resolve_camera_sources(CAMERAS)
     app.processes = [
-        Process(target=capture_frames_bigface, args=(app.shared_frame_bigface, app.frame_lock_bigface, app.frame_shape, CAMERA_CONFIG['BIGFACE_NAME']), daemon=True),
+        Process(target=capture_frames, args=(name, camera, app.frame_rings[name], app.latch_rings[name], app.edge_board, FRAME_LATCH, app.model_rings[name], app.capture_metrics[name], CAPTURE_WATCHDOG), daemon=True)
+        for name, camera in cameras.items()
+    ]
+
+    # Model access for the inference processes: clients of one inference server, or local models
+    app.shared_data['inference_server_ready'] = False
+    app.shared_data['inference_server_failed'] = False
+    for metrics in list(app.memory_metrics.values()) + list(app.inference_metrics.values()) + list(app.image_writer_metrics.values()) + list(app.storage_metrics.values()) + list(app.video_recorder_metrics.values()):
+        metrics.reset()
+    model_inputs = {name: camera.get('MODEL_INPUT') for name, camera in CAMERAS.items()}
+    predictors, server_args = create_predictors(app.frame_rings, app.model_rings, MODELS, INFERENCE_SERVER, app.shared_data, WARMUP,
+                                                MEMORY_POLICY, app.memory_metrics['INFERENCE_SERVER'], INFERENCE_BACKEND, model_inputs)
+    if server_args is not None:
+        app.processes.append(Process(target=run_inference_server, args=server_args, daemon=True))
+
+    # Set on Stop so the inference loops write out queued images and close their archive segments
+    app.inference_stop = Event()
+    app.inference_processes = [
+        Process(target=process_rollers_bigface, args=(app.frame_rings['BIGFACE'], app.latch_rings['BIGFACE'], app.edge_board, app.roller_queue_bigface, predictors['BIGFACE'], app.proximity_count_bigface, app.roller_updation_dict, app.queue_lock, app.shared_data, app.detection_rings['BIGFACE'], app.model_rings['BIGFACE'], CAMERAS['BIGFACE'].get('MODEL_INPUT'), MEMORY_POLICY, app.memory_metrics['BIGFACE'], app.inference_metrics['BIGFACE'], ROLLER_TRACKER, IMAGE_WRITER, app.image_writer_metrics['BIGFACE'], STORAGE_GOVERNOR, app.storage_metrics, FRAME_ARCHIVE, app.inference_stop), daemon=True),
+        Process(target=process_frames_od, args=(app.frame_rings['OD'], app.latch_rings['OD'], app.edge_board, app.roller_queue_od, predictors['OD'], app.queue_lock, app.shared_data, app.roller_updation_dict, app.detection_rings['OD'], app.model_rings['OD'], CAMERAS['OD'].get('MODEL_INPUT'), MEMORY_POLICY, app.memory_metrics['OD'], app.inference_metrics['OD'], ROLLER_TRACKER, IMAGE_WRITER, app.image_writer_metrics['OD'], STORAGE_GOVERNOR, app.storage_metrics, FRAME_ARCHIVE, app.inference_stop), daemon=True)
+    ]
+    app.processes += [
         Process(target=handle_slot_control_bigface, args=(app.roller_queue_bigface, app.shared_data, app.command_queue), daemon=True),
-        Process(target=process_rollers_bigface, args=(app.shared_frame_bigface, app.frame_lock_bigface, app.roller_queue_bigface, app.model_bigface, app.proximity_count_bigface, app.roller_updation_dict, app.queue_lock, app.shared_data, app.frame_shape, app.shared_annotated_bigface, app.annotated_frame_lock_bigface), daemon=True),
-        Process(target=process_frames_od, args=(app.shared_frame_od, app.frame_lock_od, app.roller_queue_od, app.queue_lock, app.shared_data, app.frame_shape, app.roller_updation_dict, app.shared_annotated_od, app.annotated_frame_lock_od), daemon=True),
-        Process(target=capture_frames_od, args=(app.shared_frame_od, app.frame_lock_od, app.frame_shape, CAMERA_CONFIG['OD_NAME']), daemon=True),
+        *app.inference_processes,
         Process(target=handle_slot_control_od, args=(app.roller_queue_od, app.shared_data, app.command_queue), daemon=True)
     ]
 
+    # Video recorder in its own process, reading the frame rings; records while "Record video" is checked
+    app.recorder_process = None
+    if VIDEO_RECORDER.get('ENABLED', False):
+        app.recorder_stop = Event()
+        camera_fps = {name: camera.get('FPS') for name, camera in CAMERAS.items()}
+        app.recorder_process = Process(target=run_video_recorder, args=(app.frame_rings, app.shared_data, VIDEO_RECORDER, app.video_recorder_metrics, app.recorder_stop, camera_fps, STORAGE_GOVERNOR, app.storage_metrics), daemon=True)
+        app.processes.append(app.recorder_process)
+
 
 def start_inspection(app):
     """
@@ -114,43 +228,40 @@ def start_inspection(app):
         print("Inspection is already running!")
         return
 
-    # Clear GPU cache before starting
-    clear_gpu_cache()
-    
-    # Reset model loaded flags
+    errors = camera_mapping_errors(CAMERAS, MODELS)
+    if errors:
+        print(f"❌ Camera/model mapping in config.py is invalid: {'; '.join(errors)}")
+        messagebox.showerror("Configuration Error", "Cannot start the inspection:\n\n" + "\n".join(errors))
+        return
+    for name in cameras_without_inference(CAMERAS):
+        print(f"⚠️ Camera '{name}' has no inference loop: its frames are captured but not inspected")
+
+    app.startup_started = time.perf_counter()
+
+    # Reset model loaded flags, load reports and the previous startup timeline
+    # (models load in the inference processes)
     app.shared_data['bf_model_loaded'] = False
     app.shared_data['od_model_loaded'] = False
     app.shared_data['plc_ready'] = False
-
-    # Reload models if they were deleted
-    if not hasattr(app, 'model_bigface') or app.model_bigface is None:
-        print("🔄 Reloading Bigface model...")
-        from ultralytics import YOLO
-        app.model_bigface = YOLO(r"models/BF_sr.pt")
-        app.model_bigface.to('cuda')
-        print("   ✓ Bigface model loaded to GPU")
-    
-    if not hasattr(app, 'model_od') or app.model_od is None:
-        print("🔄 Reloading OD model...")
-        from ultralytics import YOLO
-        app.model_od = YOLO(r"models/OD_sr.pt")
-        app.model_od.to('cuda')
-        print("   ✓ OD model loaded to GPU")
+    for key in MODELS:
+        app.shared_data.pop(model_load_key(key), None)
+    reset_startup_timeline(app.shared_data)
 
     app.inspection_running = True
     app.start_button.config(state='disabled')
     app.stop_button.config(state='normal')
 
     # Recreate processes before starting
-    create_processes(app)
-
-    # Start PLC process
-    if app.plc_process is not None:
-        app.plc_process.start()
-
-    # Start subprocesses
-    for process in app.processes:
-        process.start()
+    with startup_phase(app.shared_data, "create_processes", "gui"):
+        create_processes(app)
+
+    # Start every process at once: the PLC connects, cameras open and models
+    # load and warm up concurrently; each records its phases in shared_data
+    with startup_phase(app.shared_data, "spawn_processes", "gui"):
+        if app.plc_process is not None:
+            app.plc_process.start()
+        for process in app.processes:
+            process.start()
     
     # Start monitoring thread for inspection ready popup
     monitor_thread = threading.Thread(target=monitor_inspection_ready, args=(app,), daemon=True)
@@ -169,32 +280,35 @@ def stop_inspection(app):
         print("Inspection is not running.")
         return
 
-    # Create PLC client
-    plc_client = snap7.client.Client()
-
-    try:
-        plc_client.connect(app.PLC_IP, app.RACK, app.SLOT)
-        print("✅ PLC Communication: Connected to PLC.")
-    except Exception as e:
-        print(f"❌ PLC Communication: Failed to connect to PLC. Error: {e}")
-        return
-
-    # Get action mappings from config
-    actions = PLC_SENSORS['ACTIONS']
+    if snap7 is None:
+        print("❌ PLC Communication: python-snap7 is not installed, lights OFF signal not sent.")
+    else:
+        # Create PLC client
+        plc_client = snap7.client.Client()
+
+        try:
+            plc_client.connect(app.PLC_IP, app.RACK, app.SLOT)
+            print("✅ PLC Communication: Connected to PLC.")
+        except Exception as e:
+            print(f"❌ PLC Communication: Failed to connect to PLC. Error: {e}")
+            return
+
+        # Get action mappings from config
+        actions = PLC_SENSORS['ACTIONS']
     
-    data = plc_client.read_area(Areas.DB, app.DB_NUMBER, 0, 2)  # Read 2 bytes
+        data = plc_client.read_area(Areas.DB, app.DB_NUMBER, 0, 2)  # Read 2 bytes
 
-    # Turn OFF lights and app ready signals using config
-    set_bool(data, byte_index=actions['lights']['byte'], bool_index=actions['lights']['bit'], value=False)
-    set_bool(data, byte_index=actions['app_ready']['byte'], bool_index=actions['app_ready']['bit'], value=False)
+        # Turn OFF lights and app ready signals using config
+        set_bool(data, byte_index=actions['lights']['byte'], bool_index=actions['lights']['bit'], value=False)
+        set_bool(data, byte_index=actions['app_ready']['byte'], bool_index=actions['app_ready']['bit'], value=False)
 
-    # Write back the modified data to DB
-    plc_client.write_area(Areas.DB, app.DB_NUMBER, 0, data)
-    print("✅ PLC Communication: Lights OFF signal sent.")
-    
-    # Close PLC connection
-    plc_client.disconnect()
+        # Write back the modified data to DB
+        plc_client.write_area(Areas.DB, app.DB_NUMBER, 0, data)
+        print("✅ PLC Communication: Lights OFF signal sent.")
     
+        # Close PLC connection
+        plc_client.disconnect()
+
     # Update UI status to not ready
     update_ui_status_not_ready(app)
             
@@ -208,6 +322,20 @@ def stop_inspection(app):
         app.plc_process.join()
         app.plc_process = None  # Mark it for recreation
 
+    # Let the inference loops write out queued images and close their archive segments,
+    # and the video recorder close its open segments, before everything is terminated
+    app.inference_stop.set()
+    graceful = list(app.inference_processes)
+    if app.recorder_process is not None:
+        app.recorder_stop.set()
+        graceful.append(app.recorder_process)
+    deadline = time.perf_counter() + max(GRACEFUL_STOP_S, IMAGE_WRITER.get('FLUSH_TIMEOUT_S', 5.0) + 1.0)
+    for process in graceful:
+        if process.is_alive():
+            process.join(timeout=max(deadline - time.perf_counter(), 0))
+    app.inference_processes = []
+    app.recorder_process = None
+
     # Stop and clear all subprocesses
     for process in app.processes:
         if process.is_alive():
@@ -216,21 +344,6 @@ def stop_inspection(app):
 
     app.processes = []  # Clear the list of processes
 
-    # Delete model references to free GPU memory
-    print("🧹 Deleting model references and clearing GPU memory...")
-    if hasattr(app, 'model_bigface') and app.model_bigface is not None:
-        del app.model_bigface
-        app.model_bigface = None
-        print("   ✓ Bigface model reference deleted")
-    
-    if hasattr(app, 'model_od') and app.model_od is not None:
-        del app.model_od
-        app.model_od = None
-        print("   ✓ OD model reference deleted")
-    
-    # Clear GPU cache after stopping
-    clear_gpu_cache()
-
     print("✅ Inspection stopped successfully.")
 
 
@@ -268,3 +381,24 @@ def toggle_allow_all_images(app):
         messagebox.showinfo("Allow All Images", f"All images mode has been {status}.")
     else:
         print("Shared data not initialized yet")
+
+
+def toggle_record_video(app):
+    """
+    Toggle continuous video recording of all cameras in shared data.
+    
+    Args:
+        app: Main application instance
+    """
+    import tkinter.messagebox as messagebox
+    
+    if hasattr(app, 'shared_data'):
+        app.shared_data['record_video'] = app.record_video_var.get()
+        status = "started" if app.record_video_var.get() else "stopped"
+        print(f"Record Video: {status}")
+        if app.record_video_var.get() and not VIDEO_RECORDER.get('ENABLED', False):
+            messagebox.showwarning("Record Video", "The video recorder is disabled in config.py (VIDEO_RECORDER).")
+        else:
+            messagebox.showinfo("Record Video", f"Video recording has been {status}.\n\nSegments are saved in {VIDEO_RECORDER['DIR']}")
+    else:
+        print("Shared data not initialized yet")
@@ -1,8 +1,13 @@
 """
 Status Indicators Module - Shows "Not Ready" indicators for camera feeds
+and the live capture health of each camera
 """
 import tkinter as tk
 from config import UI_COLORS
+from backend.capture_health import capture_health_summary
+
+# Camera key in CAMERAS -> prefix of its widgets on the app
+CAMERA_WIDGET_PREFIXES = {'BIGFACE': 'bf', 'OD': 'od'}
 
 
 def create_status_indicator(parent, text="● Not Ready"):
@@ -38,7 +43,40 @@ def update_status_indicator(indicator, ready=False):
         indicator: Button widget to update
         ready: Boolean indicating ready status
     """
+    indicator.ready = ready
     if ready:
         indicator.config(text="● Ready", bg="#00FF00")  # Green background
     else:
         indicator.config(text="● Not Ready", bg="#FF0000")  # Red background
+
+
+def update_capture_health(app):
+    """
+    Show capture health under each camera feed and flag stalled cameras
+    
+    Reads the capture metrics from shared memory; call from the main thread.
+    
+    Args:
+        app: Main application instance
+    """
+    if not hasattr(app, 'capture_metrics'):
+        return
+
+    for camera_name, prefix in CAMERA_WIDGET_PREFIXES.items():
+        metrics = app.capture_metrics.get(camera_name)
+        label = getattr(app, f'{prefix}_health_label', None)
+        indicator = getattr(app, f'{prefix}_status_indicator', None)
+        if metrics is None or label is None:
+            continue
+
+        summary = capture_health_summary(metrics.snapshot())
+        label.config(text=summary['text'])
+
+        # Only override the indicator while inspection is running
+        if indicator is not None and getattr(indicator, 'ready', False):
+            if summary['state'] == 'reconnecting':
+                indicator.config(text="● Reconnecting", bg="#FF8C00")  # Orange background
+            elif summary['state'] in ('failing', 'stalled'):
+                indicator.config(text="● No Frames", bg="#FF8C00")
+            else:
+                indicator.config(text="● Ready", bg="#00FF00")
@@ -27,13 +27,6 @@ def update_model_confidence(app):
     if hasattr(app, 'shared_data'):
         app.shared_data['od_conf_threshold'] = od_conf
         app.shared_data['bf_conf_threshold'] = bf_conf
-    
-    # If you need to update the models directly (if they're in the main process)
-    if hasattr(app, 'model_od'):
-        app.model_od.conf = od_conf
-    
-    if hasattr(app, 'model_bigface'):
-        app.model_bigface.conf = bf_conf
 
 
 def save_thresholds(app):
@@ -0,0 +1,90 @@
+"""Tests for the vectorized defect-to-roller assignment."""
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+from backend.detection_postprocess import assign_defects, corner_containment, find_class_index, sort_detections
+
+ROLLER = 5
+
+
+def detections(*rows):
+    return np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+
+
+def test_boxes_are_sorted_left_to_right_keeping_ties_in_model_order():
+    boxes, confidences, classes = sort_detections(detections(
+        (30.7, 0, 40, 10, 0.5, 1),
+        (10.2, 0, 20, 10, 0.6, 2),
+        (30.1, 0, 35, 10, 0.7, 3),
+    ))
+    assert boxes[:, 0].tolist() == [10, 30, 30]
+    assert classes.tolist() == [2, 1, 3]
+    assert confidences.dtype == np.float64
+
+
+def test_either_corner_inside_counts_edges_inclusive():
+    rollers = np.array([[0, 0, 100, 100]])
+    defects = np.array([[100, 100, 150, 150], [-20, -20, 0, 0], [90, -20, 120, 50], [150, 150, 160, 160]])
+    assert corner_containment(defects, rollers)[:, 0].tolist() == [True, True, False, False]
+
+
+def test_leftmost_roller_is_the_newest_id():
+    assignment = assign_defects(detections(
+        (0, 0, 100, 100, 0.9, ROLLER),
+        (200, 0, 300, 100, 0.9, ROLLER),
+        (210, 10, 220, 20, 0.5, 1),
+        (10, 10, 20, 20, 0.5, 0),
+        (500, 10, 520, 20, 0.5, 2),
+    ), ROLLER, roller_number=7, max_rollers=3)
+
+    assert assignment.classes.tolist() == [0, 1, 2]
+    assert assignment.roller_ids.tolist() == [7, 6, 0]
+
+
+def test_low_confidence_rollers_are_ignored():
+    assignment = assign_defects(detections(
+        (0, 0, 100, 100, 0.79, ROLLER),
+        (10, 10, 20, 20, 0.5, 0),
+    ), ROLLER, roller_number=1, max_rollers=2)
+    assert assignment.roller_ids.tolist() == [0]
+
+
+def test_nothing_is_assigned_with_more_rollers_than_expected():
+    rows = [(x, 0, x + 50, 100, 0.9, ROLLER) for x in (0, 100, 200)] + [(10, 10, 20, 20, 0.5, 0)]
+    assert assign_defects(detections(*rows), ROLLER, roller_number=5, max_rollers=2).roller_ids.tolist() == [0]
+    # Early rollers: only roller_number rollers can be in view yet
+    assert assign_defects(detections(*rows), ROLLER, roller_number=2, max_rollers=3).roller_ids.tolist() == [0]
+
+
+def test_empty_frame():
+    assignment = assign_defects(np.empty((0, 6), np.float32), ROLLER, roller_number=3, max_rollers=2)
+    assert len(assignment.classes) == len(assignment.roller_ids) == 0
+
+
+def test_find_class_index():
+    assert find_class_index({0: 'rust', 5: 'roller'}, 'roller') == 5
+    assert find_class_index({0: 'rust'}, 'roller') is None
+
+
+def _load_reference():
+    """The per-box loops assign_defects replaced, kept in the post-processing benchmark."""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'benchmarks', 'detection_postprocess_benchmark.py')
+    spec = importlib.util.spec_from_file_location('detection_postprocess_benchmark', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_matches_the_per_box_loops(seed):
+    reference = _load_reference()
+    rng = np.random.default_rng(seed)
+    for _ in range(500):
+        scene = reference.random_scene(rng, 40)
+        roller_number = int(rng.integers(0, 7))
+        assert reference.vectorized(scene, roller_number, 2) == reference.legacy_bf(scene, roller_number)
+        assert reference.vectorized(scene, roller_number, 3) == reference.legacy_od(scene, roller_number)
@@ -0,0 +1,95 @@
+"""Tests for the All Frames segment archive."""
+import os
+
+import numpy as np
+import pytest
+
+from backend.frame_archive import FrameArchiveReader, FrameArchiveWriter, list_segments
+
+
+def frame(value, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def detections(count):
+    return np.arange(count * 6, dtype=np.float32).reshape(count, 6)
+
+
+def test_round_trip_of_frames_and_detections(tmp_path):
+    writer = FrameArchiveWriter(str(tmp_path), jpeg_quality=95)
+    written = [
+        writer.append(frame(40 * i), frame_number=i, roller_id=i // 2 + 1, timestamp=1000.0 + i, detections=detections(i))
+        for i in range(4)
+    ]
+    writer.close()
+
+    reader = FrameArchiveReader(str(tmp_path))
+    records = list(reader.records())
+
+    assert records == written
+    for i, record in enumerate(records):
+        assert record.frame_number == i
+        assert record.timestamp == 1000.0 + i
+        np.testing.assert_array_equal(reader.read_detections(record), detections(i))
+        image = reader.read_image(record)
+        assert image.shape == (48, 64, 3)
+        assert abs(int(image.mean()) - 40 * i) <= 2
+
+
+def test_find_by_roller_and_frame_number(tmp_path):
+    writer = FrameArchiveWriter(str(tmp_path))
+    for i in range(6):
+        writer.append(frame(i), frame_number=i, roller_id=i % 3)
+    writer.close()
+
+    reader = FrameArchiveReader(str(tmp_path))
+
+    assert [r.frame_number for r in reader.find(roller_id=1)] == [1, 4]
+    assert [r.roller_id for r in reader.find(frame_number=5)] == [2]
+    assert reader.find(roller_id=1, frame_number=5) == []
+
+
+def test_segments_roll_over_and_report_their_size(tmp_path):
+    closed = []
+    # A segment closes as soon as it passes ~1 KB, i.e. after every frame
+    writer = FrameArchiveWriter(str(tmp_path), segment_mb=1 / 1024,
+                                on_segment_closed=lambda path, size: closed.append((path, size)))
+    for i in range(3):
+        writer.append(np.random.default_rng(i).integers(0, 255, (48, 64, 3), dtype=np.uint8), frame_number=i)
+    writer.close()
+
+    segments = list_segments(str(tmp_path))
+    assert len(segments) == 3
+    assert [path for path, _ in closed] == segments
+    assert all(os.path.getsize(path) == size for path, size in closed)
+    assert [r.frame_number for r in FrameArchiveReader(str(tmp_path)).records()] == [0, 1, 2]
+
+
+def test_unclosed_segment_is_read_by_scanning(tmp_path):
+    writer = FrameArchiveWriter(str(tmp_path))
+    written = [writer.append(frame(i), frame_number=i, detections=detections(1)) for i in range(3)]
+    writer._file.flush()  # Crash before close(): records on disk, no footer
+
+    reader = FrameArchiveReader(str(tmp_path))
+
+    assert reader.segment_records(written[0].segment) == written
+    np.testing.assert_array_equal(reader.read_detections(written[2]), detections(1))
+
+
+def test_scan_ignores_a_truncated_last_record(tmp_path):
+    writer = FrameArchiveWriter(str(tmp_path))
+    written = [writer.append(frame(i), frame_number=i) for i in range(3)]
+    writer._file.flush()
+    segment = written[0].segment
+    with open(segment, "r+b") as f:
+        f.truncate(os.path.getsize(segment) - 10)
+
+    assert FrameArchiveReader(segment).segment_records(segment) == written[:2]
+
+
+def test_non_archive_file_is_rejected(tmp_path):
+    path = tmp_path / "other.wfa"
+    path.write_bytes(b"JPEG" + b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        FrameArchiveReader(str(path)).segment_records(str(path))
@@ -0,0 +1,140 @@
+"""Tests for the shared-memory frame ring."""
+import numpy as np
+import pytest
+
+from backend.frame_buffer import SharedFrameRing
+
+SHAPE = (4, 6, 3)
+
+
+def frame(value):
+    return np.full(SHAPE, value % 256, dtype=np.uint8)
+
+
+def test_frames_are_numbered_from_one_and_read_back():
+    ring = SharedFrameRing(SHAPE, slots=4)
+    assert ring.latest() is None
+
+    assert ring.write(frame(7), timestamp=1.5, roller_id=3, tag=1, source_seq=42) == 1
+    packet = ring.get(1)
+    assert packet.seq == 1
+    assert packet.timestamp == 1.5
+    assert (packet.roller_id, packet.tag, packet.source_seq) == (3, 1, 42)
+    assert np.array_equal(packet.frame, frame(7))
+
+
+def test_overwritten_frames_are_gone():
+    ring = SharedFrameRing(SHAPE, slots=4)
+    for value in range(1, 7):
+        ring.write(frame(value))
+
+    assert ring.get(2) is None
+    assert ring.get(7) is None
+    assert ring.get(6).frame[0, 0, 0] == 6
+    assert ring.latest().seq == 6
+
+
+def test_read_into_preallocated_buffer():
+    ring = SharedFrameRing(SHAPE, slots=2)
+    ring.write(frame(9))
+    out = np.zeros(SHAPE, dtype=np.uint8)
+
+    packet = ring.latest(out=out)
+    assert packet.frame is out
+    assert out[0, 0, 0] == 9
+
+
+def test_next_after_reads_in_order_and_skips_lost_frames():
+    ring = SharedFrameRing(SHAPE, slots=4)
+    for value in range(1, 4):
+        ring.write(frame(value))
+    assert [ring.next_after(seq).seq for seq in (0, 1, 2)] == [1, 2, 3]
+    assert ring.next_after(3) is None
+
+    for value in range(4, 11):
+        ring.write(frame(value))
+    # A reader more than a ring behind resumes at the oldest frame still safe to read
+    assert ring.next_after(3).seq == 10 - 4 + 2
+
+
+def test_closest_to_picks_the_nearest_timestamp():
+    ring = SharedFrameRing(SHAPE, slots=4)
+    for seq, stamp in enumerate((1.0, 2.0, 3.0), start=1):
+        ring.write(frame(seq), timestamp=stamp)
+
+    assert ring.closest_to(2.2).seq == 2
+    assert ring.closest_to(10.0).seq == 3
+
+
+def test_frames_for_roller_filters_by_roller_and_tag():
+    ring = SharedFrameRing(SHAPE, slots=8)
+    ring.write(frame(1), roller_id=5, tag=0)
+    ring.write(frame(2), roller_id=6, tag=0)
+    ring.write(frame(3), roller_id=5, tag=1)
+
+    assert [packet.seq for packet in ring.frames_for_roller(5)] == [1, 3]
+    assert [packet.seq for packet in ring.frames_for_roller(5, tag=1)] == [3]
+
+
+def test_wait_for_new_times_out_without_a_frame():
+    ring = SharedFrameRing(SHAPE, slots=2)
+    assert ring.wait_for_new(0, timeout=0.01) == 0
+    ring.write(frame(1))
+    assert ring.wait_for_new(0, timeout=0.01) == 1
+
+
+def test_needs_two_slots():
+    with pytest.raises(ValueError):
+        SharedFrameRing(SHAPE, slots=1)
+
+
+def test_slot_being_written_is_not_readable():
+    ring = SharedFrameRing(SHAPE, slots=2)
+    ring.write(frame(1))
+    ring.write(frame(2))
+
+    # Slot of seq 1 is claimed for seq 3: seq 1 is gone, seq 2 still reads
+    view = ring.begin_write()
+    view[:] = 3
+    assert ring.get(1) is None
+    assert ring.latest().seq == 2
+
+    assert ring.commit() == 3
+    assert ring.latest().frame[0, 0, 0] == 3
+
+
+def test_aborted_write_publishes_nothing():
+    ring = SharedFrameRing(SHAPE, slots=2)
+    ring.write(frame(1))
+    ring.begin_write()[:] = 99
+    ring.abort()
+
+    assert ring.latest_seq == 1
+    assert ring.latest().frame[0, 0, 0] == 1
+    assert ring.write(frame(2)) == 2
+
+
+def _write_frames(ring, count):
+    for seq in range(1, count + 1):
+        ring.write(np.full(ring.frame_shape, seq % 256, dtype=np.uint8))
+
+
+def test_reader_never_sees_a_torn_frame():
+    import multiprocessing
+
+    # Large frames and few slots make the writer overwrite slots while they are being copied
+    ring = SharedFrameRing((480, 640, 3), slots=2)
+    writer = multiprocessing.Process(target=_write_frames, args=(ring, 3000))
+    writer.start()
+    try:
+        reads = 0
+        while writer.is_alive() or reads == 0:
+            packet = ring.latest()
+            if packet is None:
+                continue
+            reads += 1
+            # Every frame is uniform, so a mix of two frames shows up as more than one value
+            assert packet.frame.min() == packet.frame.max() == packet.seq % 256
+    finally:
+        writer.join()
+    assert ring.latest_seq == 3000
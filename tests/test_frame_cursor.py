@@ -0,0 +1,64 @@
+"""Tests for the sequence-aware frame cursor of the inference loops."""
+import numpy as np
+
+from backend.frame_buffer import SharedFrameRing
+from backend.frame_cursor import FrameCursor
+
+SHAPE = (2, 2, 3)
+
+
+def publish(ring, count):
+    for _ in range(count):
+        ring.write(np.zeros(SHAPE, np.uint8))
+
+
+def test_each_frame_is_handed_out_once():
+    ring = SharedFrameRing(SHAPE, slots=4)
+    cursor = FrameCursor(ring)
+    publish(ring, 1)
+
+    assert cursor.next(timeout=0).seq == 1
+    assert cursor.next(timeout=0.01) is None
+    assert cursor.next(timeout=0.01) is None
+
+    publish(ring, 1)
+    assert cursor.next(timeout=0).seq == 2
+    snapshot = cursor.metrics.snapshot()
+    assert snapshot['frames_inferred'] == 2
+    assert snapshot['last_seq'] == 2
+
+
+def test_a_wait_is_counted_once_however_often_it_polls():
+    ring = SharedFrameRing(SHAPE, slots=4)
+    cursor = FrameCursor(ring)
+    publish(ring, 1)
+    cursor.next(timeout=0)
+
+    for _ in range(5):
+        cursor.next(timeout=0.001)
+    assert cursor.metrics.get('duplicates_skipped') == 1
+
+    publish(ring, 1)
+    cursor.next(timeout=0)
+    cursor.next(timeout=0.001)
+    assert cursor.metrics.get('duplicates_skipped') == 2
+
+
+def test_frames_published_while_busy_count_as_missed():
+    ring = SharedFrameRing(SHAPE, slots=8)
+    cursor = FrameCursor(ring)
+    publish(ring, 1)
+    cursor.next(timeout=0)
+
+    publish(ring, 4)
+    assert cursor.next(timeout=0).seq == 5
+    assert cursor.metrics.get('frames_missed') == 3
+
+
+def test_first_frame_does_not_count_earlier_ones_as_missed():
+    ring = SharedFrameRing(SHAPE, slots=8)
+    publish(ring, 3)
+    cursor = FrameCursor(ring)
+
+    assert cursor.next(timeout=0).seq == 3
+    assert cursor.metrics.get('frames_missed') == 0
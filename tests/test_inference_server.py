@@ -0,0 +1,77 @@
+"""Tests for the inference client's request slots and the server loop."""
+import queue
+
+import numpy as np
+import pytest
+
+from backend import inference_server
+from backend.inference_server import InferenceClient
+from backend.memory_policy import MemoryPolicy
+
+FRAME = np.zeros((4, 4, 3), dtype=np.uint8)
+DETECTIONS = np.array([[1, 2, 3, 4, 0.9, 0]], dtype=np.float32)
+
+
+class FakePredictor:
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, model_key, frames, conf, imgsz):
+        self.batches.append(len(frames))
+        return [DETECTIONS] * len(frames)
+
+
+def serve(clients, requests, predictor):
+    requests.put(None)
+    memory = MemoryPolicy({'FREEZE_AFTER_WARMUP': False, 'CHECK_INTERVAL_S': 0.01})
+    inference_server._serve(clients, requests, predictor, memory, window=0.0, max_batch=8)
+
+
+def test_result_returns_the_server_answer():
+    requests = queue.Queue()
+    client = InferenceClient(0, requests, FRAME.shape, slots=1)
+    ticket = client.submit('BF', FRAME, 0.5)
+
+    serve([client], requests, FakePredictor())
+
+    np.testing.assert_array_equal(client.result(ticket), DETECTIONS)
+
+
+def test_timed_out_slot_is_reclaimed_and_its_late_answer_dropped():
+    requests = queue.Queue()
+    client = InferenceClient(0, requests, FRAME.shape, slots=1, response_timeout=0.02)
+    ticket = client.submit('BF', FRAME, 0.5)
+    with pytest.raises(RuntimeError, match="did not answer"):
+        client.result(ticket, poll_interval=0.01)
+
+    # The only slot is free again right away
+    client.submit('BF', FRAME, 0.5)
+    _, slot, generation, *_ = requests.get()
+    client.respond(slot, generation, np.zeros((5, 6), dtype=np.float32))  # Late answer to the abandoned request
+    assert client.responses.empty()
+
+
+def test_server_skips_requests_the_client_gave_up_on():
+    requests = queue.Queue()
+    client = InferenceClient(0, requests, FRAME.shape, slots=1, response_timeout=0.02)
+    with pytest.raises(RuntimeError):
+        client.result(client.submit('BF', FRAME, 0.5), poll_interval=0.01)
+    ticket = client.submit('BF', FRAME, 0.5)
+    predictor = FakePredictor()
+
+    serve([client], requests, predictor)
+
+    assert predictor.batches == [1]
+    np.testing.assert_array_equal(client.result(ticket), DETECTIONS)
+
+
+def test_result_raises_once_the_server_has_failed():
+    shared_data = {'inference_server_ready': True, 'model_names': {}}
+    client = InferenceClient(0, queue.Queue(), FRAME.shape, slots=1)
+    client.start(shared_data)
+    ticket = client.submit('BF', FRAME, 0.5)
+    shared_data['inference_server_failed'] = True
+
+    with pytest.raises(RuntimeError, match="failed"):
+        client.result(ticket, poll_interval=0.01)
+    assert client._free_slots == [ticket]
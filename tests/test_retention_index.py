@@ -0,0 +1,99 @@
+"""Tests for the in-memory retention index of image directories."""
+import os
+
+import numpy as np
+
+from backend.image_manager import save_image_with_limit
+from backend.retention_index import RetentionIndex, get_retention_index
+
+
+def write(directory, name, size=10):
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return path
+
+
+def test_scan_indexes_images_and_archive_segments_only(tmp_path):
+    write(tmp_path, "a.jpg", 10)
+    write(tmp_path, "b.PNG", 20)
+    write(tmp_path, "c.wfa", 30)
+    write(tmp_path, "notes.txt", 40)
+    (tmp_path / "sub.jpg").mkdir()
+
+    index = RetentionIndex(str(tmp_path))
+
+    assert len(index) == 3
+    assert index.total_bytes == 60
+    assert os.path.join(str(tmp_path), "notes.txt") not in index
+
+
+def test_missing_directory_is_empty(tmp_path):
+    index = RetentionIndex(str(tmp_path / "missing"))
+    assert len(index) == 0
+    assert index.oldest() is None and index.oldest_time() is None
+    assert index.evict_oldest() is None
+
+
+def test_added_images_are_evicted_oldest_first(tmp_path):
+    index = RetentionIndex(str(tmp_path))
+    paths = [write(tmp_path, f"{i}.jpg", 10 + i) for i in range(3)]
+    for path in paths:
+        index.add(path)
+
+    assert index.oldest() == paths[0]
+    assert index.evict_oldest() == (paths[0], 10)
+    assert not os.path.exists(paths[0])
+    assert index.total_bytes == 11 + 12
+
+
+def test_overwritten_image_becomes_the_newest(tmp_path):
+    index = RetentionIndex(str(tmp_path))
+    first, second = write(tmp_path, "1.jpg"), write(tmp_path, "2.jpg")
+    index.add(first)
+    index.add(second)
+
+    index.add(first, size=99)
+
+    assert index.oldest() == second
+    assert len(index) == 2
+    assert index.total_bytes == 10 + 99
+
+
+def test_make_room_keeps_fewer_than_the_limit(tmp_path):
+    index = RetentionIndex(str(tmp_path))
+    paths = [write(tmp_path, f"{i}.jpg") for i in range(5)]
+    for path in paths:
+        index.add(path)
+    os.remove(paths[1])  # Already gone from disk
+
+    assert index.make_room(3) == paths[:3]
+    assert sorted(os.listdir(tmp_path)) == ["3.jpg", "4.jpg"]
+
+
+def test_discard_forgets_without_deleting(tmp_path):
+    index = RetentionIndex(str(tmp_path))
+    path = write(tmp_path, "1.jpg")
+    index.add(path)
+
+    index.discard(path)
+
+    assert len(index) == 0 and index.total_bytes == 0
+    assert os.path.exists(path)
+
+
+def test_one_index_per_directory(tmp_path):
+    directory = str(tmp_path / "shared")
+    assert get_retention_index(directory) is get_retention_index(os.path.join(directory, "."))
+
+
+def test_save_image_with_limit_keeps_the_newest_images(tmp_path):
+    directory = str(tmp_path / "images")
+    image = np.zeros((4, 4, 3), np.uint8)
+    for i in range(5):
+        save_image_with_limit(image, directory, f"{i}.jpg", max_images=3)
+    # Overwriting an existing file does not evict another one
+    save_image_with_limit(image, directory, "4.jpg", max_images=3)
+
+    assert sorted(os.listdir(directory)) == ["2.jpg", "3.jpg", "4.jpg"]
+    assert len(get_retention_index(directory)) == 3
@@ -0,0 +1,97 @@
+"""Tests for roller tracking across frames."""
+import numpy as np
+
+from backend.roller_tracker import RollerTracker, box_iou, create_roller_tracker
+
+ROLLER = 5
+CONFIG = {'ENABLED': True, 'IOU_THRESHOLD': 0.3, 'MAX_CENTROID_DISTANCE': 80, 'MAX_MISSED': 2, 'ROLLER_CONF': 0.8}
+
+
+def roller(x, conf=0.9):
+    return (x, 100, x + 200, 400, conf, ROLLER)
+
+
+def defect(x, cls=0):
+    return (x, 150, x + 20, 170, 0.5, cls)
+
+
+def frame(*rows):
+    return np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+
+
+def test_box_iou():
+    ious = box_iou(np.array([0, 0, 10, 10]), np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]]))
+    assert np.allclose(ious, [1.0, 1 / 3, 0.0])
+
+
+def test_roller_keeps_its_id_while_moving():
+    tracker = RollerTracker(CONFIG)
+    tracker.update(frame(roller(0)), ROLLER)
+    tracker.register(1)
+
+    for x in range(30, 300, 30):
+        assignment = tracker.update(frame(roller(x), defect(x + 10)), ROLLER)
+        assert assignment.roller_ids.tolist() == [1]
+    assert len(tracker.tracks) == 1
+
+
+def test_id_registered_before_the_roller_is_seen_waits_for_it():
+    tracker = RollerTracker(CONFIG)
+    assert len(tracker.register(4)) == 0
+
+    assignment = tracker.update(frame(roller(0), defect(10)), ROLLER)
+    assert assignment.roller_ids.tolist() == [4]
+
+
+def test_evidence_before_registration_is_handed_over():
+    tracker = RollerTracker(CONFIG)
+    assignment = tracker.update(frame(roller(0), defect(10, cls=2)), ROLLER)
+    assert assignment.roller_ids.tolist() == [0]
+
+    assert tracker.register(1).tolist() == [2]
+    assert tracker.update(frame(roller(10), defect(20, cls=3)), ROLLER).roller_ids.tolist() == [1]
+
+
+def test_newest_roller_is_the_leftmost_unbound_track():
+    tracker = RollerTracker(CONFIG)
+    tracker.update(frame(roller(600)), ROLLER)
+    tracker.register(1)
+    tracker.update(frame(roller(0), roller(610)), ROLLER)
+    tracker.register(2)
+
+    assignment = tracker.update(frame(roller(10), roller(620), defect(20), defect(630)), ROLLER)
+    assert assignment.roller_ids.tolist() == [2, 1]
+
+
+def test_missed_roller_keeps_its_track_for_max_missed_frames():
+    tracker = RollerTracker(CONFIG)
+    tracker.update(frame(roller(0)), ROLLER)
+    tracker.register(1)
+
+    # Roller not detected: its defects still go to the last known box
+    for _ in range(CONFIG['MAX_MISSED']):
+        assert tracker.update(frame(defect(10)), ROLLER).roller_ids.tolist() == [1]
+    tracker.update(frame(), ROLLER)
+    assert tracker.tracks == []
+
+
+def test_low_confidence_rollers_are_not_tracked():
+    tracker = RollerTracker(CONFIG)
+    tracker.update(frame(roller(0, conf=0.5)), ROLLER)
+    assert tracker.tracks == []
+
+
+def test_many_rollers_in_view_are_still_attributed():
+    tracker = RollerTracker(CONFIG)
+    xs = [0, 300, 600, 900]
+    for roller_id, x in enumerate(reversed(xs), start=1):
+        tracker.update(frame(*[roller(position) for position in xs if position >= x]), ROLLER)
+        tracker.register(roller_id)
+
+    assignment = tracker.update(frame(*[roller(x) for x in xs], *[defect(x + 10) for x in xs]), ROLLER)
+    assert assignment.roller_ids.tolist() == [4, 3, 2, 1]
+
+
+def test_disabled_tracker():
+    assert create_roller_tracker({'ENABLED': False}) is None
+    assert isinstance(create_roller_tracker(CONFIG), RollerTracker)
@@ -0,0 +1,56 @@
+"""Tests for the board of PLC sensor edges."""
+import multiprocessing
+
+from backend.sensor_edges import SensorEdgeBoard
+
+SENSORS = {
+    'bigface_presence': {'CAMERA': 'BIGFACE'},
+    'head_classification_sensor': {'CAMERA': 'BIGFACE', 'ROLLER_ID_FROM': 'bigface_presence'},
+}
+
+
+def test_only_rising_edges_are_recorded():
+    board = SensorEdgeBoard(SENSORS)
+    assert board.read('bigface_presence').count == 0
+
+    samples = [(False, 1.0), (True, 2.0), (True, 3.0), (False, 4.0), (True, 5.0)]
+    edges = [board.record('bigface_presence', state, stamp) for state, stamp in samples]
+
+    assert edges == [False, True, False, False, True]
+    edge = board.read('bigface_presence')
+    assert (edge.count, edge.timestamp, edge.roller_id) == (2, 5.0, 2)
+
+
+def test_roller_id_follows_the_numbering_sensor():
+    board = SensorEdgeBoard(SENSORS)
+    board.record('bigface_presence', True, 1.0)
+    board.record('bigface_presence', False, 1.5)
+    board.record('bigface_presence', True, 2.0)
+
+    board.record('head_classification_sensor', True, 2.1)
+
+    edge = board.read('head_classification_sensor')
+    assert edge.count == 1
+    assert edge.roller_id == 2
+
+
+def test_tags_are_board_indices():
+    board = SensorEdgeBoard(SENSORS)
+    assert board.tag('bigface_presence') == 0
+    assert board.read_index(board.tag('head_classification_sensor')).count == 0
+
+
+def _fire(board, edges):
+    for i in range(edges):
+        board.record('bigface_presence', True, float(i))
+        board.record('bigface_presence', False, float(i))
+
+
+def test_edges_recorded_in_another_process_are_visible():
+    board = SensorEdgeBoard(SENSORS)
+    plc = multiprocessing.Process(target=_fire, args=(board, 5))
+    plc.start()
+    plc.join()
+
+    edge = board.read('bigface_presence')
+    assert (edge.count, edge.timestamp, edge.roller_id) == (5, 4.0, 5)
@@ -0,0 +1,110 @@
+"""Tests for the startup dependency graph and the startup phases of the inference server."""
+import queue
+import threading
+import time
+
+import pytest
+
+from backend import inference_server, model_registry
+from backend.startup import STARTUP_PHASE_PREFIX, StartupGraph, collect_startup_timeline
+
+
+def test_tasks_start_after_their_dependencies():
+    finished = []
+    graph = StartupGraph(max_workers=4)
+    graph.add('load', lambda: finished.append('load') or 'model')
+    graph.add('frames', lambda: finished.append('frames') or 'frames')
+    graph.add('warmup', lambda: finished.append('warmup'), deps=['load', 'frames'])
+
+    results = graph.run()
+
+    assert finished[-1] == 'warmup'
+    assert results['load'] == 'model'
+    assert set(results) == {'load', 'frames', 'warmup'}
+
+
+def test_independent_tasks_overlap():
+    both_running = threading.Barrier(2, timeout=2.0)
+    graph = StartupGraph(max_workers=2)
+    # Each task waits for the other; this only completes if they run concurrently
+    graph.add('a', both_running.wait)
+    graph.add('b', both_running.wait)
+
+    graph.run()
+
+
+def test_failure_skips_dependents_but_finishes_independent_tasks():
+    ran = []
+
+    def fail():
+        raise OSError("weights missing")
+
+    graph = StartupGraph(max_workers=2)
+    graph.add('load:BF', fail)
+    graph.add('warmup:BF', lambda: ran.append('warmup:BF'), deps=['load:BF'])
+    graph.add('load:OD', lambda: ran.append('load:OD'))
+
+    with pytest.raises(RuntimeError, match="load:BF"):
+        graph.run()
+    assert ran == ['load:OD']
+
+
+def test_unknown_dependency_is_rejected():
+    graph = StartupGraph()
+    graph.add('warmup', lambda: None, deps=['load'])
+    with pytest.raises(ValueError, match="unknown"):
+        graph.run()
+
+
+def test_circular_dependencies_are_rejected():
+    graph = StartupGraph()
+    graph.add('a', lambda: None, deps=['b'])
+    graph.add('b', lambda: None, deps=['a'])
+    with pytest.raises(ValueError, match="circular"):
+        graph.run()
+
+
+def test_each_task_is_recorded_as_a_phase():
+    shared_data = {}
+    graph = StartupGraph(shared_data)
+    graph.add('load', lambda: time.sleep(0.01), category='model')
+    graph.run()
+
+    phase = shared_data[STARTUP_PHASE_PREFIX + 'load']
+    assert phase['category'] == 'model'
+    assert phase['end'] - phase['start'] >= 0.01
+
+
+class FakeModel:
+    names = {0: 'rust', 1: 'dent'}
+
+
+def test_inference_server_records_model_load_phases(monkeypatch):
+    monkeypatch.setattr(model_registry, 'load_model', lambda path, config, device: (FakeModel(), 'torch', 'cpu', False))
+    model_configs = {'BF': {'PATH': "BF.pt", 'CAMERA': 'BIGFACE'}, 'OD': {'PATH': "OD.pt", 'CAMERA': 'OD'}}
+    requests = queue.Queue()
+    requests.put(None)  # Stops the server once the models are loaded
+    shared_data = {}
+
+    inference_server.run_inference_server([], requests, model_configs, {'DEVICE': 'cpu'}, shared_data,
+                                          memory_config={'FREEZE_AFTER_WARMUP': False, 'CHECK_INTERVAL_S': 0.01})
+
+    assert shared_data['inference_server_ready']
+    assert shared_data['model_names']['OD'] == FakeModel.names
+    phases = {phase['name'] for phase in collect_startup_timeline(shared_data)}
+    assert {'model_load:BF', 'model_load:OD'} <= phases
+    assert shared_data[model_registry.model_load_key('BF')]['backend'] == 'torch'
+
+
+def test_inference_server_flags_failed_model_loads(monkeypatch):
+    def missing(path, config, device):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(model_registry, 'load_model', missing)
+    shared_data = {}
+
+    inference_server.run_inference_server([], queue.Queue(), {'BF': {'PATH': "BF.pt", 'CAMERA': 'BIGFACE'}},
+                                          {'DEVICE': 'cpu'}, shared_data)
+
+    assert shared_data['inference_server_failed']
+    assert not shared_data.get('inference_server_ready', False)
@@ -0,0 +1,146 @@
+"""Tests for the global storage governor."""
+import os
+from collections import namedtuple
+
+from backend import storage_governor
+from backend.storage_governor import (
+    MB, RECORDINGS_TIER, StorageGovernor, create_storage_governor, governed_directories, new_storage_metrics
+)
+from backend.retention_index import get_retention_index
+
+PRIORITY = {'ALL_FRAMES': 0, 'RECORDINGS': 1, 'INFERENCE': 2}
+
+
+def config(budget_mb=0, min_free_mb=0, batch_files=100):
+    return {'BYTE_BUDGET_GB': budget_mb / 1024, 'MIN_FREE_GB': min_free_mb / 1024,
+            'PRIORITY': PRIORITY, 'BATCH_FILES': batch_files}
+
+
+def fill(directory, count, size_mb=1, prefix=""):
+    os.makedirs(directory, exist_ok=True)
+    index = get_retention_index(directory)
+    for i in range(count):
+        path = os.path.join(directory, f"{prefix}{i:03d}.jpg")
+        with open(path, "wb") as f:
+            f.write(b"x" * int(size_mb * MB))
+        index.add(path)
+    return index
+
+
+def test_governed_directories_by_tier():
+    paths = {'ALL_FRAMES': {'BF': {'ALL': "all_bf"}}, 'INFERENCE': {'BF': {'DEFECT': "bf_defect"}, 'OD': {'DEFECT': "od"}}}
+    assert governed_directories(paths, 'BF') == {'ALL_FRAMES': ["all_bf"], 'INFERENCE': ["bf_defect"]}
+
+
+def test_lower_tier_is_emptied_first(tmp_path):
+    all_frames = fill(str(tmp_path / "all"), 3)
+    defects = fill(str(tmp_path / "defects"), 3)
+    metrics = {'BIGFACE': new_storage_metrics()}
+    governor = StorageGovernor(config(budget_mb=4), {'ALL_FRAMES': [all_frames.directory], 'INFERENCE': [defects.directory]},
+                               metrics, 'BIGFACE')
+
+    assert governor.run_pass() == 2 * MB
+    assert (len(all_frames), len(defects)) == (1, 3)
+    snapshot = metrics['BIGFACE'].snapshot()
+    assert snapshot['evicted_files'] == 2
+    assert snapshot['bytes_used_mb'] == 4
+
+
+def test_higher_tier_is_only_touched_once_lower_tiers_are_empty(tmp_path):
+    all_frames = fill(str(tmp_path / "all"), 2)
+    defects = fill(str(tmp_path / "defects"), 3)
+    governor = StorageGovernor(config(budget_mb=2), {'ALL_FRAMES': [all_frames.directory], 'INFERENCE': [defects.directory]},
+                               {'BIGFACE': new_storage_metrics()}, 'BIGFACE')
+
+    governor.run_pass()
+    assert (len(all_frames), len(defects)) == (0, 3)
+    governor.run_pass()
+    assert (len(all_frames), len(defects)) == (0, 2)
+
+
+def test_oldest_image_across_directories_goes_first(tmp_path):
+    first = fill(str(tmp_path / "a"), 1, prefix="old")
+    second = fill(str(tmp_path / "b"), 2, prefix="new")
+    first.add(os.path.join(first.directory, "old000.jpg"))  # Now the newest
+    governor = StorageGovernor(config(budget_mb=2), {'INFERENCE': [first.directory, second.directory]},
+                               {'OD': new_storage_metrics()}, 'OD')
+
+    governor.run_pass()
+    assert (len(first), len(second)) == (1, 1)
+
+
+def test_process_waits_while_another_holds_a_lower_tier(tmp_path):
+    bf_all = fill(str(tmp_path / "bf_all"), 2)
+    od_defects = fill(str(tmp_path / "od_defects"), 2)
+    metrics = {'BIGFACE': new_storage_metrics(), 'OD': new_storage_metrics()}
+    bf = StorageGovernor(config(budget_mb=2), {'ALL_FRAMES': [bf_all.directory]}, metrics, 'BIGFACE')
+    od = StorageGovernor(config(budget_mb=2), {'INFERENCE': [od_defects.directory]}, metrics, 'OD')
+    bf.publish()
+    od.publish()
+
+    assert od.run_pass() == 0
+    assert bf.run_pass() == 2 * MB
+    assert (len(bf_all), len(od_defects)) == (0, 2)
+
+
+def test_free_space_floor(tmp_path, monkeypatch):
+    images = fill(str(tmp_path / "all"), 5)
+    Usage = namedtuple('Usage', 'total used free')
+    monkeypatch.setattr(storage_governor.shutil, 'disk_usage', lambda path: Usage(0, 0, 1 * MB))
+    metrics = {'BIGFACE': new_storage_metrics()}
+    governor = StorageGovernor(config(budget_mb=1000, min_free_mb=3), {'ALL_FRAMES': [images.directory]}, metrics, 'BIGFACE')
+
+    assert governor.run_pass() == 2 * MB
+    assert metrics['BIGFACE'].get('over_limit') == 1
+
+
+def test_eviction_is_batched(tmp_path):
+    images = fill(str(tmp_path / "all"), 10)
+    governor = StorageGovernor(config(budget_mb=0, batch_files=3), {'ALL_FRAMES': [images.directory]},
+                               {'BIGFACE': new_storage_metrics()}, 'BIGFACE')
+    governor.run_pass()
+    assert len(images) == 7
+
+
+class FakeSegments:
+    """Recorder-style index: whole segments with their own timestamps."""
+
+    def __init__(self, sizes):
+        self.segments = [(float(i), size) for i, size in enumerate(sizes)]
+
+    @property
+    def total_bytes(self):
+        return sum(size for _, size in self.segments)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def oldest_time(self):
+        return self.segments[0][0] if self.segments else None
+
+    def evict_oldest(self):
+        if not self.segments:
+            return None
+        stamp, size = self.segments.pop(0)
+        return f"segment{stamp:g}", size
+
+
+def test_recordings_tier_uses_the_given_indexes(tmp_path):
+    defects = fill(str(tmp_path / "defects"), 2)
+    segments = FakeSegments([2 * MB, 2 * MB, 2 * MB])
+    metrics = {'OD': new_storage_metrics(), 'RECORDER': new_storage_metrics()}
+    od = StorageGovernor(config(budget_mb=4), {'INFERENCE': [defects.directory]}, metrics, 'OD')
+    recorder = StorageGovernor(config(budget_mb=4), {RECORDINGS_TIER: [str(tmp_path)]}, metrics, 'RECORDER',
+                               indexes={RECORDINGS_TIER: [segments]})
+    od.publish()
+    recorder.publish()
+    assert metrics['RECORDER'].get('bytes_recordings_mb') == 6
+
+    # Recordings rank below defect images: they go first and the defects stay
+    assert od.run_pass() == 0
+    assert recorder.run_pass() == 4 * MB
+    assert (len(segments), len(defects)) == (1, 2)
+
+
+def test_disabled_governor_is_not_created():
+    assert create_storage_governor({'ENABLED': False}, {'INFERENCE': {}}, 'BF', {'BIGFACE': None}, 'BIGFACE') is None
@@ -0,0 +1,165 @@
+"""Tests for the continuous video recorder."""
+import csv
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from backend.frame_buffer import SharedFrameRing
+from backend.video_recorder import CameraRecorder, SegmentRetention, sidecar_path
+
+FRAME_SHAPE = (48, 64, 3)
+
+
+def config(directory, **overrides):
+    return dict({'DIR': str(directory), 'FOURCC': 'MJPG', 'EXTENSION': '.avi', 'SEGMENT_SECONDS': 1.0,
+                 'BACKOFF_INITIAL_MS': 10, 'BACKOFF_MAX_MS': 40}, **overrides)
+
+
+def segment(directory, name, size):
+    video = os.path.join(directory, name + ".avi")
+    with open(video, "wb") as f:
+        f.write(b"v" * size)
+    with open(sidecar_path(video), "w") as f:
+        f.write("x" * 10)
+    return video
+
+
+class StopAfterWaits:
+    """Stop event that records its waits and sets itself after a number of them."""
+
+    def __init__(self, waits):
+        self.remaining = waits
+        self.waits = []
+
+    def is_set(self):
+        return self.remaining <= 0
+
+    def wait(self, timeout):
+        self.waits.append(timeout)
+        self.remaining -= 1
+
+
+def test_retention_keeps_the_newest_segments_within_the_count(tmp_path):
+    retention = SegmentRetention(str(tmp_path), ".avi", max_segments=2)
+    videos = [segment(tmp_path, f"s{i}", 100) for i in range(3)]
+
+    assert retention.add(videos[0]) == []
+    assert retention.add(videos[1]) == []
+    assert retention.add(videos[2]) == [videos[0]]
+
+    assert not os.path.exists(videos[0]) and not os.path.exists(sidecar_path(videos[0]))
+    assert len(retention) == 2
+    assert retention.total_bytes == 2 * 110
+
+
+def test_retention_byte_limit_never_drops_the_newest_segment(tmp_path):
+    retention = SegmentRetention(str(tmp_path), ".avi", max_bytes=150)
+    videos = [segment(tmp_path, f"s{i}", 200) for i in range(2)]
+
+    retention.add(videos[0])
+    assert retention.add(videos[1]) == [videos[0]]
+    assert len(retention) == 1
+
+
+def test_retention_scan_and_eviction_interface(tmp_path):
+    videos = [segment(tmp_path, f"s{i}", 100) for i in range(2)]
+    os.utime(videos[0], (1000, 1000))
+    os.utime(videos[1], (2000, 2000))
+
+    retention = SegmentRetention(str(tmp_path), ".avi")
+
+    assert len(retention) == 2
+    assert retention.total_bytes == 220
+    assert retention.oldest_time() == 1000
+    assert retention.evict_oldest() == (videos[0], 110)
+    assert retention.total_bytes == 110
+    assert retention.evict_oldest() == (videos[1], 110)
+    assert retention.evict_oldest() is None
+    assert retention.oldest_time() is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_segments_and_sidecars_hold_every_frame(tmp_path):
+    cv2 = pytest.importorskip("cv2")
+    ring = SharedFrameRing(FRAME_SHAPE, slots=8)
+    recorder = CameraRecorder('CAM', ring, config(tmp_path), fps=10)
+    for i in range(25):
+        # 10 frames per second of capture time -> segments of 10, 10 and 5 frames
+        ring.write(np.full(FRAME_SHAPE, i * 8, dtype=np.uint8), timestamp=i / 10)
+        recorder.record_available()
+    recorder.close_segment()
+
+    videos = sorted(glob.glob(os.path.join(str(tmp_path), 'CAM', '*.avi')))
+    seqs = []
+    for video in videos:
+        with open(sidecar_path(video)) as f:
+            rows = list(csv.DictReader(f))
+        capture = cv2.VideoCapture(video)
+        assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == len(rows)
+        capture.release()
+        seqs += [int(row['seq']) for row in rows]
+
+    assert len(videos) == 3
+    assert seqs == list(range(1, 26))
+    assert recorder.metrics.get('frames_recorded') == 25
+    assert recorder.metrics.get('segments_closed') == 3
+
+
+def test_record_available_returns_after_one_batch(tmp_path):
+    ring = SharedFrameRing(FRAME_SHAPE, slots=4)
+    recorder = CameraRecorder('CAM', ring, config(tmp_path), fps=10)
+    ring.write(np.zeros(FRAME_SHAPE, dtype=np.uint8), timestamp=0.0)
+    assert recorder.record_available() == 1
+    for i in range(1, 10):
+        ring.write(np.zeros(FRAME_SHAPE, dtype=np.uint8), timestamp=i / 10)
+
+    # Seqs 2-7 were overwritten before the recorder got to them
+    assert recorder.record_available(max_frames=2) == 2
+    assert recorder.last_seq == 9
+    assert recorder.metrics.get('frames_missed') == 6
+    assert recorder.record_available() == 1
+    assert recorder.record_available() == 0
+    recorder.close_segment()
+
+
+def test_record_available_stops_with_the_stop_event(tmp_path):
+    ring = SharedFrameRing(FRAME_SHAPE, slots=4)
+    recorder = CameraRecorder('CAM', ring, config(tmp_path), fps=10)
+    ring.write(np.zeros(FRAME_SHAPE, dtype=np.uint8), timestamp=0.0)
+
+    assert recorder.record_available(stop_event=StopAfterWaits(0)) == 0
+    assert recorder.last_seq == 0
+
+
+def test_free_space_floor_refuses_to_open_a_segment(tmp_path):
+    ring = SharedFrameRing(FRAME_SHAPE, slots=4)
+    recorder = CameraRecorder('CAM', ring, config(tmp_path), min_free_bytes=1 << 62)
+    ring.write(np.zeros(FRAME_SHAPE, dtype=np.uint8), timestamp=0.0)
+
+    with pytest.raises(RuntimeError, match="storage floor"):
+        recorder.record_available()
+    assert os.listdir(recorder.directory) == []
+
+
+def test_errors_back_off_exponentially_up_to_the_maximum(tmp_path):
+    ring = SharedFrameRing(FRAME_SHAPE, slots=4)
+    recorder = CameraRecorder('CAM', ring, config(tmp_path))
+    outcomes = iter([OSError("disk"), OSError("disk"), 1, OSError("disk"), OSError("disk"), OSError("disk")])
+
+    def record_available(**kwargs):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    recorder.record_available = record_available
+    stop_event = StopAfterWaits(5)
+
+    recorder.run({'record_video': True}, stop_event)
+
+    # A written frame resets the delay
+    assert stop_event.waits == pytest.approx([0.01, 0.02, 0.01, 0.02, 0.04])
+    assert recorder.metrics.get('errors') == 5
+    assert recorder.metrics.get('recording') == 0
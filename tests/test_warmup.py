@@ -0,0 +1,102 @@
+"""Tests for the adaptive model warmup."""
+import types
+
+import cv2
+import numpy as np
+import pytest
+
+from backend import warmup
+from backend.warmup import has_converged, load_warmup_frames, warmup_configured_model, warmup_model
+
+
+class ScriptedPredictor:
+    """Advances a fake clock by a scripted latency per predict call."""
+
+    def __init__(self, latencies_ms, clock, steady_ms=10.0):
+        self.latencies = list(latencies_ms)
+        self.clock = clock
+        self.steady_ms = steady_ms
+        self.calls = []
+
+    def predict(self, model_key, frame, conf, imgsz=None):
+        self.calls.append((model_key, conf, imgsz))
+        latency = self.latencies.pop(0) if self.latencies else self.steady_ms
+        self.clock.now += latency / 1000.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_time(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(warmup, 'time', types.SimpleNamespace(perf_counter=clock))
+    return clock
+
+
+def test_has_converged_needs_a_full_window_within_tolerance():
+    assert not has_converged([10, 10], window=3, tolerance=0.1)
+    assert has_converged([50, 10, 10.5, 9.8], window=3, tolerance=0.1)
+    assert not has_converged([10, 20, 10], window=3, tolerance=0.1)
+    assert not has_converged([0, 0, 0], window=3, tolerance=0.1)
+
+
+def test_warmup_stops_once_latency_converges(monkeypatch):
+    clock = fake_time(monkeypatch)
+    predictor = ScriptedPredictor([300, 80, 20, 10, 10, 10, 10, 10], clock)
+
+    report = warmup_model(predictor, 'BF', None, conf=0.3, min_runs=3, max_runs=30, window=3, tolerance=0.15)
+
+    assert report['converged']
+    assert report['runs'] == 6
+    assert report['latency_ms'] == pytest.approx(10.0)
+    assert report['warmup_ms'] == pytest.approx(sum([300, 80, 20, 10, 10, 10]))
+
+
+def test_warmup_gives_up_at_max_runs(monkeypatch):
+    clock = fake_time(monkeypatch)
+    predictor = ScriptedPredictor([10, 30] * 10, clock)
+
+    report = warmup_model(predictor, 'BF', None, conf=0.3, min_runs=3, max_runs=8, window=3, tolerance=0.15)
+
+    assert not report['converged']
+    assert report['runs'] == 8
+
+
+def test_min_runs_below_the_window_still_waits_for_a_full_window(monkeypatch):
+    clock = fake_time(monkeypatch)
+    predictor = ScriptedPredictor([], clock)
+
+    report = warmup_model(predictor, 'BF', None, conf=0.3, min_runs=1, max_runs=30, window=4, tolerance=0.15)
+
+    assert report['converged']
+    assert report['runs'] == 4
+
+
+def test_configured_warmup_uses_production_settings(monkeypatch):
+    clock = fake_time(monkeypatch)
+    predictor = ScriptedPredictor([], clock)
+    frames = {'OD': (np.zeros((8, 8, 3), np.uint8), 320)}
+    config = {'CONF': {'OD': 0.2}, 'MIN_RUNS': 3, 'WINDOW': 3}
+
+    report = warmup_configured_model(predictor, 'OD', {'CAMERA': 'OD'}, frames, config)
+
+    assert report['runs'] == 3
+    assert set(predictor.calls) == {('OD', 0.2, 320)}
+    assert warmup_configured_model(predictor, 'BF', {'CAMERA': 'BIGFACE'}, frames, config) is None
+
+
+def test_warmup_frames_are_decoded_once_and_letterboxed(tmp_path):
+    path = str(tmp_path / "warmup.jpg")
+    cv2.imwrite(path, np.full((120, 160, 3), 128, np.uint8))
+
+    frames = load_warmup_frames({'BIGFACE': path, 'OD': path, 'MISSING': str(tmp_path / "none.jpg")},
+                                {'OD': {'IMGSZ': 64}})
+
+    assert set(frames) == {'BIGFACE', 'OD'}
+    assert frames['BIGFACE'][0].shape == (120, 160, 3) and frames['BIGFACE'][1] is None
+    assert frames['OD'][0].shape == (64, 64, 3) and frames['OD'][1] == 64
@@ -0,0 +1,80 @@
+"""
+Extract frames from an all-frames archive as individual JPEG files
+
+Reads a segment file or a directory of segments (e.g. All Frames/BF/All_BF)
+and writes the selected frames as JPEGs. Frames are written byte-for-byte
+as archived unless --annotate is given, which draws the stored detections
+onto them. With --list the records are printed instead of extracted.
+
+Usage:
+    python tools/extract_archive_frames.py "All Frames/BF/All_BF" --list
+    python tools/extract_archive_frames.py "All Frames/BF/All_BF" --out extracted --roller 42
+    python tools/extract_archive_frames.py segment.wfa --out extracted --frames 100 200 --annotate --names rust dent
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.annotation import draw_detections  # noqa: E402
+from backend.frame_archive import FrameArchiveReader  # noqa: E402
+
+
+def _selected(record, args):
+    if args.roller is not None and record.roller_id != args.roller:
+        return False
+    if args.frames is not None and not (args.frames[0] <= record.frame_number <= args.frames[1]):
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('archive', help="segment file or directory of segments")
+    parser.add_argument('--out', default="extracted_frames", help="output directory")
+    parser.add_argument('--list', action='store_true', help="print the records instead of extracting")
+    parser.add_argument('--roller', type=int, help="only frames of this roller ID")
+    parser.add_argument('--frames', type=int, nargs=2, metavar=('FIRST', 'LAST'), help="only this frame number range")
+    parser.add_argument('--annotate', action='store_true', help="draw the stored detections")
+    parser.add_argument('--names', nargs='+', default=[], help="class names by class ID, for --annotate labels")
+    args = parser.parse_args()
+
+    reader = FrameArchiveReader(args.archive)
+    if not reader.segments:
+        print(f"❌ No archive segments found in {args.archive}")
+        return 1
+
+    names = dict(enumerate(args.names))
+    if not args.list:
+        os.makedirs(args.out, exist_ok=True)
+
+    count = 0
+    for record in reader.records():
+        if not _selected(record, args):
+            continue
+        count += 1
+        if args.list:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.timestamp))
+            print(f"{os.path.basename(record.segment)} @{record.offset:<12} frame {record.frame_number:<8} "
+                  f"roller {record.roller_id:<6} {stamp} detections {record.detections:<3} {record.jpeg_size / 1024:.0f} KB")
+            continue
+
+        segment = os.path.splitext(os.path.basename(record.segment))[0]
+        path = os.path.join(args.out, f"{segment}_frame{record.frame_number}.jpg")
+        if args.annotate:
+            image = draw_detections(reader.read_image(record), reader.read_detections(record), names, copy=False)
+            cv2.imwrite(path, image)
+        else:
+            with open(path, "wb") as f:
+                f.write(reader.read_jpeg(record))
+
+    action = "Listed" if args.list else f"Extracted to {args.out}:"
+    print(f"✅ {action} {count} frame(s) from {len(reader.segments)} segment(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())